@@ -0,0 +1,99 @@
+"""
+Recall, latency and memory of the IVF index against exact search in the NumPy vector store, as the corpus grows.
+
+For each corpus size a synthetic, clustered set of normalized embeddings (like chunks of many similar policy
+documents) is written to a memory-mapped .npy file and loaded into a NumpyVectorStore. Queries are noisy
+copies of random chunks. The exact store gives the true top 3; the IVF store is built once and queried
+with several n_probe values, reporting recall@3, p50/p95 query latency, build time and index size.
+
+    python benchmarks/ann_recall.py --sizes 10000 100000 1000000 --dimensions 256
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.numpy_vector_store import NumpyVectorStore  # noqa: E402
+
+
+def rss_mb() -> float:
+    """Current resident memory of this process, from /proc (Linux)."""
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def write_corpus(path: Path, rows: int, dimensions: int, spread: float, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((max(16, int(rows**0.5) * 2), dimensions), dtype=np.float32)
+    vectors = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(rows, dimensions))
+    for start in range(0, rows, 1 << 16):
+        stop = min(rows, start + (1 << 16))
+        block = centers[rng.integers(len(centers), size=stop - start)] + spread * rng.standard_normal((stop - start, dimensions), dtype=np.float32)
+        vectors[start:stop] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    vectors.flush()
+    return np.load(path, mmap_mode="r")
+
+
+def timed_queries(store: NumpyVectorStore, queries: np.ndarray, k: int) -> tuple[list[list[str]], list[float]]:
+    from llama_index.core.vector_stores import VectorStoreQuery
+
+    results, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = store.query(VectorStoreQuery(query_embedding=query, similarity_top_k=k))
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append(result.ids)
+    return results, timings
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dimensions", type=int, default=256, help="Embedding size (1536 for text-embedding-3-small needs 6 GB at 1M chunks).")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--spread", type=float, default=1.5, help="Spread of the chunks around their topic, relative to the distance between topics.")
+    parser.add_argument("--query-noise", type=float, default=1.0, help="Distance of a query from the chunk it was made from, relative to the chunk's length.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'chunks':>9} {'search':<14}{'build s':>9}{'index MB':>10}{'recall@' + str(args.k):>10}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>9}")
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            vectors = write_corpus(Path(directory) / "vectors.npy", rows, args.dimensions, args.spread, rng)
+            ids = [str(i) for i in range(rows)]
+            picks = vectors[rng.integers(rows, size=args.queries)] + args.query_noise / args.dimensions**0.5 * rng.standard_normal((args.queries, args.dimensions), dtype=np.float32)
+            queries = (picks / np.linalg.norm(picks, axis=1, keepdims=True)).tolist()
+
+            exact = NumpyVectorStore("float32", vectors, ids, ids)
+            truth, timings = timed_queries(exact, queries, args.k)
+            print(f"{rows:>9} {'exact':<14}{0:>9.2f}{0:>10.1f}{1:>10.3f}{statistics.median(timings):>9.2f}{percentile(timings, 0.95):>9.2f}{rss_mb():>9.0f}")
+
+            ivf = NumpyVectorStore("float32", vectors, ids, ids, index="ivf")
+            start = time.perf_counter()
+            ivf.build_index()
+            build_seconds = time.perf_counter() - start
+            for n_probe in args.n_probe:
+                ivf.search_index.n_probe = n_probe
+                results, timings = timed_queries(ivf, queries, args.k)
+                recall = statistics.mean(len(set(found) & set(expected)) / len(expected) for found, expected in zip(results, truth))
+                print(f"{rows:>9} {f'ivf n_probe={n_probe}':<14}{build_seconds:>9.2f}{ivf.index_nbytes / 1e6:>10.1f}{recall:>10.3f}{statistics.median(timings):>9.2f}{percentile(timings, 0.95):>9.2f}{rss_mb():>9.0f}")
+            del exact, ivf, vectors
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Build time, size and query latency of the BM25 keyword index of common/hybrid_retrieval.py as the corpus grows.
+
+Chunks are random 200-word windows of the text of the two handbook PDFs, with one word in ten replaced by a
+random "form name" (like "form-18342") so the vocabulary keeps growing with the corpus, as it does with
+real documents. For each size the index is built, saved and loaded, and policy questions are answered,
+reporting p50/p95 latency of the BM25 search alone and with the reciprocal rank fusion of its top 10 and
+another ranking of 10 (what HybridRetriever adds on top of the vector search).
+
+    python benchmarks/bm25_latency.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pypdf import PdfReader
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from ann_recall import percentile  # noqa: E402
+from common.hybrid_retrieval import BM25Index, reciprocal_rank_fusion, tokenize  # noqa: E402
+
+QUESTIONS = [
+    "can i get my gardening tools reimbursed?",
+    "Does PerksPlus cover a gym membership?",
+    "what is the deadline to submit a PerksPlus reimbursement form?",
+    "who do i report a workplace safety incident to?",
+    "how many vacation days do new employees get?",
+    "is form-18342 needed for reimbursement?",
+]
+
+
+def make_corpus(rows: int, rng: random.Random) -> dict[str, str]:
+    words = []
+    for name in ("employee_handbook.pdf", "PerksPlus.pdf"):
+        words += tokenize(" ".join(page.extract_text() for page in PdfReader(ROOT_DIR / "example_data" / name).pages))
+    chunks = {}
+    for i in range(rows):
+        start = rng.randrange(len(words) - 200)
+        window = [f"form-{rng.randrange(rows * 2)}" if rng.random() < 0.1 else word for word in words[start : start + 200]]
+        chunks[f"chunk-{i}"] = " ".join(window)
+    return chunks
+
+
+def main():
+    from llama_index.core.schema import NodeWithScore, TextNode
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--rounds", type=int, default=100, help="Times each question is asked.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    other_ranking = [NodeWithScore(node=TextNode(id_=f"chunk-{i}", text=""), score=1.0) for i in range(10)]
+    print(f"{'chunks':>9}{'terms':>9}{'build s':>9}{'index MB':>10}{'load ms':>9}{'BM25 p50 ms':>13}{'p95 ms':>8}{'+ fusion p50 ms':>17}{'p95 ms':>8}")
+    for rows in args.sizes:
+        chunks = make_corpus(rows, rng)
+        start = time.perf_counter()
+        index = BM25Index.build(chunks)
+        build_seconds = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "bm25.npz"
+            index.save(path)
+            start = time.perf_counter()
+            index = BM25Index.load(path)
+            load_ms = (time.perf_counter() - start) * 1000
+
+        search, fused = [], []
+        for _ in range(args.rounds):
+            for question in QUESTIONS:
+                start = time.perf_counter()
+                top, scores = index.search(question, 10)
+                search.append((time.perf_counter() - start) * 1000)
+                ranking = [NodeWithScore(node=TextNode(id_=str(index.node_ids[i]), text=""), score=float(score)) for i, score in zip(top, scores)]
+                reciprocal_rank_fusion([other_ranking, ranking], 3)
+                fused.append((time.perf_counter() - start) * 1000)
+        print(f"{rows:>9}{len(index.terms):>9}{build_seconds:>9.2f}{index.nbytes / 1e6:>10.1f}{load_ms:>9.1f}{statistics.median(search):>13.3f}{percentile(search, 0.95):>8.3f}{statistics.median(fused):>17.3f}{percentile(fused, 0.95):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Storage, latency and evictions of the SQLite checkpointer's retention policies, for a server with many threads.
+
+Turns of langgraph_agent.py (four checkpoints each, see checkpoint_store.py) arrive for a growing set of
+threads: a turn starts a new thread with probability --new, and otherwise continues one of the --active
+most recently used threads, so a few conversations get long and most stay short. The same turns are
+replayed with no retention, with only the last --keep checkpoints of each thread kept, and with that plus
+whole threads evicted by LRU under --max-mb, reporting the checkpointer's gauges and counters, p50/p95
+checkpoint write and read latency, and how many turns found their thread evicted.
+
+    python benchmarks/checkpoint_retention.py --turns 20000 --keep 8 --max-mb 4
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from ann_recall import percentile  # noqa: E402
+from checkpoint_store import Thread, turn_messages  # noqa: E402
+from common.sqlite_checkpointer import SqliteDeltaSaver  # noqa: E402
+
+
+def workload(turns: int, new: float, active: int, rng: random.Random) -> list[int]:
+    """The thread of each turn."""
+    recent, threads, started = [], [], 0
+    for _ in range(turns):
+        if not recent or rng.random() < new:
+            thread, started = started, started + 1
+        else:
+            thread = recent[min(int(rng.expovariate(1 / 5)), len(recent) - 1)]
+        if thread in recent:
+            recent.remove(thread)
+        recent = [thread] + recent[: active - 1]
+        threads.append(thread)
+    return threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20_000)
+    parser.add_argument("--new", type=float, default=0.05, help="Share of turns that start a new thread.")
+    parser.add_argument("--active", type=int, default=100, help="Recently used threads that the other turns continue.")
+    parser.add_argument("--keep", type=int, default=8, help="Checkpoints kept per thread.")
+    parser.add_argument("--max-mb", type=float, default=4, help="Budget for the stored checkpoints.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    schedule = workload(args.turns, args.new, args.active, rng)
+    messages = [turn_messages(turn) for turn in range(args.turns)]
+    policies = {"none": {}, f"keep {args.keep}": {"keep_checkpoints": args.keep}, f"keep {args.keep}, {args.max_mb:g} MB": {"keep_checkpoints": args.keep, "max_bytes": int(args.max_mb * 1024 * 1024)}}
+    print(f"{args.turns} turns over {len(set(schedule))} threads, the longest {max(schedule.count(thread) for thread in set(schedule))} turns\n")
+    print(f"{'policy':<20}{'threads':>8}{'checkpoints':>12}{'stored MB':>10}{'file MB':>9}{'cached msgs':>12}{'pruned':>8}{'compacted':>10}{'evicted':>8}{'restarted':>10}{'write p50 µs':>13}{'p95':>7}{'read p50 µs':>12}{'p95':>7}")
+    for name, policy in policies.items():
+        with tempfile.TemporaryDirectory() as directory:
+            saver = SqliteDeltaSaver(Path(directory) / "checkpoints.sqlite3", **policy)
+            threads: dict[int, Thread] = {}
+            writes, reads, restarted = [], [], 0
+            for turn, thread_number in enumerate(schedule):
+                thread = threads.get(thread_number)
+                if thread is None:
+                    thread = threads[thread_number] = Thread(saver, f"thread-{thread_number}")
+                    thread.turn(messages[turn], writes, reads)
+                elif not thread.turn(messages[turn], writes, reads):
+                    restarted += 1
+            stats = saver.stats()
+            print(f"{name:<20}{stats['threads']:>8}{stats['checkpoints']:>12}{stats['bytes'] / 1e6:>10.1f}{stats['file_bytes'] / 1e6:>9.1f}{stats['cached_messages']:>12}{stats['checkpoints_pruned']:>8}{stats['snapshots_compacted']:>10}{stats['threads_evicted']:>8}{restarted:>10}{statistics.median(writes):>13.0f}{percentile(writes, 0.95):>7.0f}{statistics.median(reads):>12.0f}{percentile(reads, 0.95):>7.0f}")
+            saver.close()
+
+
+if __name__ == "__main__":
+    main()
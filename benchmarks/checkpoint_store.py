@@ -0,0 +1,146 @@
+"""
+Checkpoint write and read latency and bytes per turn of the SQLite delta checkpointer against MemorySaver.
+
+A turn of langgraph_agent.py adds four messages to the thread (the question, the tool call, the tool
+result and the answer), with a checkpoint saved after each, and starts with a read of the latest
+checkpoint, which is what this replays against each saver, straight through its API.
+
+SqliteDeltaSaver runs one thread up to --turns turns, and its latencies and bytes are taken from the
+--window turns before each of --at. MemorySaver cannot hold such a thread (it keeps a full copy of the
+history in every checkpoint, about 100 GB at 10k turns), so for each of --at it is given a thread of that
+many turns in one checkpoint and then runs --window turns. "bytes/turn" is the serialized size of what
+a turn stores, and "thread MB" the total for a thread of that length (summed up to it for MemorySaver,
+whose cost per turn grows linearly). The cold read opens the database in a new saver and reads the
+latest checkpoint, rebuilding the history from its last snapshot and deltas.
+
+    python benchmarks/checkpoint_store.py --turns 10000 --at 100 1000 10000
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from ann_recall import percentile  # noqa: E402
+from common.sqlite_checkpointer import SqliteDeltaSaver  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+from langgraph.checkpoint.base import empty_checkpoint  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+
+THREAD_ID = "bench"
+
+
+def turn_messages(turn: int) -> list:
+    call_id = f"call_{uuid.uuid4().hex[:24]}"
+    song = f"Song number {turn}"
+    return [
+        HumanMessage(f"Can you play {song} by Taylor Swift?", id=str(uuid.uuid4())),
+        AIMessage("", tool_calls=[{"name": "play_song_on_spotify", "args": {"song": song}, "id": call_id}], id=str(uuid.uuid4())),
+        ToolMessage(f"Successfully played {song} on Spotify!", tool_call_id=call_id, name="play_song_on_spotify", id=str(uuid.uuid4())),
+        AIMessage(f"I started playing {song} on Spotify for you. Enjoy!", id=str(uuid.uuid4())),
+    ]
+
+
+class Thread:
+    """Saves checkpoints of a growing message history the way a compiled graph does."""
+
+    def __init__(self, saver, thread_id: str = THREAD_ID):
+        self.saver = saver
+        self.config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        self.version = None
+        self.history = []
+        self.step = 0
+
+    def put(self, messages: list) -> float:
+        """Saves a checkpoint with the messages added to the history, returning the time the saver took in µs."""
+        self.history = self.history + messages
+        self.version = self.saver.get_next_version(self.version, None)
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": self.history}
+        checkpoint["channel_versions"] = {"messages": self.version}
+        start = time.perf_counter()
+        self.config = self.saver.put(self.config, checkpoint, {"source": "loop", "step": self.step}, {"messages": self.version})
+        elapsed = (time.perf_counter() - start) * 1e6
+        self.step += 1
+        return elapsed
+
+    def turn(self, messages: list, writes: list[float], reads: list[float]) -> bool:
+        """Runs a turn, returning whether the saver had a checkpoint of the thread to start from."""
+        start = time.perf_counter()
+        found = self.saver.get_tuple({"configurable": {"thread_id": self.config["configurable"]["thread_id"]}})
+        reads.append((time.perf_counter() - start) * 1e6)
+        for message in messages:
+            writes.append(self.put([message]))
+        return found is not None
+
+
+def memory_bytes(saver: MemorySaver) -> int:
+    stored = sum(len(data) for _, data in saver.blobs.values())
+    return stored + sum(len(checkpoint[1]) + len(metadata[1]) for namespaces in saver.storage.values() for checkpoints in namespaces.values() for checkpoint, metadata, _ in checkpoints.values())
+
+
+def sqlite_bytes(saver: SqliteDeltaSaver) -> int:
+    blobs = saver._db.execute("SELECT coalesce(sum(length(data)), 0) FROM blobs").fetchone()[0]
+    return blobs + saver._db.execute("SELECT coalesce(sum(length(checkpoint) + length(metadata)), 0) FROM checkpoints").fetchone()[0]
+
+
+def report(name: str, turns: int, writes: list[float], reads: list[float], per_turn: float, thread_mb: float):
+    print(f"{name:<14}{turns:>7}{statistics.median(writes):>12.0f}{percentile(writes, 0.95):>9.0f}{statistics.median(reads):>12.0f}{percentile(reads, 0.95):>9.0f}{per_turn:>12.0f}{thread_mb:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10_000)
+    parser.add_argument("--at", type=int, nargs="+", default=[100, 1_000, 10_000], help="Thread lengths, in turns, to report at.")
+    parser.add_argument("--window", type=int, default=10, help="Turns measured at each length.")
+    parser.add_argument("--snapshot-every", type=int, default=64, help="Deltas between full snapshots of the history.")
+    args = parser.parse_args()
+
+    print(f"Generating {args.turns} turns...")
+    turns = [turn_messages(turn) for turn in range(max(args.turns, *args.at))]
+    print(f"\n{'saver':<14}{'turns':>7}{'write p50 µs':>12}{'p95':>9}{'read p50 µs':>12}{'p95':>9}{'bytes/turn':>12}{'thread MB':>11}")
+
+    for length in args.at:
+        thread = Thread(MemorySaver())
+        thread.put([message for messages in turns[: length - args.window] for message in messages])
+        before = memory_bytes(thread.saver)
+        writes, reads = [], []
+        for messages in turns[length - args.window : length]:
+            thread.turn(messages, writes, reads)
+        per_turn = (memory_bytes(thread.saver) - before) / args.window
+        # A turn's checkpoints each hold the whole history, so the bytes of turn t grow linearly with t
+        report("MemorySaver", length, writes, reads, per_turn, per_turn * (length + 1) / 2 / 1e6)
+        del thread
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "checkpoints.sqlite3"
+        thread = Thread(SqliteDeltaSaver(path, snapshot_every=args.snapshot_every))
+        writes, reads, before = [], [], 0
+        for turn, messages in enumerate(turns[: args.turns], 1):
+            if turn in [length - args.window + 1 for length in args.at]:
+                writes, reads, before = [], [], sqlite_bytes(thread.saver)
+            thread.turn(messages, writes, reads)
+            if turn in args.at:
+                stored = sqlite_bytes(thread.saver)
+                report("SqliteDelta", turn, writes, reads, (stored - before) / args.window, stored / 1e6)
+
+        thread.saver._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        thread.saver.close()
+        cold = []
+        for _ in range(5):
+            start = time.perf_counter()
+            saver = SqliteDeltaSaver(path)
+            found = saver.get_tuple({"configurable": {"thread_id": THREAD_ID}})
+            cold.append((time.perf_counter() - start) * 1000)
+            saver.close()
+        print(f"\nSqliteDelta after {args.turns} turns: {path.stat().st_size / 1e6:.1f} MB on disk, {len(found.checkpoint['channel_values']['messages'])} messages, cold read p50 {statistics.median(cold):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
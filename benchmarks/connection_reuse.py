@@ -0,0 +1,97 @@
+"""
+Compares a fresh OpenAI client per request with the shared pooled client from common/clients.py.
+
+A local stand-in chat-completions endpoint counts the TCP connections it accepts,
+so the output shows how many connections (and TCP/TLS handshakes) each approach needs.
+
+    python benchmarks/connection_reuse.py --requests 200
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import openai
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "examples"))
+
+from common.clients import get_http_client  # noqa: E402
+
+COMPLETION = {
+    "id": "chatcmpl-local",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "local",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Hola!"}}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandInHandler.lock:
+            StandInHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(make_client, requests: int) -> dict:
+    StandInHandler.connections = 0
+    latencies = []
+    for _ in range(requests):
+        client = make_client()
+        start = time.perf_counter()
+        client.chat.completions.create(model="local", messages=[{"role": "user", "content": "hi"}])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "connections": StandInHandler.connections,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1],
+        "total_s": sum(latencies) / 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = {
+        "client per request": run(lambda: openai.OpenAI(base_url=base_url, api_key="local", http_client=httpx.Client()), args.requests),
+        "shared pooled client": run(lambda: openai.OpenAI(base_url=base_url, api_key="local", http_client=get_http_client()), args.requests),
+    }
+    server.shutdown()
+
+    print(f"{'mode':<22}{'connections':>12}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<22}{result['connections']:>12}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['total_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
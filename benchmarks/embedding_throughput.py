@@ -0,0 +1,88 @@
+"""
+Embedding throughput for the llama-index handbook indexes, in chunks per second, against the local mock server.
+
+Both example PDFs are split into the chunks VectorStoreIndex would embed, then embedded:
+
+* default: llama-index's OpenAIEmbedding as the examples used it, 100 chunks per request, one request at a time,
+* batch B x N: common/embedding_cache.py's CachedEmbedding, B chunks per request and N requests in flight,
+* cold / warm cache: the default settings with an empty, then a filled, on-disk embedding cache.
+
+The mock sleeps --ttft seconds per request plus --per-text seconds per chunk in it, roughly like a hosted model.
+
+    python benchmarks/embedding_throughput.py --ttft 0.2 --per-text 0.002
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+PDFS = ["employee_handbook.pdf", "PerksPlus.pdf"]
+
+
+def load_chunks(chunk_size: int) -> list[str]:
+    from common.llamaindex_ingestion import load_pages
+    from llama_index.core.node_parser import SentenceSplitter
+
+    nodes = SentenceSplitter(chunk_size=chunk_size).get_nodes_from_documents(load_pages([ROOT_DIR / "example_data" / name for name in PDFS]))
+    return [node.get_content(metadata_mode="embed") for node in nodes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Mock latency per embedding request, in seconds.")
+    parser.add_argument("--per-text", type=float, default=0.002, help="Extra mock latency per chunk in a request, in seconds.")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Tokens per chunk (llama-index defaults to 1024).")
+    parser.add_argument("--repeat", type=int, default=10, help="Copies of the handbook chunks to embed (each copy is made distinct).")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.chunk_size)
+    texts = [f"[copy {copy}] {chunk}" for copy in range(args.repeat) for chunk in chunks]
+    print(f"{len(chunks)} chunks from {len(PDFS)} PDFs, {len(texts)} texts to embed\n")
+
+    with run_in_thread(MockOptions(ttft=args.ttft, token_latency=args.per_text)) as server, tempfile.TemporaryDirectory() as directory:
+        os.environ.update({"API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": server.base_url, "CLIENT_MAX_PER_ENDPOINT": "64", "CLIENT_MAX_CONNECTIONS": "64"})
+        from common.clients import get_endpoint, get_http_client
+        from common.embedding_cache import CachedEmbedding, EmbeddingStore
+        from llama_index.embeddings.openai import OpenAIEmbedding
+
+        def base_model():
+            base_url, api_key = get_endpoint()
+            return OpenAIEmbedding(model="text-embedding-3-small", api_base=base_url, api_key=api_key, http_client=get_http_client(), max_retries=0)
+
+        print(f"{'configuration':<22}{'seconds':>9}{'chunks/s':>10}{'requests':>10}{'speedup':>9}")
+        baseline = None
+
+        def run(label, model):
+            nonlocal baseline
+            requests_before = server.stats["embeddings"]
+            start = time.perf_counter()
+            vectors = model.get_text_embedding_batch(texts)
+            seconds = time.perf_counter() - start
+            assert len(vectors) == len(texts)
+            baseline = baseline or seconds
+            print(f"{label:<22}{seconds:>9.2f}{len(texts) / seconds:>10.0f}{server.stats['embeddings'] - requests_before:>10}{baseline / seconds:>8.1f}x")
+
+        model = base_model()
+        run(f"default ({model.embed_batch_size} x 1)", model)
+        for batch_size in args.batch_sizes:
+            for in_flight in args.in_flight:
+                run(f"batch {batch_size} x {in_flight}", CachedEmbedding(base_model(), None, batch_size=batch_size, max_in_flight=in_flight))
+
+        store = EmbeddingStore(Path(directory) / "embeddings.sqlite3")
+        run("cold cache (64 x 4)", CachedEmbedding(base_model(), store, batch_size=64, max_in_flight=4))
+        run("warm cache (64 x 4)", CachedEmbedding(base_model(), store, batch_size=64, max_in_flight=4))
+        print(f"\ncache file: {store.path.stat().st_size / 1e6:.1f} MB for {len(store)} vectors")
+
+
+if __name__ == "__main__":
+    main()
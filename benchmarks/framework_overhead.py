@@ -0,0 +1,183 @@
+"""
+Measures what each agent framework adds on top of the raw LLM call.
+
+The "Spanish tutor" and "weekend planner" examples run against the local mock server (see
+common/mock_server.py), each framework in its own subprocess so peak RSS is not shared between them.
+Every run is timed end to end, and the mock's request counter gives the number of LLM calls per run.
+Overhead is the run time minus that many raw chat-completion calls made with the same pooled client,
+so it covers the framework's prompt building, parsing, tool dispatch and bookkeeping.
+Allocations are measured with tracemalloc in separate runs, so tracing does not inflate the timings.
+
+    python benchmarks/framework_overhead.py --runs 50
+    python benchmarks/framework_overhead.py autogen_tools openai_agents_tools --ttft 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import runpy
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+TASKS = {
+    "tutor": ["autogen_basic", "openai_agents_basic", "pydanticai_basic", "semantickernel_basic"],
+    "weekend planner": ["autogen_tools", "openai_agents_tools"],
+}
+
+SCRIPT = {
+    "rules": [
+        {"match": {"last_role": "tool"}, "response": {"content": "Este fin de semana va a llover en Seattle, así que visita el museo el sábado."}},
+        {"match": {"contains": "how are you"}, "response": {"content": "¡Hola! Estoy muy bien, gracias. ¿Y tú? ¿Practicamos un poco de español?"}},
+    ],
+}
+
+RAW_MESSAGES = [
+    {"role": "system", "content": "You are a Spanish tutor. Help the user learn Spanish. ONLY respond in Spanish."},
+    {"role": "user", "content": "hi how are you?"},
+]
+
+
+def percentile(values: list[float], percent: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1] if len(values) > 1 else values[0]
+
+
+async def reset_autogen_agent(example: dict):
+    from autogen_core import CancellationToken
+
+    await example["agent"].on_reset(CancellationToken())
+
+
+# Examples whose agent keeps the conversation between runs are reset after each one, outside the timing
+RESETS = {"autogen_basic": reset_autogen_agent, "autogen_tools": reset_autogen_agent}
+
+
+async def llm_calls() -> int:
+    from common.clients import get_async_http_client, get_endpoint
+
+    base_url, _ = get_endpoint()
+    response = await get_async_http_client().get(f"{base_url}/_stats")
+    return response.json()["chat_completions"]
+
+
+async def measure_raw(runs: int) -> list[float]:
+    from common.clients import get_async_openai_client, get_model_name
+
+    client = get_async_openai_client()
+    timings = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        await client.chat.completions.create(model=get_model_name(), messages=RAW_MESSAGES)
+        timings.append(time.perf_counter() - start)
+    return timings[1:]
+
+
+async def measure_example(name: str, runs: int, alloc_runs: int) -> dict:
+    raw = await measure_raw(runs)
+    if name == "raw":
+        return {"runs": runs, "llm_calls": 1, "raw_ms": statistics.median(raw) * 1000, "overhead_ms": [0.0], "run_ms": [t * 1000 for t in raw], "alloc_peak_kib": 0.0, "retained_kib": 0.0}
+
+    example = runpy.run_path(str(EXAMPLES_DIR / f"{name}.py"), run_name="benchmark")
+    reset = RESETS.get(name)
+
+    async def run_once():
+        with contextlib.redirect_stdout(io.StringIO()):
+            await example["main"]()
+        if reset:
+            await reset(example)
+
+    # The first run pays for lazy imports and connection setup, so it only counts the LLM calls per run
+    calls_before = await llm_calls()
+    await run_once()
+    calls_per_run = await llm_calls() - calls_before
+
+    run_ms = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await run_once()
+        run_ms.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    peaks, retained = [], []
+    for _ in range(alloc_runs):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await run_once()
+        after, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        retained.append(after - before)
+    tracemalloc.stop()
+
+    raw_ms = statistics.median(raw) * 1000
+    return {
+        "runs": runs,
+        "llm_calls": calls_per_run,
+        "raw_ms": raw_ms,
+        "overhead_ms": [ms - calls_per_run * raw_ms for ms in run_ms],
+        "run_ms": run_ms,
+        "alloc_peak_kib": statistics.median(peaks) / 1024,
+        "retained_kib": statistics.median(retained) / 1024,
+    }
+
+
+def child(name: str, runs: int, alloc_runs: int):
+    """Runs in the subprocess: measures one example and prints the result as JSON on the last line."""
+    result = asyncio.run(measure_example(name, runs, alloc_runs))
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mib"] = maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    print(json.dumps(result))
+
+
+def run_child(name: str, args: argparse.Namespace, base_url: str) -> dict:
+    env = {**os.environ, "API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": base_url}
+    command = [sys.executable, __file__, "--child", name, "--runs", str(args.runs), "--alloc-runs", str(args.alloc_runs)]
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": (result.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("examples", nargs="*", help="Examples to measure (default: all of them).")
+    parser.add_argument("--runs", type=int, default=30, help="Timed runs per example.")
+    parser.add_argument("--alloc-runs", type=int, default=5, help="Runs per example under tracemalloc.")
+    parser.add_argument("--ttft", type=float, default=0.0, help="Mock time to first token, in seconds.")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Mock seconds per generated token.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.runs, args.alloc_runs)
+        return
+
+    options = MockOptions(script=SCRIPT, ttft=args.ttft, token_latency=args.token_latency)
+    selected = set(args.examples)
+    print(f"{'task':<17}{'example':<24}{'calls':>6}{'raw ms':>8}{'p50 ms':>9}{'p95 ms':>9}{'ovh p50':>9}{'ovh p95':>9}{'alloc KiB':>11}{'kept KiB':>10}{'RSS MiB':>9}")
+    with run_in_thread(options) as server:
+        for task, names in {"baseline": ["raw"], **TASKS}.items():
+            for name in names:
+                if selected and name not in selected and name != "raw":
+                    continue
+                result = run_child(name, args, server.base_url)
+                if "error" in result:
+                    print(f"{task:<17}{name:<24}  failed: {result['error']}")
+                    continue
+                print(f"{task:<17}{name:<24}{result['llm_calls']:>6}{result['raw_ms']:>8.2f}{statistics.median(result['run_ms']):>9.2f}{percentile(result['run_ms'], 95):>9.2f}{statistics.median(result['overhead_ms']):>9.2f}{percentile(result['overhead_ms'], 95):>9.2f}{result['alloc_peak_kib']:>11.0f}{result['retained_kib']:>10.1f}{result['peak_rss_mib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Prompt tokens, latency and check cost of the history compaction of langgraph_agent.py on a long thread.
+
+langgraph_agent_async.py's graph runs one thread of --turns turns against the local mock server, each a user
+message of about --message-tokens tokens, a tool call, its result and an answer of about --answer-tokens,
+with the SQLite checkpointer. The thread is replayed with no compaction, with the oldest messages dropped
+and with them summarized once the history goes over --max-tokens. Reported per mode:
+
+* model calls and the prompt tokens they were sent (summaries included), and the tokens of the final history,
+* compactions and tokens saved: what each model call after them was spared, net of the summaries,
+* whether every tool call in the final history is still followed by its tool result, and every result
+  preceded by its call,
+* p50 turn latency over the last tenth of the turns, and p50 cost of the compaction check on the final
+  history of the uncompacted thread, with no cached token estimate and with all of them cached.
+
+    python benchmarks/history_compaction.py --turns 300 --max-tokens 4000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+WORDS = "the band played a long set of songs from every album while the crowd sang along to each chorus".split()
+
+
+def text(tokens: int, seed: int) -> str:
+    return " ".join(WORDS[(seed + index) % len(WORDS)] for index in range(tokens))
+
+
+def script(answer_tokens: int) -> dict:
+    return {
+        "rules": [
+            # The summarizer is sent a transcript of the removed messages, tool results included
+            {"match": {"contains": "tool: successfully"}, "response": {"content": text(150, 7)}},
+            {"match": {"last_role": "user"}, "response": {"tool_calls": [{"name": "play_song_on_spotify", "arguments": {"song": "Anti-Hero"}}]}},
+            {"match": {"last_role": "tool"}, "response": {"content": text(answer_tokens, 3)}},
+        ]
+    }
+
+
+def pairs_intact(messages: list) -> bool:
+    expected: list[str] = []
+    for message in messages:
+        if message.type == "tool":
+            if not expected or expected.pop(0) != message.tool_call_id:
+                return False
+            continue
+        if expected:
+            return False
+        expected = [call["id"] for call in getattr(message, "tool_calls", None) or []]
+    return not expected
+
+
+def check_time(compactor, messages: list, cached: bool, rounds: int = 200) -> float:
+    """p50 µs of a compaction check that finds the history under the budget."""
+    timings = []
+    for _ in range(rounds):
+        if not cached:
+            compactor._tokens.clear()
+        start = time.perf_counter()
+        compactor.plan(messages)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+async def run_thread(app, turns: int, message_tokens: int) -> tuple[list[float], list]:
+    from langchain_core.messages import HumanMessage
+
+    config = {"configurable": {"thread_id": "long"}}
+    latencies = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        await app.ainvoke({"messages": [HumanMessage(f"Turn {turn}: can you play the song about {text(message_tokens, turn)}?")]}, config)
+        latencies.append(time.perf_counter() - start)
+    return latencies, (await app.aget_state(config)).values["messages"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--message-tokens", type=int, default=60, help="Words in each user message.")
+    parser.add_argument("--answer-tokens", type=int, default=120, help="Words in each answer.")
+    parser.add_argument("--max-tokens", type=int, default=4000, help="History tokens that trigger a compaction.")
+    parser.add_argument("--target-tokens", type=int, default=None, help="Tokens left after a compaction (default half of --max-tokens).")
+    parser.add_argument("--ttft", type=float, default=0.0, help="Mock latency per model call, in seconds.")
+    args = parser.parse_args()
+
+    with run_in_thread(MockOptions(ttft=args.ttft, script=script(args.answer_tokens))) as server, tempfile.TemporaryDirectory() as directory:
+        os.environ.update({"API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": server.base_url, "PARALLEL_TOOL_CALLS": "off"})
+        from common.history_compaction import HistoryCompactor
+        from common.sqlite_checkpointer import SqliteDeltaSaver
+        from langgraph_agent_async import build_app, chat_model
+
+        modes = {
+            "none": HistoryCompactor(max_tokens=None),
+            "trim": HistoryCompactor(args.max_tokens, args.target_tokens),
+            "summary": HistoryCompactor(args.max_tokens, args.target_tokens, model=chat_model),
+        }
+        print(f"{'mode':<9}{'model calls':>12}{'prompt tokens':>14}{'final tokens':>13}{'compactions':>12}{'tokens saved':>13}{'pairs ok':>9}{'turn p50 ms':>12}")
+        uncompacted = []
+        with asyncio.Runner() as runner:
+            for mode, compactor in modes.items():
+                server.reset_stats()
+                checkpointer = SqliteDeltaSaver(Path(directory) / f"{mode}.sqlite3")
+                latencies, messages = runner.run(run_thread(build_app(checkpointer, compactor), args.turns, args.message_tokens))
+                checkpointer.close()
+                uncompacted = uncompacted or messages
+                stats = compactor.stats()
+                final = sum(compactor.estimate(message) for message in messages)
+                print(f"{mode:<9}{server.stats['chat_completions']:>12}{server.stats['prompt_tokens']:>14}{final:>13}{stats['compactions']:>12}{stats['tokens_saved']:>13}{'yes' if pairs_intact(messages) else 'no':>9}{statistics.median(latencies[-max(1, args.turns // 10) :]) * 1000:>12.1f}")
+        checker = HistoryCompactor(max_tokens=sys.maxsize)
+        cold, warm = check_time(checker, uncompacted, cached=False), check_time(checker, uncompacted, cached=True)
+        print(f"\ncompaction check on {len(uncompacted)} messages: {cold:.0f} µs with no cached estimate, {warm:.0f} µs with all of them cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Import-time budget check for the examples.
+
+For each example, the top-level imports are read from the source (without running the script)
+and executed in a fresh interpreter under `python -X importtime`. The cumulative import time
+is compared against the budget in import_budgets.json, and the script exits with status 1
+when any example goes over its budget.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py openai_functioncalling llamaindex --top 10
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+EXAMPLES_DIR = ROOT_DIR / "examples"
+BUDGETS_PATH = Path(__file__).resolve().parent / "import_budgets.json"
+
+
+def top_level_imports(path: Path) -> list[str]:
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and not (isinstance(node, ast.ImportFrom) and node.module == "__future__"):
+            statements.append(ast.unparse(node))
+    return statements
+
+
+def importtime(code: str, cwd: Path) -> list[tuple[float, str]]:
+    """Runs code under -X importtime and returns the (cumulative ms, module) of each top-level import."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd, env={**os.environ, "API_HOST": os.getenv("API_HOST", "github")}, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # Nested imports are indented under the module that triggered them
+        if not name.startswith("  "):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return modules
+
+
+def measure(path: Path, startup_modules: set[str]) -> tuple[float, list[tuple[float, str]]]:
+    """Returns the total import time in ms of an example's top-level imports and the heaviest modules first."""
+    modules = [(ms, name) for ms, name in importtime("\n".join(top_level_imports(path)), path.parent) if name not in startup_modules]
+    return sum(ms for ms, _ in modules), sorted(modules, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("examples", nargs="*", help="Examples to check (default: all English examples).")
+    parser.add_argument("--top", type=int, default=3, help="Number of heaviest imports to show per example.")
+    args = parser.parse_args()
+
+    budgets = json.loads(BUDGETS_PATH.read_text())
+    names = args.examples or [path.stem for path in sorted(EXAMPLES_DIR.glob("*.py")) if not path.name.startswith("_")]
+
+    # Modules the interpreter imports at startup are not charged to the examples
+    startup_modules = {name for _, name in importtime("pass", EXAMPLES_DIR)}
+
+    over_budget = []
+    print(f"{'example':<28}{'import ms':>10}{'budget ms':>10}  heaviest imports")
+    for name in names:
+        try:
+            total_ms, packages = measure(EXAMPLES_DIR / f"{name}.py", startup_modules)
+        except RuntimeError as e:
+            print(f"{name:<28}{'-':>10}{'-':>10}  import failed: {e}")
+            over_budget.append(name)
+            continue
+        budget_ms = budgets["examples"].get(name, budgets["default_ms"])
+        heaviest = ", ".join(f"{package} {ms:.0f}" for ms, package in packages[: args.top])
+        status = "" if total_ms <= budget_ms else "  OVER BUDGET"
+        print(f"{name:<28}{total_ms:>10.0f}{budget_ms:>10}  {heaviest}{status}")
+        if total_ms > budget_ms:
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"\n{len(over_budget)} example(s) over their import-time budget or failing to import: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Throughput and per-thread latency of the async LangGraph agent serving many conversation threads on one event loop.
+
+langgraph_agent_async.py's graph runs against the local mock server, which answers each model call after
+--ttft seconds. For each count of --sessions, that many thread_ids each run --turns turns one after the
+other, driven with astream, all on the same event loop. A turn is two model calls (the tool call, then
+the answer) and a tool, so it cannot take less than 2 x --ttft. Reported per session count:
+
+* turns/s over the whole run, and p50/p95/p99/max latency of a turn,
+* slowdown: p50 turn latency over the 2 x --ttft floor,
+* loop lag: p95 delay of a 10 ms timer on the loop, which grows once the loop is busy with CPU work,
+* the largest number of model requests in flight at once.
+
+The shared clients allow CLIENT_MAX_PER_ENDPOINT requests in flight per host (8 by default), which caps
+throughput at that many / --ttft model calls per second; --max-in-flight sets it, and the connection pool
+size, for the run. Raising it far past what the loop can keep busy costs throughput rather than adding
+any: the HTTP connection pool scans its connections for every queued request, so with hundreds of
+connections the loop spends its time there (on one core, 32 in flight served 28 turns/s and 512 only 9).
+
+    python benchmarks/langgraph_sessions.py --sessions 1 10 100 300 --turns 3 --ttft 0.5 --max-in-flight 32
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from ann_recall import percentile  # noqa: E402
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+
+async def session(app, thread_id: str, turns: int, latencies: list[float]):
+    from langchain_core.messages import HumanMessage
+
+    config = {"configurable": {"thread_id": thread_id}}
+    for turn in range(turns):
+        start = time.perf_counter()
+        async for _ in app.astream({"messages": [HumanMessage(f"Can you play Taylor Swift's song number {turn}?")]}, config, stream_mode="values"):
+            pass
+        latencies.append(time.perf_counter() - start)
+
+
+async def loop_lag(lags: list[float], interval: float = 0.01):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(app, sessions: int, turns: int, prefix: str) -> tuple[float, list[float], list[float]]:
+    latencies, lags = [], []
+    ticker = asyncio.create_task(loop_lag(lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(session(app, f"{prefix}-{i}", turns, latencies) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    ticker.cancel()
+    return elapsed, latencies, lags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100, 300], help="Concurrent thread_ids.")
+    parser.add_argument("--turns", type=int, default=3, help="Turns of each thread.")
+    parser.add_argument("--ttft", type=float, default=0.5, help="Mock latency per model call, in seconds.")
+    parser.add_argument("--max-in-flight", type=int, default=32, help="Model requests allowed in flight (CLIENT_MAX_PER_ENDPOINT and CLIENT_MAX_CONNECTIONS).")
+    parser.add_argument("--checkpointer", choices=["memory", "sqlite"], default="sqlite")
+    args = parser.parse_args()
+
+    with run_in_thread(MockOptions(ttft=args.ttft)) as server, tempfile.TemporaryDirectory() as directory:
+        os.environ.update(
+            {
+                "API_HOST": "local",
+                "LOCAL_OPENAI_ENDPOINT": server.base_url,
+                "CLIENT_MAX_PER_ENDPOINT": str(args.max_in_flight),
+                "CLIENT_MAX_CONNECTIONS": str(args.max_in_flight),
+                "CLIENT_MAX_KEEPALIVE": str(args.max_in_flight),
+            }
+        )
+        from common.clients import get_retry_policy
+        from common.sqlite_checkpointer import SqliteDeltaSaver
+        from langgraph.checkpoint.memory import MemorySaver
+        from langgraph_agent_async import build_app
+
+        checkpointer = MemorySaver() if args.checkpointer == "memory" else SqliteDeltaSaver(Path(directory) / "checkpoints.sqlite3")
+        app = build_app(checkpointer)
+        floor = 2 * args.ttft
+        print(f"{'sessions':>9}{'turns':>7}{'turns/s':>9}{'p50 s':>7}{'p95 s':>7}{'p99 s':>7}{'max s':>7}{'slowdown':>10}{'loop lag p95 ms':>17}{'max in flight':>15}")
+        with asyncio.Runner() as runner:
+            for sessions in args.sessions:
+                get_retry_policy().counts["max_in_flight"] = 0
+                elapsed, latencies, lags = runner.run(run(app, sessions, args.turns, f"s{sessions}"))
+                in_flight = get_retry_policy().stats()["max_in_flight"]
+                print(f"{sessions:>9}{len(latencies):>7}{len(latencies) / elapsed:>9.1f}{statistics.median(latencies):>7.2f}{percentile(latencies, 0.95):>7.2f}{percentile(latencies, 0.99):>7.2f}{max(latencies):>7.2f}{statistics.median(latencies) / floor:>9.2f}x{percentile(lags, 0.95) * 1000:>17.1f}{in_flight:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Startup time of the llama-index handbook indexes: cold, warm and incremental, against the local mock server.
+
+Each scenario works on a copy of the example PDFs in a temporary directory:
+
+* rebuild: what llamaindex.py used to do on every run (parse, embed everything, persist),
+* cold: first run of load_or_build_index() with an empty storage directory,
+* warm: second run, nothing changed,
+* incremental: a page is appended to one PDF, so only that file is parsed and only the new page embedded.
+
+    python benchmarks/llamaindex_startup.py --ttft 0.2
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+PDFS = ["employee_handbook.pdf", "PerksPlus.pdf"]
+
+
+def append_page(path: Path):
+    writer = PdfWriter(clone_from=PdfReader(path))
+    writer.add_page(PdfReader(ROOT_DIR / "example_data" / PDFS[1]).pages[0])
+    writer.write(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttft", type=float, default=0.1, help="Mock latency per embedding request, in seconds.")
+    args = parser.parse_args()
+
+    with run_in_thread(MockOptions(ttft=args.ttft)) as server, tempfile.TemporaryDirectory() as directory:
+        os.environ.update({"API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": server.base_url})
+        from common.clients import get_embedding_model_name, llamaindex_embed_model
+        from common.llamaindex_ingestion import load_or_build_index
+        from llama_index.core import Settings, SimpleDirectoryReader, VectorStoreIndex
+
+        Settings.embed_model = llamaindex_embed_model()
+        data_dir = Path(directory) / "data"
+        data_dir.mkdir()
+        for name in PDFS:
+            shutil.copy(ROOT_DIR / "example_data" / name, data_dir / name)
+        files = [data_dir / name for name in PDFS]
+
+        print(f"{'scenario':<14}{'seconds':>9}{'pages':>7}{'embedded':>10}{'requests':>10}")
+
+        def run(label, build):
+            requests_before = server.stats["embeddings"]
+            start = time.perf_counter()
+            pages, embedded = build()
+            print(f"{label:<14}{time.perf_counter() - start:>9.2f}{pages:>7}{embedded:>10}{server.stats['embeddings'] - requests_before:>10}")
+
+        def rebuild():
+            pages = 0
+            for i, path in enumerate(files):
+                docs = SimpleDirectoryReader(input_files=[path]).load_data()
+                VectorStoreIndex.from_documents(docs).storage_context.persist(persist_dir=str(Path(directory) / f"rebuild{i}"))
+                pages += len(docs)
+            return pages, pages
+
+        def ingest():
+            reports = [load_or_build_index([path], Path(directory) / f"docs{i + 1}", get_embedding_model_name())[1] for i, path in enumerate(files)]
+            return sum(r.pages for r in reports), sum(r.pages_embedded for r in reports)
+
+        run("rebuild", rebuild)
+        run("cold", ingest)
+        run("warm", ingest)
+        append_page(files[0])
+        run("incremental", ingest)
+        run("warm", ingest)
+
+
+if __name__ == "__main__":
+    main()
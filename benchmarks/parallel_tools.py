@@ -0,0 +1,137 @@
+"""
+Latency of a langgraph_agent.py turn that needs several slow tools, one tool call per model round trip
+(the default) against parallel tool calls run at the same time.
+
+The graph is langgraph_agent.py's agent/action loop, with --tools stand-in "play the song on <service>"
+tools that each take --tool-latency seconds, sync (time.sleep) or async (asyncio.sleep). The mock server
+plays the model, which asks for every tool:
+
+* sequential: parallel_tool_calls=False, so one tool per model call, with ToolNode (--tools + 1 model calls),
+* parallel: all the tool calls in the first answer (2 model calls), run by LangGraph's ToolNode or by
+  ConcurrentToolNode of common/langgraph_tools.py, with the graph invoked sync or async.
+
+For ConcurrentToolNode, "tool s" is the wall time of the tool calls of a turn and "sum s" what running
+them one after the other takes. "ordered" checks that every run added the tool results in the order of
+the tool calls.
+
+    python benchmarks/parallel_tools.py --tools 4 --tool-latency 0.5 --ttft 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from ann_recall import percentile  # noqa: E402
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+SERVICES = ["spotify", "apple", "youtube", "tidal", "deezer", "pandora", "soundcloud", "amazon"]
+ANSWER = {"content": "I started the song on every service."}
+CONFIGS = [
+    ("sequential", "ToolNode", "sync", "invoke"),
+    ("parallel", "ToolNode", "sync", "invoke"),
+    ("parallel", "ToolNode", "async", "ainvoke"),
+    ("parallel", "ConcurrentToolNode", "sync", "invoke"),
+    ("parallel", "ConcurrentToolNode", "async", "invoke"),
+    ("parallel", "ConcurrentToolNode", "async", "ainvoke"),
+]
+
+
+def make_tools(count: int, latency: float, kind: str) -> list:
+    from langchain_core.tools import StructuredTool
+
+    tools = []
+    for service in SERVICES[:count]:
+
+        def play(song: str, service=service) -> str:
+            time.sleep(latency)
+            return f"Successfully played {song} on {service}!"
+
+        async def aplay(song: str, service=service) -> str:
+            await asyncio.sleep(latency)
+            return f"Successfully played {song} on {service}!"
+
+        function = {"func": play} if kind == "sync" else {"coroutine": aplay}
+        tools.append(StructuredTool.from_function(**function, name=f"play_song_on_{service}", description=f"Play a song on {service}"))
+    return tools
+
+
+def script(mode: str, tools: list) -> dict:
+    calls = [{"name": tool.name, "arguments": {"song": "Anti-Hero"}} for tool in tools]
+    if mode == "sequential":
+        return {"rules": [{"match": {"last_role": "user"}, "response": {"tool_calls": calls[:1]}}, {"match": {"last_role": "tool"}, "responses": [{"tool_calls": [call]} for call in calls[1:]] + [ANSWER]}]}
+    return {"rules": [{"match": {"last_role": "user"}, "response": {"tool_calls": calls}}, {"match": {"last_role": "tool"}, "response": ANSWER}]}
+
+
+def build_app(model, tools: list, mode: str, node: str, invoke: str):
+    from common.langgraph_tools import ConcurrentToolNode
+    from langgraph.graph import END, START, MessagesState, StateGraph
+    from langgraph.prebuilt import ToolNode
+
+    bound = model.bind_tools(tools, parallel_tool_calls=mode == "parallel")
+
+    def call_model(state):
+        return {"messages": [bound.invoke(state["messages"])]}
+
+    async def acall_model(state):
+        return {"messages": [await bound.ainvoke(state["messages"])]}
+
+    tool_node = ConcurrentToolNode(tools) if node == "ConcurrentToolNode" else ToolNode(tools)
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("agent", acall_model if invoke == "ainvoke" else call_model)
+    workflow.add_node("action", tool_node)
+    workflow.add_edge(START, "agent")
+    workflow.add_conditional_edges("agent", lambda state: "continue" if state["messages"][-1].tool_calls else "end", {"continue": "action", "end": END})
+    workflow.add_edge("action", "agent")
+    return workflow.compile(), tool_node
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", type=int, default=4, choices=range(1, len(SERVICES) + 1))
+    parser.add_argument("--tool-latency", type=float, default=0.5, help="Seconds each tool takes.")
+    parser.add_argument("--ttft", type=float, default=0.2, help="Mock latency per model call, in seconds.")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with run_in_thread(MockOptions(ttft=args.ttft)) as server:
+        os.environ.update({"API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": server.base_url})
+        from common.clients import langchain_chat_model
+        from langchain_core.messages import HumanMessage
+
+        model = langchain_chat_model()
+        # One loop for every async run, so they all reuse its connection pool
+        loop = asyncio.new_event_loop()
+        print(f"{'tool calls':<12}{'node':<20}{'tools':<7}{'graph':<9}{'model calls':>12}{'tool msgs':>10}{'ordered':>8}{'p50 s':>7}{'p95 s':>7}{'tool s':>8}{'sum s':>7}")
+        for mode, node, kind, invoke in CONFIGS:
+            tools = make_tools(args.tools, args.tool_latency, kind)
+            app, tool_node = build_app(model, tools, mode, node, invoke)
+            server.options.script = script(mode, tools)
+            server.reset_stats()
+            timings, tool_messages, ordered = [], 0, True
+            for _ in range(args.rounds):
+                server.reset_stats()
+                inputs = {"messages": [HumanMessage("Can you play Anti-Hero on every music service?")]}
+                start = time.perf_counter()
+                result = loop.run_until_complete(app.ainvoke(inputs)) if invoke == "ainvoke" else app.invoke(inputs)
+                timings.append(time.perf_counter() - start)
+                tool_messages = sum(message.type == "tool" for message in result["messages"])
+                call_ids = [call["id"] for message in result["messages"] if message.type == "ai" for call in message.tool_calls]
+                ordered &= [message.tool_call_id for message in result["messages"] if message.type == "tool"] == call_ids
+            calls = server.stats["chat_completions"]
+            turns = getattr(tool_node, "turns", [])
+            tool_time = f"{statistics.median(turn.wall_time for turn in turns):>8.2f}{statistics.median(turn.sequential_time for turn in turns):>7.2f}" if turns else f"{'-':>8}{'-':>7}"
+            print(f"{mode:<12}{node:<20}{kind:<7}{invoke:<9}{calls:>12}{tool_messages:>10}{'yes' if ordered else 'no':>8}{statistics.median(timings):>7.2f}{percentile(timings, 0.95):>7.2f}{tool_time}")
+            if turns:
+                tool_node.close()
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Pages per second and peak memory of PDF ingestion: SimpleDirectoryReader against the streaming, process-pool pipeline.
+
+A document drop is simulated with --copies renamed copies of the two handbook PDFs. Each scenario runs in a
+fresh process, so its peak RSS is its own:
+
+* parse, reader: SimpleDirectoryReader(...).load_data(), every page parsed in this process and kept in memory,
+* parse, stream xN: common/llamaindex_ingestion.py's iter_pages() with N worker processes, pages dropped as they arrive,
+* index, reader: load_data() then VectorStoreIndex.from_documents(), what llamaindex.py used to do,
+* index, stream xN: load_or_build_index(), pages streamed through chunking and embedding in batches.
+
+Embeddings come from the local mock server, without the on-disk embedding cache.
+
+    python benchmarks/pdf_ingestion.py --copies 20 --workers 1 4
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+PDFS = ["employee_handbook.pdf", "PerksPlus.pdf"]
+
+
+def child(scenario: str, workers: int, directory: Path):
+    from common.llamaindex_ingestion import iter_pages, load_or_build_index, peak_rss_mb
+    from common.numpy_vector_store import NumpyVectorStore
+    from llama_index.core import Settings, SimpleDirectoryReader, StorageContext, VectorStoreIndex
+
+    files = sorted((directory / "drop").iterdir())
+    if scenario.startswith("index"):
+        from common.clients import llamaindex_embed_model
+
+        Settings.embed_model = llamaindex_embed_model()
+
+    start = time.perf_counter()
+    if scenario == "parse-reader":
+        pages = len(SimpleDirectoryReader(input_files=files).load_data())
+    elif scenario == "parse-stream":
+        pages = sum(1 for _ in iter_pages(files, workers=workers))
+    elif scenario == "index-reader":
+        documents = SimpleDirectoryReader(input_files=files).load_data()
+        VectorStoreIndex.from_documents(documents, storage_context=StorageContext.from_defaults(vector_store=NumpyVectorStore()))
+        pages = len(documents)
+    else:
+        os.environ["PARSE_WORKERS"] = str(workers)
+        pages = load_or_build_index(files, directory / f"index-{workers}", "local-hash-embedding")[1].pages
+    seconds = time.perf_counter() - start
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1024)
+    print(json.dumps({"pages": pages, "seconds": seconds, "peak_rss_mb": peak_rss_mb(), "worker_peak_rss_mb": children}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=20, help="Copies of each handbook PDF in the document drop.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1], help="Worker process counts to compare.")
+    parser.add_argument("--ttft", type=float, default=0.05, help="Mock latency per embedding request, in seconds.")
+    parser.add_argument("--child", nargs=3, metavar=("SCENARIO", "WORKERS", "DIRECTORY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]), Path(args.child[2]))
+        return
+
+    with run_in_thread(MockOptions(ttft=args.ttft)) as server, tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        (directory / "drop").mkdir()
+        for copy in range(args.copies):
+            for name in PDFS:
+                shutil.copy(ROOT_DIR / "example_data" / name, directory / "drop" / f"{copy:03d}-{name}")
+
+        env = {**os.environ, "API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": server.base_url, "EMBEDDING_CACHE": "off"}
+        workers = sorted(set(args.workers))
+        scenarios = [("parse-reader", 1)] + [("parse-stream", n) for n in workers] + [("index-reader", 1)] + [("index-stream", n) for n in workers]
+        print(f"{'scenario':<20}{'pages':>7}{'seconds':>9}{'pages/s':>9}{'peak RSS MB':>13}{'worker peak MB':>16}")
+        for scenario, count in scenarios:
+            command = [sys.executable, __file__, "--child", scenario, str(count), str(directory)]
+            result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True, env=env).stdout.strip().splitlines()[-1])
+            label = scenario.replace("-", ", ") + (f" x{count}" if "stream" in scenario else "")
+            worker_peak = f"{result['worker_peak_rss_mb']:.0f}" if "stream" in scenario and count > 1 else "-"
+            print(f"{label:<20}{result['pages']:>7}{result['seconds']:>9.2f}{result['pages'] / result['seconds']:>9.1f}{result['peak_rss_mb']:>13.0f}{worker_peak:>16}")
+
+
+if __name__ == "__main__":
+    main()
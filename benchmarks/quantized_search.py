@@ -0,0 +1,113 @@
+"""
+Memory, latency and recall of the quantized indexes of the NumPy vector store against exact float32 search.
+
+A synthetic, clustered corpus of normalized embeddings is persisted as one NumpyVectorStore, and the int8
+and binary indexes are built and saved next to it. Each search then runs in a fresh process that loads the
+store (the full vectors memory-mapped, the quantized codes in memory) and answers noisy copies of random
+chunks, reporting p50/p95 latency and recall@k against the exact top k.
+
+"hot MB" is what a search reads on every query and so needs in RAM to stay fast: all the vectors for the
+exact search, the quantized codes for the others (plus a few shortlisted rows, read from the file). The
+private and mapped-file resident memory of the search process are reported too. The mapped figure
+overstates what the quantized searches read: the kernel maps up to 64 KB of already cached file around
+every row touched.
+
+    python benchmarks/quantized_search.py --rows 100000 --dimensions 1536 --k 10
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from ann_recall import percentile, write_corpus  # noqa: E402
+from common.numpy_vector_store import NumpyVectorStore, index_path  # noqa: E402
+
+INDEXES = ["exact", "int8", "binary"]
+
+
+def memory_mb() -> tuple[float, float]:
+    """Resident private memory and resident pages of mapped files of this process, from /proc (Linux)."""
+    fields = dict(line.split(":", 1) for line in Path("/proc/self/status").read_text().splitlines() if ":" in line)
+    return int(fields["RssAnon"].split()[0]) / 1024, int(fields["RssFile"].split()[0]) / 1024
+
+
+def child(index: str, directory: Path, k: int, oversample: int | None):
+    from llama_index.core.vector_stores import VectorStoreQuery
+
+    queries = np.load(directory / "queries.npy")
+    anon_before, file_before = memory_mb()
+    store = NumpyVectorStore.from_persist_dir(directory / "store", index=index)
+    if oversample:
+        store.search_index.oversample = oversample
+    results, timings = [], []
+    for query in queries.tolist():
+        start = time.perf_counter()
+        results.append(store.query(VectorStoreQuery(query_embedding=query, similarity_top_k=k)).ids)
+        timings.append((time.perf_counter() - start) * 1000)
+    anon, mapped = memory_mb()
+    print(json.dumps({"ids": results, "timings": timings, "anon": anon - anon_before, "file": mapped - file_before, "index_mb": store.index_nbytes / 1e6}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dimensions", type=int, default=1536, help="Embedding size (1536 for text-embedding-3-small).")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversample", type=int, nargs="*", default=[], help="Shortlist sizes (x k) to try, instead of each index's default.")
+    parser.add_argument("--spread", type=float, default=1.5, help="Spread of the chunks around their topic, relative to the distance between topics.")
+    parser.add_argument("--query-noise", type=float, default=1.0, help="Distance of a query from the chunk it was made from, relative to the chunk's length.")
+    parser.add_argument("--child", nargs=3, metavar=("INDEX", "DIRECTORY", "OVERSAMPLE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], Path(args.child[1]), args.k, int(args.child[2]))
+        return
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        print(f"Writing {args.rows} x {args.dimensions} embeddings...")
+        vectors = write_corpus(directory / "corpus.npy", args.rows, args.dimensions, args.spread, rng)
+        picks = vectors[rng.integers(args.rows, size=args.queries)] + args.query_noise / args.dimensions**0.5 * rng.standard_normal((args.queries, args.dimensions), dtype=np.float32)
+        np.save(directory / "queries.npy", picks / np.linalg.norm(picks, axis=1, keepdims=True))
+        ids = [str(i) for i in range(args.rows)]
+        NumpyVectorStore("float32", vectors, ids, ids).persist(str(directory / "store" / "default__vector_store.json"))
+        (directory / "corpus.npy").unlink()
+        del vectors
+
+        builds = {}
+        for index in INDEXES[1:]:
+            store = NumpyVectorStore.from_persist_dir(directory / "store", index=index)
+            start = time.perf_counter()
+            store.build_index()
+            builds[index] = time.perf_counter() - start
+            store.search_index.save(index_path(directory / "store", index))
+
+        vectors_mb = args.rows * args.dimensions * 4 / 1e6
+        print(f"\n{'search':<20}{'build s':>9}{'hot MB':>9}{'reduction':>11}{'private MB':>12}{'mapped MB':>11}{'recall@' + str(args.k):>11}{'p50 ms':>9}{'p95 ms':>9}")
+        truth = None
+        runs = [("exact", 0)] + [(index, oversample) for index in INDEXES[1:] for oversample in (args.oversample or [0])]
+        for index, oversample in runs:
+            command = [sys.executable, __file__, "--child", index, str(directory), str(oversample), "--k", str(args.k)]
+            result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+            if truth is None:
+                truth = result["ids"]
+            recall = statistics.mean(len(set(found) & set(expected)) / len(expected) for found, expected in zip(result["ids"], truth))
+            label = index + (f" x{oversample}" if oversample else "")
+            hot_mb = result["index_mb"] if index != "exact" else vectors_mb
+            print(f"{label:<20}{builds.get(index, 0):>9.2f}{hot_mb:>9.1f}{vectors_mb / hot_mb:>10.0f}x{result['anon']:>12.0f}{result['file']:>11.0f}{recall:>11.3f}{statistics.median(result['timings']):>9.2f}{percentile(result['timings'], 0.95):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
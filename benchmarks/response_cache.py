@@ -0,0 +1,108 @@
+"""
+Measures the on-disk chat-completions cache from common/response_cache.py against the local mock server.
+
+A set of distinct prompts is sent twice through the shared sync client (cold, then warm cache) and once
+through the async client, then several processes replay the prompts at the same time against one cache
+file, and finally a small entry cap shows the LRU evictions.
+
+    python benchmarks/response_cache.py --prompts 50 --ttft 0.2
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "examples"))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+
+def prompts(count: int) -> list[list[dict]]:
+    return [[{"role": "user", "content": f"Give me tip number {i} for learning Spanish."}] for i in range(count)]
+
+
+def run_sync(count: int, offset: int = 0) -> list[float]:
+    from common.clients import get_model_name, get_openai_client
+
+    client = get_openai_client()
+    timings = []
+    messages_list = prompts(count)
+    for messages in messages_list[offset:] + messages_list[:offset]:
+        start = time.perf_counter()
+        client.chat.completions.create(model=get_model_name(), messages=messages, temperature=0)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def run_async(count: int) -> list[float]:
+    from common.clients import get_async_openai_client, get_model_name
+
+    client = get_async_openai_client()
+
+    async def one(messages):
+        start = time.perf_counter()
+        await client.chat.completions.create(model=get_model_name(), messages=messages, temperature=0)
+        return (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(one(messages) for messages in prompts(count)))
+
+
+def replay(count: int, offset: int, queue):
+    from common.clients import get_response_cache
+
+    run_sync(count, offset)
+    queue.put(get_response_cache().stats())
+
+
+def report(label: str, timings: list[float], stats: dict):
+    print(f"{label:<28}{statistics.median(timings):>9.2f}{max(timings):>9.2f}{stats['hits']:>7}{stats['misses']:>8}{stats['hit_ratio']:>7.0%}{stats['entries']:>9}{stats['bytes'] / 1024:>9.1f}{stats['evictions']:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=50)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Mock time to first token, in seconds.")
+    args = parser.parse_args()
+
+    with run_in_thread(MockOptions(ttft=args.ttft)) as server, tempfile.TemporaryDirectory() as directory:
+        os.environ.update({"API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": server.base_url, "RESPONSE_CACHE": "on", "RESPONSE_CACHE_PATH": str(Path(directory) / "responses.sqlite3")})
+        from common.clients import get_response_cache
+
+        cache = get_response_cache()
+        print(f"{'run':<28}{'p50 ms':>9}{'max ms':>9}{'hits':>7}{'misses':>8}{'ratio':>7}{'entries':>9}{'KiB':>9}{'evictions':>11}")
+        report("sync, cold cache", run_sync(args.prompts), cache.stats())
+        cache.counts.clear()
+        report("sync, warm cache", run_sync(args.prompts), cache.stats())
+        cache.counts.clear()
+        report("async, warm, all at once", asyncio.run(run_async(args.prompts)), cache.stats())
+
+        # Several processes reading and writing the same cache file at once, each starting at a different prompt
+        cache.clear()
+        upstream_calls = server.stats["chat_completions"]
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        start = time.perf_counter()
+        workers = [context.Process(target=replay, args=(args.prompts, i * args.prompts // args.processes, queue)) for i in range(args.processes)]
+        for worker in workers:
+            worker.start()
+        results = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        hits, misses = sum(r["hits"] for r in results), sum(r["misses"] for r in results)
+        print(f"\n{args.processes} processes, {args.prompts} prompts each: {hits} hits, {misses} misses, {results[0]['entries']} entries, {server.stats['chat_completions'] - upstream_calls} upstream calls, {time.perf_counter() - start:.2f} s")
+
+        cache.max_entries = args.prompts // 5
+        cache.clear()
+        cache.counts.clear()
+        report(f"\nsync, max {cache.max_entries} entries", run_sync(args.prompts), cache.stats())
+
+
+if __name__ == "__main__":
+    main()
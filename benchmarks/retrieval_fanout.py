@@ -0,0 +1,102 @@
+"""
+LLM calls and latency of a ReAct agent answering questions about both handbook PDFs: one query engine tool per
+index (what llamaindex.py used to offer) against the fan-out retrieval tool of common/fanout_retrieval.py.
+
+The mock server plays the agent's LLM, consulting each tool it needs once, one ReAct step at a time:
+
+* per-index engines: engine1, then engine2, then the answer. Each engine also asks the LLM to synthesize
+  its own answer from its chunks, so a question costs 3 agent steps + 2 synthesis calls,
+* fan-out tool: one search over both indexes, retrieved concurrently and merged, then the answer.
+
+The indexes are built from the real PDFs with the mock's embeddings. The agent is llama-index's ReActAgent
+from llama_index.core.agent, which runs the same Thought/Action/Observation loop as the workflow one.
+
+    python benchmarks/retrieval_fanout.py --ttft 0.3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+QUESTIONS = [
+    "Can I get my gardening tools reimbursed, and who do I ask about it?",
+    "Does PerksPlus cover a gym membership, and what does the handbook say about workplace wellness?",
+    "How do I submit a PerksPlus claim and what is the deadline for expense reports?",
+    "Is a ski lesson reimbursable, and what are the safety policies for outdoor activities?",
+    "What is the PerksPlus yearly limit and how does it relate to my job role?",
+]
+ANSWER = "Thought: I can answer without using any more tools.\nAnswer: Yes, fitness equipment and lessons are covered up to the yearly PerksPlus limit; see HR for details."
+SYNTHESIS = {"match": {"contains": "Context information is below"}, "response": {"content": "Gardening tools are not covered by PerksPlus."}}
+
+
+def action(tool: str) -> dict:
+    return {"content": f"Thought: I need to look this up.\nAction: {tool}\nAction Input: {json.dumps({'input' if tool.startswith('engine') else 'query': 'gardening tools reimbursement'})}"}
+
+
+SCRIPTS = {
+    "per-index engines": {"rules": [SYNTHESIS, {"match": {}, "responses": [action("engine1"), action("engine2"), {"content": ANSWER}]}]},
+    "fan-out tool": {"rules": [SYNTHESIS, {"match": {}, "responses": [action("search_contoso_docs"), {"content": ANSWER}]}]},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttft", type=float, default=0.3, help="Mock latency per LLM or embedding request, in seconds.")
+    parser.add_argument("--rounds", type=int, default=3, help="Times each question is asked.")
+    args = parser.parse_args()
+
+    with run_in_thread(MockOptions(ttft=args.ttft)) as server, tempfile.TemporaryDirectory() as directory:
+        os.environ.update({"API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": server.base_url, "EMBEDDING_CACHE": "off"})
+        from common.clients import llamaindex_embed_model, llamaindex_llm
+        from common.fanout_retrieval import fanout_tool
+        from common.llamaindex_ingestion import load_or_build_index
+        from llama_index.core import Settings
+        from llama_index.core.agent import ReActAgent
+        from llama_index.core.tools import QueryEngineTool
+
+        Settings.llm = llamaindex_llm()
+        Settings.embed_model = llamaindex_embed_model()
+        index1, _ = load_or_build_index([ROOT_DIR / "example_data/employee_handbook.pdf"], Path(directory) / "docs1", "mock")
+        index2, _ = load_or_build_index([ROOT_DIR / "example_data/PerksPlus.pdf"], Path(directory) / "docs2", "mock")
+        tools = {
+            "per-index engines": [
+                QueryEngineTool.from_defaults(index1.as_query_engine(similarity_top_k=3), name="engine1", description="Contoso employee handbook."),
+                QueryEngineTool.from_defaults(index2.as_query_engine(similarity_top_k=3), name="engine2", description="Contoso PerksPlus program."),
+            ],
+            "fan-out tool": [
+                fanout_tool({"handbook": index1.as_retriever(similarity_top_k=3), "perksplus": index2.as_retriever(similarity_top_k=3)}, name="search_contoso_docs", description="Contoso handbook and PerksPlus."),
+            ],
+        }
+
+        results = {}
+        for name, script in SCRIPTS.items():
+            server.options.script = script
+            server.reset_stats()
+            timings = []
+            for _ in range(args.rounds):
+                for question in QUESTIONS:
+                    agent = ReActAgent.from_tools(tools[name], llm=Settings.llm, max_iterations=10)
+                    start = time.perf_counter()
+                    agent.chat(question)
+                    timings.append(time.perf_counter() - start)
+            results[name] = (server.stats["chat_completions"] / len(timings), server.stats["embeddings"] / len(timings), timings)
+
+    print(f"{'tools':<20}{'LLM calls/question':>20}{'embedding calls':>17}{'p50 s':>8}{'mean s':>8}")
+    for name, (llm_calls, embedding_calls, timings) in results.items():
+        print(f"{name:<20}{llm_calls:>20.1f}{embedding_calls:>17.1f}{statistics.median(timings):>8.2f}{statistics.mean(timings):>8.2f}")
+    baseline, fanout = results["per-index engines"], results["fan-out tool"]
+    print(f"\nfan-out saves {baseline[0] - fanout[0]:.1f} LLM calls and {statistics.median(baseline[2]) - statistics.median(fanout[2]):.2f} s (p50) per question")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Retrieval quality and latency of the llamaindex.py retriever configurations over the handbook PDFs, fully offline.
+
+Each question of retrieval_gold.json lists the PDF pages that answer it; a retrieved chunk is relevant when it
+comes from one of them, so the gold set holds for any chunk size. For every chunk size, the two PDFs are
+ingested into their own indexes with load_or_build_index(), as llamaindex.py does, and every retriever is
+searched through the fan-out retriever over both, reporting:
+
+* recall@k: the share of questions with a relevant chunk in the top k,
+* MRR: the mean of 1 / rank of the first relevant chunk (0 when none is in the top 10),
+* ingestion time for the chunk size (parse, chunk, embed, persist), and load time of the search index,
+* p50/p95 latency of a retrieval, including embedding the question,
+* index size on disk: the vectors and the search index, plus the BM25 index for bm25 and hybrid.
+
+Embeddings come from common/local_embeddings.py's deterministic hashed bag of words, so runs on any machine
+are comparable with each other (but not with a real embedding model, whose rankings differ).
+
+    python benchmarks/retrieval_quality.py --chunk-sizes 256 512 1024 --output results.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.local_embeddings import hash_embedding  # noqa: E402
+from llama_index.core.base.embeddings.base import BaseEmbedding  # noqa: E402
+from llama_index.core.bridge.pydantic import Field  # noqa: E402
+
+PDFS = ["employee_handbook.pdf", "PerksPlus.pdf"]
+RETRIEVERS = ["exact", "ivf", "int8", "binary", "bm25", "hybrid"]
+MAX_K = 10
+
+
+class HashEmbedding(BaseEmbedding):
+    dimensions: int = Field(default=1536)
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return hash_embedding(text, self.dimensions)
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return hash_embedding(query, self.dimensions)
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return hash_embedding(query, self.dimensions)
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return [hash_embedding(text, self.dimensions) for text in texts]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def size_kb(persist_dir: Path, retriever: str) -> float:
+    vectors = "default__vector_store.npy"
+    names = {"exact": [vectors], "bm25": ["bm25.npz"], "hybrid": [vectors, "bm25.npz"]}.get(retriever, [vectors, f"default__vector_store.{retriever}.npz"])
+    return sum((persist_dir / name).stat().st_size for name in names if (persist_dir / name).exists()) / 1024
+
+
+def make_retriever(kind: str, index: Any, persist_dir: Path):
+    from common.hybrid_retrieval import BM25_NAME, BM25Index, BM25Retriever, hybrid_retriever
+
+    if kind == "bm25":
+        return BM25Retriever(BM25Index.load(persist_dir / BM25_NAME), index.docstore, MAX_K)
+    if kind == "hybrid":
+        return hybrid_retriever(index, persist_dir, similarity_top_k=MAX_K, candidates=MAX_K)
+    return index.as_retriever(similarity_top_k=MAX_K)
+
+
+def evaluate(retriever, gold: list[dict], rounds: int) -> dict:
+    timings, ranks = [], []
+    for round_number in range(rounds):
+        for item in gold:
+            start = time.perf_counter()
+            nodes = retriever.retrieve(item["question"])
+            timings.append((time.perf_counter() - start) * 1000)
+            if round_number == 0:
+                relevant = {tuple(page) for page in item["pages"]}
+                found = [rank for rank, node in enumerate(nodes, 1) if (node.node.metadata.get("file_name"), node.node.metadata.get("page_label")) in relevant]
+                ranks.append(found[0] if found else None)
+    return {
+        **{f"recall@{k}": sum(rank is not None and rank <= k for rank in ranks) / len(ranks) for k in (1, 3, 5, 10)},
+        "mrr": statistics.mean(1 / rank if rank else 0.0 for rank in ranks),
+        "p50_ms": statistics.median(timings),
+        "p95_ms": percentile(timings, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[256, 512, 1024], help="SentenceSplitter chunk sizes, in tokens (llama-index's default is 1024).")
+    parser.add_argument("--retrievers", nargs="+", choices=RETRIEVERS, default=RETRIEVERS)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--gold", type=Path, default=Path(__file__).parent / "retrieval_gold.json")
+    parser.add_argument("--rounds", type=int, default=5, help="Times the gold set is searched; the quality metrics come from the first round.")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON, to compare runs.")
+    args = parser.parse_args()
+
+    from common.fanout_retrieval import FanOutRetriever
+    from common.llamaindex_ingestion import load_or_build_index
+    from llama_index.core import Settings
+    from llama_index.core.node_parser import SentenceSplitter
+
+    gold = json.loads(args.gold.read_text())
+    Settings.embed_model = HashEmbedding(dimensions=args.dimensions)
+    results = []
+    print(f"{'chunk':>6} {'retriever':<9}{'chunks':>7}{'ingest s':>9}{'load s':>8}{'size KB':>9}{'R@1':>6}{'R@3':>6}{'R@5':>6}{'R@10':>6}{'MRR':>6}{'p50 ms':>8}{'p95 ms':>8}")
+    for chunk_size in args.chunk_sizes:
+        Settings.transformations = [SentenceSplitter(chunk_size=chunk_size, chunk_overlap=min(200, chunk_size // 5))]
+        with tempfile.TemporaryDirectory() as directory:
+            persist_dirs = {name: Path(directory) / name for name in PDFS}
+            start = time.perf_counter()
+            for name, persist_dir in persist_dirs.items():
+                load_or_build_index([ROOT_DIR / "example_data" / name], persist_dir, f"local-hash-{args.dimensions}")
+            ingest_seconds = time.perf_counter() - start
+
+            for kind in args.retrievers:
+                start = time.perf_counter()
+                vector_index = kind if kind in ("ivf", "int8", "binary") else "exact"
+                indexes = {name: load_or_build_index([ROOT_DIR / "example_data" / name], persist_dir, f"local-hash-{args.dimensions}", vector_index=vector_index)[0] for name, persist_dir in persist_dirs.items()}
+                load_seconds = time.perf_counter() - start
+                retriever = FanOutRetriever({name: make_retriever(kind, indexes[name], persist_dirs[name]) for name in PDFS}, top_k=MAX_K)
+                metrics = evaluate(retriever, gold, args.rounds)
+                chunks = sum(index.vector_store.count for index in indexes.values())
+                size = sum(size_kb(persist_dir, kind) for persist_dir in persist_dirs.values())
+                result = {"chunk_size": chunk_size, "retriever": kind, "chunks": chunks, "ingest_seconds": ingest_seconds, "load_seconds": load_seconds, "size_kb": size, **metrics}
+                results.append(result)
+                print(f"{chunk_size:>6} {kind:<9}{chunks:>7}{ingest_seconds:>9.2f}{load_seconds:>8.2f}{size:>9.0f}{result['recall@1']:>6.2f}{result['recall@3']:>6.2f}{result['recall@5']:>6.2f}{result['recall@10']:>6.2f}{result['mrr']:>6.2f}{result['p50_ms']:>8.2f}{result['p95_ms']:>8.2f}")
+    if args.output:
+        args.output.write_text(json.dumps({"dimensions": args.dimensions, "questions": len(gold), "results": results}, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Tail latency under throttling and server errors, with and without the shared retry layer.
+
+The local mock server fails a share of the requests, either with 429 and a Retry-After header or
+with 503 and no hint. The same concurrent load is sent through a plain OpenAI client, which relies
+on the SDK's own two retries, and through the retry transport from common/resilience.py.
+
+    python benchmarks/retry_tail_latency.py --requests 300 --concurrency 32 --error-rate 0.2
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import openai
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "examples"))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+from common.resilience import AsyncRetryTransport, RetryPolicy  # noqa: E402
+
+
+async def load(client: openai.AsyncOpenAI, requests: int, concurrency: int) -> tuple[list[float], int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": f"Question {i}"}])
+                latencies.append((time.perf_counter() - start) * 1000)
+            except openai.APIError:
+                failures += 1
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, failures
+
+
+def percentile(values: list[float], percent: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1] if len(values) > 1 else (values or [float("nan")])[0]
+
+
+async def scenario(base_url: str, args, retry_layer: bool) -> dict:
+    policy = RetryPolicy(max_per_endpoint=args.concurrency)
+    if retry_layer:
+        http_client = httpx.AsyncClient(transport=AsyncRetryTransport(httpx.AsyncHTTPTransport(), policy))
+        client = openai.AsyncOpenAI(base_url=base_url, api_key="local", http_client=http_client, max_retries=0)
+    else:
+        http_client = httpx.AsyncClient()
+        client = openai.AsyncOpenAI(base_url=base_url, api_key="local", http_client=http_client)
+    start = time.perf_counter()
+    latencies, failures = await load(client, args.requests, args.concurrency)
+    elapsed = time.perf_counter() - start
+    await http_client.aclose()
+    return {"latencies": latencies, "failures": failures, "elapsed": elapsed, "retries": policy.stats()["retries"] if retry_layer else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After seconds sent with the 429s.")
+    parser.add_argument("--ttft", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'errors':<26}{'client':<16}{'ok':>6}{'failed':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'calls':>7}{'retries':>9}{'total s':>9}")
+    for label, status, retry_after in [(f"429 + Retry-After {args.retry_after:g}s", 429, args.retry_after), ("503, no Retry-After", 503, None)]:
+        options = MockOptions(ttft=args.ttft, error_rate=args.error_rate, error_status=status, retry_after=retry_after)
+        for name, retry_layer in [("SDK retries", False), ("retry layer", True)]:
+            with run_in_thread(options) as server:
+                result = asyncio.run(scenario(server.base_url, args, retry_layer))
+                calls = server.stats["chat_completions"]
+            latencies = result["latencies"]
+            retries = result["retries"] if result["retries"] is not None else calls - args.requests
+            print(f"{label:<26}{name:<16}{len(latencies):>6}{result['failures']:>8}{percentile(latencies, 50):>9.0f}{percentile(latencies, 95):>9.0f}{percentile(latencies, 99):>9.0f}{max(latencies, default=float('nan')):>9.0f}{calls:>7}{retries:>9}{result['elapsed']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
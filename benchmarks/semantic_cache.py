@@ -0,0 +1,108 @@
+"""
+Hit rate, wrong answers and latency of the semantic query cache in front of a llama-index QueryEngineTool.
+
+Employees ask a handful of questions in several wordings each, in random order. Each wording goes to a
+QueryEngineTool over the handbook PDFs (retrieval plus one synthesis call to the local mock server),
+without a cache and through a SemanticCacheTool at several similarity thresholds. The mock answers each
+topic differently, so a hit that returns another topic's answer is counted as wrong. A last pass bumps the
+index version, as a rebuild from changed files would, and the cache starts over.
+
+Embeddings go through the on-disk embedding cache, as in llamaindex.py, so a wording seen before is not
+embedded again. They are the mock's hashed bag of words: only word overlap makes two wordings similar, so the
+thresholds that suit them are lower than for a real embedding model.
+
+    python benchmarks/semantic_cache.py --questions 200 --thresholds 0.6 0.7 0.8 0.9
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.mock_server import MockOptions, run_in_thread  # noqa: E402
+
+# Topics and the wordings employees use for them
+TOPICS = {
+    "gardening": ["can i get my gardening tools reimbursed?", "Can I get my gardening tools reimbursed", "are gardening tools reimbursed?", "can my gardening tools be reimbursed by perksplus?"],
+    "ski": ["is a ski lesson covered?", "Is a ski lesson covered by PerksPlus?", "are ski lessons covered?", "can i get a ski lesson covered"],
+    "vacation": ["how many vacation days do i get?", "How many vacation days do I get", "how many vacation days do employees get?", "vacation days: how many do i get?"],
+    "safety": ["who do i report a safety incident to?", "Who do I report a safety incident to", "who should i report a safety incident to?", "report a safety incident to who?"],
+    "gym": ["does perksplus pay for a gym membership?", "Does PerksPlus pay for a gym membership", "will perksplus pay for my gym membership?", "gym membership: does perksplus pay for it?"],
+}
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run(tool, workload: list[tuple[str, str]]) -> dict:
+    timings, wrong = [], 0
+    for topic, question in workload:
+        start = time.perf_counter()
+        answer = tool.call(input=question).content
+        timings.append((time.perf_counter() - start) * 1000)
+        wrong += f"[{topic}]" not in answer
+    return {"timings": timings, "wrong": wrong}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9])
+    parser.add_argument("--ttft", type=float, default=0.2, help="Mock latency per LLM or embedding request, in seconds.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    workload = [(topic, rng.choice(wordings)) for topic, wordings in (rng.choice(list(TOPICS.items())) for _ in range(args.questions))]
+    # The synthesis prompt ends with "Query: <question>", so each wording gets its topic's answer
+    rules = [{"match": {"contains": f"Query: {wording}"}, "response": {"content": f"[{topic}] Here is what the documents say."}} for topic, wordings in TOPICS.items() for wording in wordings]
+
+    with run_in_thread(MockOptions(ttft=args.ttft, script={"rules": rules})) as server, tempfile.TemporaryDirectory() as directory:
+        os.environ.update({"API_HOST": "local", "LOCAL_OPENAI_ENDPOINT": server.base_url, "EMBEDDING_CACHE_PATH": str(Path(directory) / "embeddings.sqlite3")})
+        from common.clients import llamaindex_embed_model, llamaindex_llm
+        from common.llamaindex_ingestion import load_or_build_index
+        from common.semantic_cache import SemanticCache, SemanticCacheTool
+        from llama_index.core import Settings
+        from llama_index.core.tools import QueryEngineTool
+
+        Settings.llm = llamaindex_llm()
+        Settings.embed_model = llamaindex_embed_model()
+        pdfs = [ROOT_DIR / "example_data/employee_handbook.pdf", ROOT_DIR / "example_data/PerksPlus.pdf"]
+        index, _ = load_or_build_index(pdfs, Path(directory) / "index", "mock")
+        engine_tool = QueryEngineTool.from_defaults(index.as_query_engine(similarity_top_k=3), name="handbook", description="Contoso handbook and PerksPlus.")
+
+        print(f"{'cache':<24}{'hit rate':>9}{'wrong':>7}{'p50 ms':>9}{'p95 ms':>9}{'hit p50 ms':>12}{'miss p50 ms':>13}{'LLM calls':>11}")
+        server.reset_stats()
+        result = run(engine_tool, workload)
+        print(f"{'none':<24}{0:>9.2f}{result['wrong']:>7}{statistics.median(result['timings']):>9.1f}{percentile(result['timings'], 0.95):>9.1f}{'-':>12}{'-':>13}{server.stats['chat_completions']:>11}")
+
+        for threshold in args.thresholds:
+            cache = SemanticCache("handbook", version="v1", path=Path(directory) / f"cache-{threshold}.sqlite3", threshold=threshold)
+            tool = SemanticCacheTool(engine_tool, cache)
+            server.reset_stats()
+            result = run(tool, workload)
+            stats = tool.stats()
+            label = f"threshold {threshold}"
+            print(f"{label:<24}{stats['hit_ratio']:>9.2f}{result['wrong']:>7}{statistics.median(result['timings']):>9.1f}{percentile(result['timings'], 0.95):>9.1f}{stats['hit_ms_p50']:>12.1f}{stats['miss_ms_p50']:>13.1f}{server.stats['chat_completions']:>11}")
+
+        # The index was rebuilt: the same database, opened with a new version, starts empty
+        threshold = args.thresholds[len(args.thresholds) // 2]
+        cache = SemanticCache("handbook", version="v2", path=Path(directory) / f"cache-{threshold}.sqlite3", threshold=threshold)
+        tool = SemanticCacheTool(engine_tool, cache)
+        server.reset_stats()
+        result = run(tool, workload[: len(TOPICS) * 4])
+        stats = tool.stats()
+        label = f"rebuilt, threshold {threshold}"
+        print(f"{label:<24}{stats['hit_ratio']:>9.2f}{result['wrong']:>7}{statistics.median(result['timings']):>9.1f}{percentile(result['timings'], 0.95):>9.1f}{stats['hit_ms_p50']:>12.1f}{stats['miss_ms_p50']:>13.1f}{server.stats['chat_completions']:>11}")
+        print(f"\n{stats['invalidated']} entries of the old index version were invalidated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measures time-to-first-token for the Azure AD token provider with and without the persistent cache.
+
+A fake credential stands in for DefaultAzureCredential: building it and fetching a token
+sleeps for --probe-seconds, roughly what the probe chain costs on a developer machine.
+Each "process start" creates a fresh provider with an empty in-memory state.
+
+    python benchmarks/token_cache.py --starts 5 --probe-seconds 1.5
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "examples"))
+
+from common.azure_auth import CachedTokenProvider  # noqa: E402
+
+
+class FakeAccessToken:
+    def __init__(self, token: str, expires_on: float):
+        self.token = token
+        self.expires_on = expires_on
+
+
+class FakeCredential:
+    def __init__(self, probe_seconds: float, lifetime: float):
+        self.probe_seconds = probe_seconds
+        self.lifetime = lifetime
+        self.fetches = 0
+
+    def get_token(self, *scopes):
+        time.sleep(self.probe_seconds)
+        self.fetches += 1
+        return FakeAccessToken(f"token-{self.fetches}", time.time() + self.lifetime)
+
+
+def measure_starts(starts: int, probe_seconds: float, cache_path) -> list[dict]:
+    results = []
+    for _ in range(starts):
+        provider = CachedTokenProvider(credential_factory=lambda: FakeCredential(probe_seconds, lifetime=3600), cache_path=cache_path)
+        provider()
+        results.append(provider.stats())
+        provider.close()
+    return results
+
+
+def measure_background_refresh(probe_seconds: float, cache_path) -> dict:
+    credential = FakeCredential(probe_seconds, lifetime=4)
+    provider = CachedTokenProvider(credential_factory=lambda: credential, cache_path=cache_path, refresh_margin=3)
+    provider()
+    worst_call = 0.0
+    deadline = time.time() + 6
+    while time.time() < deadline:
+        start = time.perf_counter()
+        provider()
+        worst_call = max(worst_call, time.perf_counter() - start)
+        time.sleep(0.01)
+    stats = provider.stats()
+    provider.close()
+    return {"worst_call_ms": worst_call * 1000, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--starts", type=int, default=5)
+    parser.add_argument("--probe-seconds", type=float, default=1.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = {
+            "no cache": measure_starts(args.starts, args.probe_seconds, cache_path="off"),
+            "persistent cache": measure_starts(args.starts, args.probe_seconds, cache_path=Path(tmp) / "tokens.json"),
+        }
+        print(f"{'mode':<18}{'start':>6}{'source':>12}{'time to first token ms':>25}")
+        for mode, results in runs.items():
+            for i, result in enumerate(results):
+                print(f"{mode:<18}{i:>6}{result['first_token_source']:>12}{result['time_to_first_token'] * 1000:>25.1f}")
+
+        refresh = measure_background_refresh(args.probe_seconds / 10, cache_path=Path(tmp) / "refresh.json")
+        print(f"\nBackground refresh over 6s with 4s tokens: {refresh['background_refreshes']} refreshes, slowest call {refresh['worst_call_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
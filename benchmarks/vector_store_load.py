@@ -0,0 +1,104 @@
+"""
+Load time, memory and query latency of llama-index's JSON vector store against the memory-mapped NumPy store.
+
+A store of --nodes random 1536-dimension embeddings is persisted as a SimpleVectorStore (JSON) and as a
+NumpyVectorStore in float32 and float16. Each one is then loaded in a fresh process, which reports the
+load time, the resident memory the load added (and the peak while loading), and the p50 latency of
+top-3 queries.
+
+    python benchmarks/vector_store_load.py --nodes 2000
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "examples"))
+
+from common.numpy_vector_store import NumpyVectorStore, store_paths  # noqa: E402
+
+FORMATS = ["json", "numpy-float32", "numpy-float16"]
+
+
+def memory_mb() -> tuple[float, float]:
+    """Current and peak resident memory of this process, from /proc (Linux)."""
+    fields = dict(line.split(":", 1) for line in Path("/proc/self/status").read_text().splitlines() if ":" in line)
+    return int(fields["VmRSS"].split()[0]) / 1024, int(fields["VmHWM"].split()[0]) / 1024
+
+
+def child(store_format: str, directory: Path, queries: int, dimensions: int):
+    from llama_index.core.vector_stores import SimpleVectorStore, VectorStoreQuery
+
+    rss_before, _ = memory_mb()
+    start = time.perf_counter()
+    if store_format == "json":
+        store = SimpleVectorStore.from_persist_dir(str(directory / "json"), namespace="default")
+    else:
+        store = NumpyVectorStore.from_persist_dir(directory / store_format)
+    load_seconds = time.perf_counter() - start
+    rss_loaded, peak = memory_mb()
+
+    rng = np.random.default_rng(1)
+    timings = []
+    for _ in range(queries):
+        query = VectorStoreQuery(query_embedding=rng.standard_normal(dimensions).tolist(), similarity_top_k=3)
+        start = time.perf_counter()
+        store.query(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    rss_queried, _ = memory_mb()
+    print(json.dumps({"load_seconds": load_seconds, "rss_loaded": rss_loaded - rss_before, "rss_queried": rss_queried - rss_before, "peak": peak - rss_before, "query_p50_ms": statistics.median(timings)}))
+
+
+def write_stores(directory: Path, nodes: int, dimensions: int):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((nodes, dimensions), dtype=np.float32)
+    ids = [f"node-{i}" for i in range(nodes)]
+    ref_doc_ids = [f"doc-{i // 10}" for i in range(nodes)]
+    metadata = [{"file_name": "synthetic.pdf", "page_label": str(i // 10)} for i in range(nodes)]
+
+    (directory / "json").mkdir()
+    data = {"embedding_dict": dict(zip(ids, vectors.tolist())), "text_id_to_ref_doc_id": dict(zip(ids, ref_doc_ids)), "metadata_dict": dict(zip(ids, metadata))}
+    (directory / "json" / "default__vector_store.json").write_text(json.dumps(data))
+    for dtype in ("float32", "float16"):
+        store = NumpyVectorStore(dtype, (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(dtype), ids, ref_doc_ids, metadata)
+        store.persist(str(directory / f"numpy-{dtype}" / "default__vector_store.json"))
+
+
+def size_mb(directory: Path, store_format: str) -> float:
+    paths = [directory / "json" / "default__vector_store.json"] if store_format == "json" else store_paths(directory / store_format)
+    return sum(path.stat().st_size for path in paths) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=2000, help="Embeddings in the store (loading 5000 from JSON takes over a minute).")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--child", nargs=2, metavar=("FORMAT", "DIRECTORY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], Path(args.child[1]), args.queries, args.dimensions)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        print(f"Writing {args.nodes} x {args.dimensions} embeddings in each format...")
+        write_stores(directory, args.nodes, args.dimensions)
+        print(f"\n{'format':<16}{'file MB':>9}{'load s':>9}{'RSS MB':>9}{'peak MB':>9}{'RSS after queries':>19}{'query p50 ms':>14}")
+        for store_format in FORMATS:
+            command = [sys.executable, __file__, "--child", store_format, str(directory), "--queries", str(args.queries), "--dimensions", str(args.dimensions)]
+            result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+            print(f"{store_format:<16}{size_mb(directory, store_format):>9.1f}{result['load_seconds']:>9.3f}{result['rss_loaded']:>9.1f}{result['peak']:>9.1f}{result['rss_queried']:>19.1f}{result['query_p50_ms']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Launcher for the example scripts.
+
+    python -m examples list
+    python -m examples run openai_functioncalling
+    python -m examples run spanish/autogen_basic
+    python -m examples serve-mock --port 8000
+
+The launcher only uses the standard library, so listing or starting an example costs
+no framework imports up front: each example imports its own framework when it runs,
+and the shared clients only import azure.identity when API_HOST=azure needs a token.
+"""
+
+import argparse
+import os
+import runpy
+import sys
+from pathlib import Path
+
+EXAMPLES_DIR = Path(__file__).resolve().parent
+
+
+def iter_examples():
+    for path in sorted(EXAMPLES_DIR.glob("*.py")) + sorted(EXAMPLES_DIR.glob("spanish/*.py")):
+        if not path.name.startswith("_"):
+            yield path.relative_to(EXAMPLES_DIR).with_suffix("").as_posix()
+
+
+def resolve_example(name: str) -> Path:
+    path = EXAMPLES_DIR / (name.removesuffix(".py") + ".py")
+    if not path.is_file() or path.name.startswith("_"):
+        raise SystemExit(f"Unknown example {name!r}. Run `python -m examples list` to see the available examples.")
+    return path
+
+
+def run_example(name: str, args: list[str], api_host: str | None = None):
+    path = resolve_example(name)
+    if api_host == "local" and path.parent.name == "spanish":
+        raise SystemExit(f"{name} only runs against GitHub Models or Azure OpenAI, not the local mock server.")
+    if api_host:
+        os.environ["API_HOST"] = api_host
+    # Run the script exactly as `python examples/<name>.py` would: its directory first on sys.path
+    sys.path.insert(0, str(path.parent))
+    sys.argv = [str(path), *args]
+    runpy.run_path(str(path), run_name="__main__")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m examples", description="List and run the example scripts.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List the available examples.")
+    run_parser = subparsers.add_parser("run", help="Run an example.")
+    run_parser.add_argument("name", help="Example name, for example openai_functioncalling or spanish/autogen_basic.")
+    run_parser.add_argument("--host", choices=["github", "azure", "local"], help="Override API_HOST for this run.")
+    # Any other arguments, before or after the name, go to the example (all of them after a `--`)
+    # The mock server parses its own options, so only its imports are paid when it is used
+    subparsers.add_parser("serve-mock", help="Serve the local OpenAI-compatible stand-in used by API_HOST=local.", add_help=False)
+    args, extra = parser.parse_known_args()
+    if extra and args.command == "list":
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+
+    if args.command == "list":
+        for name in iter_examples():
+            print(name)
+    elif args.command == "run":
+        run_example(args.name, extra, api_host=args.host)
+    elif args.command == "serve-mock":
+        sys.path.insert(0, str(EXAMPLES_DIR))
+        from common import mock_server
+
+        mock_server.main(extra)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,13 @@ import os
 from azure.ai.inference import ChatCompletionsClient
 from azure.ai.inference.models import SystemMessage, UserMessage
 from azure.core.credentials import AzureKeyCredential
+from common.endpoints import get_endpoint
 
+# GitHub Models, or the local stand-in when API_HOST=local
+endpoint, api_key = get_endpoint()
 client = ChatCompletionsClient(
-    endpoint="https://models.inference.ai.azure.com",
-    credential=AzureKeyCredential(os.environ["GITHUB_TOKEN"]),
+    endpoint=endpoint,
+    credential=AzureKeyCredential(api_key),
 )
 
 response = client.complete(
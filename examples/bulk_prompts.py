@@ -0,0 +1,167 @@
+"""
+Runs every prompt of a JSONL file through a model or an agent, within the API's rate limits.
+
+    python examples/bulk_prompts.py requests.jsonl --field body --output results.jsonl
+    python examples/bulk_prompts.py prompts.jsonl --runner tools --rpm 15 --tpm 150000
+    python examples/bulk_prompts.py prompts.jsonl --runner my_agents.py:answer --resume
+
+Each input line is a JSON object with the prompt in `--field` (or a plain JSON string). Requests are
+admitted by a token-bucket scheduler that tracks requests and tokens per minute, learning the limits from
+the x-ratelimit-* response headers when they are not given. Results are appended to the output file as
+they arrive, one JSON line each, so a large job can be followed while it runs and resumed with --resume.
+
+Runners:
+    chat             one chat completion per prompt
+    tools            one chat completion with the tools of openai_functioncalling.py, recording the calls chosen
+    FILE.py:NAME     any sync or async function taking the prompt and returning a string or JSON value,
+                     for example a wrapper around an agent from one of the other examples
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import runpy
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from common.clients import get_async_http_client, get_async_openai_client, get_http_client, get_model_name
+from common.rate_limit import RateLimitScheduler
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def read_prompts(path: Path, field: str) -> list[tuple[str, str | None]]:
+    """(id, prompt) of each line, with a None prompt for a record without the field."""
+    prompts = []
+    for index, line in enumerate(path.read_text(encoding="utf-8").splitlines()):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if isinstance(record, str):
+            prompts.append((str(index), record))
+        else:
+            prompts.append((str(record.get("id", record.get("request_id", index))), record.get(field)))
+    return prompts
+
+
+def completed_ids(path: Path) -> set[str]:
+    """Ids with a result in the output file; the ones that only errored are run again."""
+    if not path.exists():
+        return set()
+    records = (json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip())
+    return {record["id"] for record in records if "error" not in record}
+
+
+def make_runner(spec: str, max_tokens: int):
+    """Returns an async function prompt -> (result, tokens used or None)."""
+    client = get_async_openai_client()
+
+    async def complete(prompt: str, **kwargs):
+        response = await client.chat.completions.create(model=get_model_name(), messages=[{"role": "user", "content": prompt}], max_tokens=max_tokens, **kwargs)
+        return response.choices[0].message, response.usage.total_tokens if response.usage else None
+
+    if spec == "chat":
+
+        async def run_chat(prompt: str):
+            message, tokens = await complete(prompt)
+            return message.content, tokens
+
+        return run_chat
+
+    if spec == "tools":
+        from openai_functioncalling import tools
+
+        async def run_tools(prompt: str):
+            message, tokens = await complete(prompt, tools=tools, tool_choice="auto")
+            calls = [{"name": call.function.name, "arguments": call.function.arguments} for call in message.tool_calls or []]
+            return {"content": message.content, "tool_calls": calls}, tokens
+
+        return run_tools
+
+    path, _, name = spec.partition(":")
+    function = runpy.run_path(path, run_name="bulk_prompts")[name]
+
+    async def run_function(prompt: str):
+        # Sync functions run on the worker threads, so --concurrency of them are in flight at once
+        result = function(prompt) if inspect.iscoroutinefunction(function) else await asyncio.to_thread(function, prompt)
+        return (await result if inspect.isawaitable(result) else result), None
+
+    return run_function
+
+
+async def run(args):
+    prompts = read_prompts(args.input, args.field)
+    if args.resume:
+        done = completed_ids(args.output)
+        prompts = [(prompt_id, prompt) for prompt_id, prompt in prompts if prompt_id not in done]
+    scheduler = RateLimitScheduler(args.rpm, args.tpm)
+    # Every response through the shared pools updates the budgets, whichever framework made the request
+    get_async_http_client().event_hooks["response"].append(scheduler.observe_response)
+    get_http_client().event_hooks["response"].append(scheduler.sync_response_hook(asyncio.get_running_loop()))
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(args.concurrency))
+    runner = make_runner(args.runner, args.max_tokens)
+    queue = asyncio.Queue()
+    for item in prompts:
+        queue.put_nowait(item)
+
+    start = time.perf_counter()
+    counts = {"ok": 0, "error": 0}
+    with args.output.open("a" if args.resume else "w", encoding="utf-8") as output:
+
+        def write(record: dict):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            done = counts["ok"] + counts["error"]
+            if done % args.progress_every == 0 or done == len(prompts):
+                print(f"{done}/{len(prompts)} done, {counts['error']} errors, {done / (time.perf_counter() - start):.2f} prompts/s", file=sys.stderr)
+
+        async def worker():
+            while not queue.empty():
+                prompt_id, prompt = queue.get_nowait()
+                if prompt is None:
+                    counts["error"] += 1
+                    write({"id": prompt_id, "error": f"KeyError: no {args.field!r} field in the record"})
+                    continue
+                estimated = estimate_tokens(prompt) + args.max_tokens
+                await scheduler.acquire(estimated)
+                request_start = time.perf_counter()
+                try:
+                    result, tokens = await runner(prompt)
+                    record = {"id": prompt_id, "result": result, "tokens": tokens}
+                    counts["ok"] += 1
+                    if tokens is not None:
+                        scheduler.settle(estimated, tokens)
+                except Exception as e:
+                    record = {"id": prompt_id, "error": f"{type(e).__name__}: {e}"}
+                    counts["error"] += 1
+                finally:
+                    scheduler.finished()
+                record["seconds"] = round(time.perf_counter() - request_start, 3)
+                write(record)
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+    elapsed = time.perf_counter() - start
+    stats = scheduler.stats()
+    print(f"{counts['ok']} ok, {counts['error']} errors in {elapsed:.1f} s ({len(prompts) / elapsed * 60 if elapsed else 0:.0f} prompts/min)")
+    print(f"Waited {stats['waited_seconds']:.1f} s for the rate limits: {stats['requests_per_minute'] or 'unlimited'} requests/min, {stats['tokens_per_minute'] or 'unlimited'} tokens/min")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", type=Path, help="JSONL file of prompts.")
+    parser.add_argument("--field", default="prompt", help="Field of each JSON line that holds the prompt.")
+    parser.add_argument("--output", type=Path, default=Path("results.jsonl"), help="JSONL file the results are appended to.")
+    parser.add_argument("--runner", default="chat", help="chat, tools, or FILE.py:FUNCTION.")
+    parser.add_argument("--rpm", type=float, help="Requests per minute (default: learned from response headers).")
+    parser.add_argument("--tpm", type=float, help="Tokens per minute (default: learned from response headers).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once.")
+    parser.add_argument("--max-tokens", type=int, default=512, help="Completion token limit, also reserved from the token budget per request.")
+    parser.add_argument("--resume", action="store_true", help="Skip prompts whose id already has a result in the output file and append to it.")
+    parser.add_argument("--progress-every", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
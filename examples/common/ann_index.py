@@ -0,0 +1,227 @@
+"""
+Vector search indexes for common/numpy_vector_store.py, selected with NumpyVectorStore(index="exact" | "ivf" | "int8" | "binary").
+
+* `ExactIndex` scores every vector with one matrix-vector product. Always correct, and fast enough for the
+  handbook PDFs, but its cost grows with every chunk added.
+* `IVFIndex` is an inverted-file index: k-means splits the vectors into about sqrt(n) clusters and a query
+  only scores the vectors of the `n_probe` clusters whose centroids are closest to it. It trades a little
+  recall for scoring a small fraction of the corpus, and it only stores the centroids and one int32 per vector.
+* `Int8Index` and `BinaryIndex` keep a quantized copy of every vector in memory (one byte per dimension, or
+  one bit) and score the whole corpus on it, then re-rank a shortlist of `oversample` x k candidates
+  exactly with the full vectors. The full vectors stay in the memory-mapped file, where a query only reads
+  the shortlisted rows, so the resident memory of a large store is mostly the quantized copy.
+
+All of them work on L2-normalized rows, so the dot product is the cosine similarity.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+# Rows scored per matrix product when a whole store is scanned, so float16 rows are upcast a block at a time
+BLOCK_ROWS = 1 << 15
+# Rows of quantized codes decoded per step of a search, few enough that the decoded block stays in the CPU cache
+CODE_BLOCK_ROWS = 1 << 10
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def score_all(vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+    if vectors.dtype == np.float32:
+        return vectors @ query
+    return np.concatenate([vectors[start : start + BLOCK_ROWS].astype(np.float32) @ query for start in range(0, len(vectors), BLOCK_ROWS)])
+
+
+class ExactIndex:
+    name = "exact"
+
+    def build(self, vectors: np.ndarray):
+        pass
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = score_all(vectors, query)
+        top = top_k(scores, k)
+        return top, scores[top]
+
+    @property
+    def nbytes(self) -> int:
+        return 0
+
+    def save(self, path: Path):
+        pass
+
+    def load(self, path: Path, rows: int) -> bool:
+        return True
+
+
+class IVFIndex:
+    name = "ivf"
+
+    def __init__(self, n_lists: int | None = None, n_probe: int = 16, iterations: int = 10, sample_per_list: int = 64, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.iterations = iterations
+        self.sample_per_list = sample_per_list
+        self.seed = seed
+        self.centroids: np.ndarray | None = None
+        # Row positions grouped by list: the rows of list i are order[offsets[i]:offsets[i + 1]]
+        self.order: np.ndarray | None = None
+        self.offsets: np.ndarray | None = None
+
+    def build(self, vectors: np.ndarray):
+        rows = len(vectors)
+        n_lists = max(1, min(rows, self.n_lists or round(rows**0.5)))
+        rng = np.random.default_rng(self.seed)
+        # k-means on a sample is enough to place the centroids, then every row is assigned once
+        sample = vectors[np.sort(rng.choice(rows, min(rows, n_lists * self.sample_per_list), replace=False))].astype(np.float32)
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(self.iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(assignment, minlength=n_lists)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            # An empty list keeps its old centroid
+            filled = counts > 0
+            sums = np.add.reduceat(sample[np.argsort(assignment, kind="stable")], starts[filled])
+            centroids[filled] = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        assignment = np.concatenate([np.argmax(vectors[start : start + BLOCK_ROWS].astype(np.float32) @ centroids.T, axis=1) for start in range(0, rows, BLOCK_ROWS)])
+        self.centroids = centroids
+        self.order = np.argsort(assignment, kind="stable").astype(np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))]).astype(np.int64)
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        probe = top_k(self.centroids @ query, self.n_probe)
+        candidates = np.concatenate([self.order[self.offsets[i] : self.offsets[i + 1]] for i in probe])
+        candidates.sort()
+        scores = vectors[candidates].astype(np.float32, copy=False) @ query
+        top = top_k(scores, k)
+        return candidates[top], scores[top]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.centroids, self.order, self.offsets) if array is not None)
+
+    def save(self, path: Path):
+        with open(path.with_name(path.name + ".tmp"), "wb") as f:
+            np.savez(f, centroids=self.centroids, order=self.order, offsets=self.offsets)
+        path.with_name(path.name + ".tmp").replace(path)
+
+    def load(self, path: Path, rows: int) -> bool:
+        """Loads a saved index, unless it is missing or was built for another number of rows."""
+        if not path.exists():
+            return False
+        with np.load(path) as saved:
+            if len(saved["order"]) != rows:
+                return False
+            self.centroids, self.order, self.offsets = saved["centroids"], saved["order"], saved["offsets"]
+        return True
+
+
+def rerank(vectors: np.ndarray, query: np.ndarray, candidates: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Exact top k of the candidate rows, read in file order."""
+    candidates = np.sort(candidates)
+    scores = vectors[candidates].astype(np.float32, copy=False) @ query
+    top = top_k(scores, k)
+    return candidates[top], scores[top]
+
+
+class Int8Index:
+    name = "int8"
+
+    def __init__(self, oversample: int = 4):
+        self.oversample = oversample
+        self.codes: np.ndarray | None = None
+        # Per row, the value of one int8 step: a row is approximately codes * scale
+        self.scales: np.ndarray | None = None
+
+    def build(self, vectors: np.ndarray):
+        codes, scales = [], []
+        for start in range(0, len(vectors), BLOCK_ROWS):
+            block = vectors[start : start + BLOCK_ROWS].astype(np.float32)
+            scale = np.maximum(np.abs(block).max(axis=1), 1e-12) / 127
+            codes.append(np.rint(block / scale[:, None]).astype(np.int8))
+            scales.append(scale.astype(np.float32))
+        self.codes = np.concatenate(codes) if codes else np.empty((0, vectors.shape[1]), dtype=np.int8)
+        self.scales = np.concatenate(scales) if scales else np.empty(0, dtype=np.float32)
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        # NumPy has no int8 matrix product, so the codes are upcast a block at a time
+        approximate = np.concatenate([self.codes[start : start + CODE_BLOCK_ROWS].astype(np.float32) @ query for start in range(0, len(self.codes), CODE_BLOCK_ROWS)]) * self.scales
+        return rerank(vectors, query, top_k(approximate, k * self.oversample), k)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.codes, self.scales) if array is not None)
+
+    def save(self, path: Path):
+        with open(path.with_name(path.name + ".tmp"), "wb") as f:
+            np.savez(f, codes=self.codes, scales=self.scales)
+        path.with_name(path.name + ".tmp").replace(path)
+
+    def load(self, path: Path, rows: int) -> bool:
+        if not path.exists():
+            return False
+        with np.load(path) as saved:
+            if len(saved["codes"]) != rows:
+                return False
+            self.codes, self.scales = saved["codes"], saved["scales"]
+        return True
+
+
+# The 8 bits of every byte value, most significant first like np.packbits: BYTE_BITS[code] is a row of 0s and 1s
+BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.float32)
+
+
+class BinaryIndex:
+    name = "binary"
+
+    def __init__(self, oversample: int = 10):
+        self.oversample = oversample
+        # The sign of every dimension, 8 per byte
+        self.codes: np.ndarray | None = None
+
+    def build(self, vectors: np.ndarray):
+        blocks = [np.packbits(vectors[start : start + BLOCK_ROWS] > 0, axis=1) for start in range(0, len(vectors), BLOCK_ROWS)]
+        self.codes = np.concatenate(blocks) if blocks else np.empty((0, (vectors.shape[1] + 7) // 8), dtype=np.uint8)
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        # A row scores the sum of the query over the dimensions where it is positive, which ranks like the dot
+        # product of the query with the row's signs. Summed a byte at a time from a table of all 256 bit patterns.
+        padded = np.zeros(self.codes.shape[1] * 8, dtype=np.float32)
+        padded[: len(query)] = query
+        tables = (padded.reshape(-1, 8) @ BYTE_BITS.T).ravel()
+        # Where the table of each byte column starts in the flattened tables
+        offsets = np.arange(self.codes.shape[1], dtype=np.intp) * 256
+        approximate = np.concatenate([np.take(tables, self.codes[start : start + CODE_BLOCK_ROWS] + offsets).sum(axis=1) for start in range(0, len(self.codes), CODE_BLOCK_ROWS)])
+        return rerank(vectors, query, top_k(approximate, k * self.oversample), k)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes if self.codes is not None else 0
+
+    def save(self, path: Path):
+        with open(path.with_name(path.name + ".tmp"), "wb") as f:
+            np.savez(f, codes=self.codes)
+        path.with_name(path.name + ".tmp").replace(path)
+
+    def load(self, path: Path, rows: int) -> bool:
+        if not path.exists():
+            return False
+        with np.load(path) as saved:
+            if len(saved["codes"]) != rows:
+                return False
+            self.codes = saved["codes"]
+        return True
+
+
+def make_index(name: str, **options) -> ExactIndex | IVFIndex | Int8Index | BinaryIndex:
+    indexes = {"exact": ExactIndex, "ivf": IVFIndex, "int8": Int8Index, "binary": BinaryIndex}
+    if name not in indexes:
+        raise ValueError(f"Unknown vector index {name!r}, use one of {', '.join(indexes)}")
+    return indexes[name](**options)
@@ -0,0 +1,147 @@
+"""
+Azure AD token provider with a persistent, file-locked cache.
+
+`azure.identity.get_bearer_token_provider(DefaultAzureCredential(), ...)` walks the whole
+DefaultAzureCredential probe chain and fetches a fresh token in every new process.
+`CachedTokenProvider` is a drop-in replacement for the `azure_ad_token_provider` argument that:
+
+* shares tokens between processes through a JSON file guarded by a file lock,
+* only builds the credential (and runs the probe chain) when no cached token is usable,
+* refreshes the token on a background thread before it expires, so callers never wait on a refresh,
+* records the time from construction to the first token handed out (time-to-first-request).
+
+The cache holds bearer tokens in plain text, so the file is created readable by the current user only.
+Set AZURE_TOKEN_CACHE to change its location, or to "off" to keep tokens in memory only.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from filelock import FileLock
+
+AZURE_SCOPE = "https://cognitiveservices.azure.com/.default"
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "python-ai-agent-frameworks-demos" / "azure_tokens.json"
+
+logger = logging.getLogger(__name__)
+
+
+def _default_credential():
+    import azure.identity
+
+    return azure.identity.DefaultAzureCredential()
+
+
+class CachedTokenProvider:
+    def __init__(self, scope: str = AZURE_SCOPE, credential_factory=_default_credential, cache_path: str | Path | None = None, refresh_margin: float = 300.0):
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self._credential_factory = credential_factory
+        self._credential = None
+        cache_path = cache_path or os.getenv("AZURE_TOKEN_CACHE", str(DEFAULT_CACHE_PATH))
+        self._cache_path = None if str(cache_path).lower() == "off" else Path(cache_path)
+        # Tokens are keyed by identity as well as scope so switching tenants never reuses a token
+        self._cache_key = "|".join([scope, os.getenv("AZURE_TENANT_ID", ""), os.getenv("AZURE_CLIENT_ID", "")])
+        self._current: tuple[str | None, float] = (None, 0.0)
+        self._lock = threading.Lock()
+        self._refresh_timer: threading.Timer | None = None
+        self._created_at = time.perf_counter()
+        self.time_to_first_token: float | None = None
+        self.first_token_source: str | None = None
+        self.credential_fetches = 0
+        self.background_refreshes = 0
+
+    def __call__(self) -> str:
+        # Fast path without locking: the background refresh swaps in new tokens before this one expires
+        token, expires_on = self._current
+        if token is None or not self._is_valid(expires_on, margin=0):
+            with self._lock:
+                token, expires_on = self._current
+                if token is None or not self._is_valid(expires_on, margin=0):
+                    self._load_or_fetch(min_validity=0)
+                    token, expires_on = self._current
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self._created_at
+        return token
+
+    def stats(self) -> dict:
+        return {
+            "time_to_first_token": self.time_to_first_token,
+            "first_token_source": self.first_token_source,
+            "credential_fetches": self.credential_fetches,
+            "background_refreshes": self.background_refreshes,
+            "expires_in": max(0.0, self._current[1] - time.time()),
+        }
+
+    def close(self):
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+
+    def _is_valid(self, expires_on: float, margin: float) -> bool:
+        return expires_on - time.time() > margin
+
+    def _load_or_fetch(self, min_validity: float):
+        # Hold the file lock across read-fetch-write so concurrent processes fetch a token only once
+        if self._cache_path is None:
+            source = self._fetch()
+        else:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with FileLock(f"{self._cache_path}.lock", timeout=30):
+                entries = self._read_cache()
+                cached = entries.get(self._cache_key)
+                if cached and self._is_valid(cached["expires_on"], min_validity):
+                    self._current = (cached["token"], cached["expires_on"])
+                    source = "disk"
+                else:
+                    source = self._fetch()
+                    entries[self._cache_key] = {"token": self._current[0], "expires_on": self._current[1]}
+                    self._write_cache(entries)
+        if self.first_token_source is None:
+            self.first_token_source = source
+        self._schedule_refresh()
+
+    def _fetch(self) -> str:
+        if self._credential is None:
+            self._credential = self._credential_factory()
+        access_token = self._credential.get_token(self.scope)
+        self._current = (access_token.token, float(access_token.expires_on))
+        self.credential_fetches += 1
+        return "credential"
+
+    def _read_cache(self) -> dict:
+        try:
+            return json.loads(self._cache_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_cache(self, entries: dict):
+        tmp_path = self._cache_path.with_suffix(".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self._cache_path)
+
+    def _schedule_refresh(self):
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        remaining = self._current[1] - time.time()
+        # Tokens already inside the refresh margin are refreshed halfway through their remaining lifetime
+        delay = max(remaining - self.refresh_margin, remaining / 2, 1.0)
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                # Picks up a token another process already refreshed, otherwise fetches a new one
+                self._load_or_fetch(min_validity=self.refresh_margin)
+                self.background_refreshes += 1
+        except Exception:
+            logger.exception("Background token refresh failed, retrying in 30 seconds")
+            self._refresh_timer = threading.Timer(30, self._background_refresh)
+            self._refresh_timer.daemon = True
+            self._refresh_timer.start()
@@ -0,0 +1,323 @@
+"""
+Shared, pooled OpenAI clients for the examples.
+
+Every example used to build its own client inline behind an `if API_HOST == "github"` branch.
+API_HOST can be "github" (GitHub Models), "azure" (Azure OpenAI) or "local" (the stand-in
+from common/mock_server.py, at LOCAL_OPENAI_ENDPOINT, default http://127.0.0.1:8000).
+This module builds one sync HTTP connection pool per process, and one async pool per event loop, and
+hands out OpenAI clients (and the adapters each framework needs) that all share them.
+
+Pool settings can be tuned with environment variables:
+
+    CLIENT_MAX_CONNECTIONS      maximum open connections per pool (default 20)
+    CLIENT_MAX_KEEPALIVE        maximum idle keep-alive connections (default 10)
+    CLIENT_KEEPALIVE_EXPIRY     seconds an idle connection is kept open (default 30)
+    CLIENT_CONNECT_TIMEOUT      seconds to wait for a connection (default 5)
+    CLIENT_TIMEOUT              seconds to wait for a response (default 120)
+    CLIENT_HTTP2                "true" to negotiate HTTP/2, requires `pip install httpx[http2]`
+
+Throttled and failed requests are retried with backoff, and requests per host are capped, below every
+client and framework (see common/resilience.py). With RESPONSE_CACHE=on, non-streamed chat completions are answered from an on-disk cache when the exact
+same request was sent before (see common/response_cache.py). Embeddings for the llama-index examples are
+batched, sent concurrently and cached on disk (see common/embedding_cache.py).
+"""
+
+import asyncio
+import functools
+import os
+from dataclasses import dataclass
+
+import httpx
+import openai
+from dotenv import load_dotenv
+
+from common.azure_auth import CachedTokenProvider
+from common.endpoints import get_endpoint
+from common.resilience import AsyncRetryTransport, RetryPolicy, RetryTransport
+from common.response_cache import AsyncCachingTransport, CachingTransport, ResponseCache
+
+# Variables already set, such as API_HOST from the launcher's --host, take precedence over .env
+load_dotenv(override=False)
+API_HOST = os.getenv("API_HOST", "github")
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    timeout: float = 120.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            max_connections=int(os.getenv("CLIENT_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.getenv("CLIENT_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("CLIENT_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            connect_timeout=float(os.getenv("CLIENT_CONNECT_TIMEOUT", cls.connect_timeout)),
+            timeout=float(os.getenv("CLIENT_TIMEOUT", cls.timeout)),
+            http2=_env_bool("CLIENT_HTTP2"),
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeouts(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+
+class LoopTransport(httpx.AsyncBaseTransport):
+    """Async connection pool per event loop, as connections opened on one loop cannot be used from another.
+
+    The async clients are built once per process, often before any loop runs, so a process that runs one
+    `asyncio.run()` after another gets a fresh pool on each loop, and the pools of closed loops are dropped.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._pools: dict[asyncio.AbstractEventLoop, httpx.AsyncBaseTransport] = {}
+
+    def _pool(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            self._pools = {other: transport for other, transport in self._pools.items() if not other.is_closed()}
+            pool = self._pools[loop] = self._factory()
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self):
+        if pool := self._pools.pop(asyncio.get_running_loop(), None):
+            await pool.aclose()
+
+
+@functools.cache
+def get_response_cache() -> ResponseCache | None:
+    """On-disk chat-completions cache shared by all example processes, or None unless RESPONSE_CACHE is on."""
+    return ResponseCache.from_env() if _env_bool("RESPONSE_CACHE") else None
+
+
+@functools.cache
+def get_retry_policy() -> RetryPolicy:
+    """Retry settings, per-endpoint caps and retry counters shared by the sync and async pools."""
+    return RetryPolicy.from_env()
+
+
+@functools.cache
+def get_http_client() -> httpx.Client:
+    """Process-wide sync connection pool shared by every sync client."""
+    settings = PoolSettings.from_env()
+    transport = RetryTransport(httpx.HTTPTransport(limits=settings.limits, http2=settings.http2), get_retry_policy())
+    if cache := get_response_cache():
+        transport = CachingTransport(transport, cache)
+    return httpx.Client(transport=transport, timeout=settings.timeouts, follow_redirects=True)
+
+
+@functools.cache
+def get_async_http_client() -> httpx.AsyncClient:
+    """Process-wide async client shared by every async client, with a connection pool per event loop."""
+    settings = PoolSettings.from_env()
+    pools = LoopTransport(lambda: httpx.AsyncHTTPTransport(limits=settings.limits, http2=settings.http2))
+    transport = AsyncRetryTransport(pools, get_retry_policy())
+    if cache := get_response_cache():
+        transport = AsyncCachingTransport(transport, cache)
+    return httpx.AsyncClient(transport=transport, timeout=settings.timeouts, follow_redirects=True)
+
+
+@functools.cache
+def get_token_provider() -> CachedTokenProvider:
+    """Azure AD token provider backed by the on-disk token cache shared by all example processes."""
+    return CachedTokenProvider()
+
+
+def get_model_name() -> str:
+    """Model name (GitHub Models, local) or deployment name (Azure OpenAI) to send with each request."""
+    if API_HOST == "azure":
+        return os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
+    if API_HOST == "local":
+        return os.getenv("LOCAL_MODEL", "gpt-4o")
+    return os.getenv("GITHUB_MODEL", "gpt-4o")
+
+
+def get_embedding_model_name() -> str:
+    """Embedding model behind llamaindex_embed_model(), so stored vectors are only reused with the model that made them."""
+    if API_HOST == "azure":
+        return os.environ["AZURE_OPENAI_EMBEDDING_MODEL"]
+    if API_HOST == "local":
+        return "local-hash-embedding"
+    return "text-embedding-3-small"
+
+
+@functools.cache
+def get_openai_client() -> openai.OpenAI:
+    if API_HOST == "azure":
+        return openai.AzureOpenAI(
+            api_version=os.environ["AZURE_OPENAI_VERSION"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            azure_ad_token_provider=get_token_provider(),
+            http_client=get_http_client(),
+            max_retries=0,
+        )
+    base_url, api_key = get_endpoint()
+    return openai.OpenAI(base_url=base_url, api_key=api_key, http_client=get_http_client(), max_retries=0)
+
+
+@functools.cache
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    if API_HOST == "azure":
+        return openai.AsyncAzureOpenAI(
+            api_version=os.environ["AZURE_OPENAI_VERSION"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            azure_ad_token_provider=get_token_provider(),
+            http_client=get_async_http_client(),
+            max_retries=0,
+        )
+    base_url, api_key = get_endpoint()
+    return openai.AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=get_async_http_client(), max_retries=0)
+
+
+# Framework adapters
+#
+# Framework packages are imported inside each function so an example only needs its own framework installed.
+
+
+def pydanticai_model():
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+    return OpenAIModel(get_model_name(), provider=OpenAIProvider(openai_client=get_async_openai_client()))
+
+
+def openai_agents_model():
+    from agents import OpenAIChatCompletionsModel
+
+    return OpenAIChatCompletionsModel(model=get_model_name(), openai_client=get_async_openai_client())
+
+
+def autogen_model_client(**kwargs):
+    from autogen_ext.models.openai import AzureOpenAIChatCompletionClient, OpenAIChatCompletionClient
+
+    kwargs.setdefault("max_retries", 0)
+    if API_HOST == "azure":
+        return AzureOpenAIChatCompletionClient(
+            model=os.environ["AZURE_OPENAI_CHAT_MODEL"],
+            api_version=os.environ["AZURE_OPENAI_VERSION"],
+            azure_deployment=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            azure_ad_token_provider=get_token_provider(),
+            http_client=get_async_http_client(),
+            **kwargs,
+        )
+    base_url, api_key = get_endpoint()
+    if API_HOST == "local":
+        # Model names autogen does not know need capabilities spelled out
+        kwargs.setdefault("model_info", {"vision": False, "function_calling": True, "json_output": True, "family": "unknown", "structured_output": True})
+    return OpenAIChatCompletionClient(model=get_model_name(), api_key=api_key, base_url=base_url, http_client=get_async_http_client(), **kwargs)
+
+
+def langchain_chat_model():
+    from langchain_openai import AzureChatOpenAI, ChatOpenAI
+
+    if API_HOST == "azure":
+        return AzureChatOpenAI(
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            azure_deployment=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
+            openai_api_version=os.environ["AZURE_OPENAI_VERSION"],
+            azure_ad_token_provider=get_token_provider(),
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client(),
+            max_retries=0,
+        )
+    base_url, api_key = get_endpoint()
+    return ChatOpenAI(model=get_model_name(), base_url=base_url, api_key=api_key, http_client=get_http_client(), http_async_client=get_async_http_client(), max_retries=0)
+
+
+def semantickernel_service():
+    from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
+
+    return OpenAIChatCompletion(ai_model_id=get_model_name(), async_client=get_async_openai_client())
+
+
+def smolagents_model():
+    from smolagents import AzureOpenAIServerModel, OpenAIServerModel
+
+    if API_HOST == "azure":
+        return AzureOpenAIServerModel(
+            model_id=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
+            api_version=os.environ["AZURE_OPENAI_VERSION"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            client_kwargs={"azure_ad_token_provider": get_token_provider(), "http_client": get_http_client(), "max_retries": 0},
+        )
+    base_url, api_key = get_endpoint()
+    return OpenAIServerModel(model_id=get_model_name(), api_base=base_url, api_key=api_key, client_kwargs={"http_client": get_http_client(), "max_retries": 0})
+
+
+def llamaindex_llm():
+    if API_HOST == "azure":
+        from llama_index.llms.azure_openai import AzureOpenAI
+
+        return AzureOpenAI(
+            model=os.environ["AZURE_OPENAI_CHAT_MODEL"],
+            deployment_name=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            api_version=os.environ["AZURE_OPENAI_VERSION"],
+            use_azure_ad=True,
+            azure_ad_token_provider=get_token_provider(),
+            http_client=get_http_client(),
+            async_http_client=get_async_http_client(),
+            max_retries=0,
+        )
+    from llama_index.llms.openai_like import OpenAILike
+
+    base_url, api_key = get_endpoint()
+    return OpenAILike(
+        model=get_model_name(),
+        api_base=base_url,
+        api_key=api_key,
+        is_chat_model=True,
+        http_client=get_http_client(),
+        async_http_client=get_async_http_client(),
+        max_retries=0,
+    )
+
+
+def llamaindex_embed_model():
+    """Embedding model for the llama-index examples, batched, concurrent and cached (see common/embedding_cache.py)."""
+    from common.embedding_cache import CachedEmbedding
+
+    return CachedEmbedding.from_env(_llamaindex_base_embed_model(), get_embedding_model_name())
+
+
+def _llamaindex_base_embed_model():
+    if API_HOST == "azure":
+        from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
+
+        return AzureOpenAIEmbedding(
+            model=os.environ["AZURE_OPENAI_EMBEDDING_MODEL"],
+            deployment_name=os.environ["AZURE_OPENAI_EMBEDDING_DEPLOYMENT"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            api_version=os.environ["AZURE_OPENAI_VERSION"],
+            use_azure_ad=True,
+            azure_ad_token_provider=get_token_provider(),
+            http_client=get_http_client(),
+            async_http_client=get_async_http_client(),
+            max_retries=0,
+        )
+    from llama_index.embeddings.openai import OpenAIEmbedding
+
+    base_url, api_key = get_endpoint()
+    return OpenAIEmbedding(model="text-embedding-3-small", api_base=base_url, api_key=api_key, http_client=get_http_client(), async_http_client=get_async_http_client(), max_retries=0)
@@ -0,0 +1,207 @@
+"""
+Batched, concurrent embedding with a persistent embedding cache, for the llama-index examples.
+
+`CachedEmbedding` wraps any llama-index embedding model. Each call:
+
+1. normalizes the texts (Unicode NFKC, collapsed whitespace) and looks them up in an on-disk cache keyed
+   on the embedding model and the normalized text, so repeated or overlapping chunks are embedded once,
+2. sends the remaining unique texts in batches of `batch_size`, with at most `max_in_flight` batches in
+   flight at once: across every thread for the sync calls, which share one thread pool, and across every
+   task on the same event loop for the async calls, so a process using both can have twice that many,
+3. stores the new vectors as float32 blobs in SQLite (WAL mode), shared by all example processes.
+
+The cache is on by default for llamaindex_embed_model(); set EMBEDDING_CACHE=off to turn it off and
+EMBEDDING_CACHE_PATH, EMBEDDING_BATCH_SIZE (default 64) or EMBEDDING_MAX_IN_FLIGHT (default 4) to tune it.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "python-ai-agent-frameworks-demos" / "embeddings.sqlite3"
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def embedding_key(model: str, text: str, kind: str = "text") -> str:
+    return hashlib.sha256(f"{model}\0{kind}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+class EmbeddingStore:
+    """SQLite table of float32 vectors keyed by embedding_key()."""
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingStore | None":
+        if os.getenv("EMBEDDING_CACHE", "on").strip().lower() in ("0", "false", "no", "off"):
+            return None
+        return cls(os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH))
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters, so long lists are looked up in slices
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                rows = self._db.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                found.update((key, np.frombuffer(vector, dtype=np.float32).tolist()) for key, vector in rows)
+        return found
+
+    def put_many(self, items: dict[str, list[float]]):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()])
+            self._db.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM embeddings")
+
+
+class CachedEmbedding(BaseEmbedding):
+    batch_size: int = Field(default=64, description="Texts per embedding request.")
+    max_in_flight: int = Field(default=4, description="Embedding requests in flight at once.")
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _store: EmbeddingStore | None = PrivateAttr()
+    _executor: ThreadPoolExecutor = PrivateAttr()
+    _semaphores: weakref.WeakKeyDictionary = PrivateAttr()
+    _counts: Counter = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+
+    def __init__(self, inner: BaseEmbedding, store: EmbeddingStore | None, model_id: str | None = None, batch_size: int = 64, max_in_flight: int = 4, **kwargs):
+        # The wrapper gets every text at once and does the batching itself, so llama-index must not split them first
+        super().__init__(model_name=model_id or inner.model_name, embed_batch_size=2048, batch_size=batch_size, max_in_flight=max_in_flight, **kwargs)
+        inner.embed_batch_size = batch_size
+        self._inner = inner
+        self._store = store
+        self._executor = ThreadPoolExecutor(max_in_flight, thread_name_prefix="embed")
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @classmethod
+    def from_env(cls, inner: BaseEmbedding, model_id: str) -> "CachedEmbedding":
+        return cls(inner, EmbeddingStore.from_env(), model_id, batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", 64)), max_in_flight=int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", 4)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        seconds = counts.get("embed_seconds", 0.0)
+        return {
+            "texts": counts.get("texts", 0),
+            "cache_hits": counts.get("cache_hits", 0),
+            "duplicates": counts.get("duplicates", 0),
+            "embedded": counts.get("embedded", 0),
+            "requests": counts.get("requests", 0),
+            "seconds": seconds,
+            "texts_per_second": counts.get("texts", 0) / seconds if seconds else 0.0,
+        }
+
+    def _count(self, **amounts):
+        with self._lock:
+            self._counts.update(amounts)
+
+    def _plan(self, texts: list[str], kind: str) -> tuple[list[str], dict[str, list[float]], dict[str, str]]:
+        """Returns each text's key, the vectors already cached, and the unique texts still to embed by key."""
+        keys = [embedding_key(self.model_name, text, kind) for text in texts]
+        cached = self._store.get_many(list(set(keys))) if self._store is not None else {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        hits = sum(1 for key in keys if key in cached)
+        self._count(texts=len(texts), cache_hits=hits, duplicates=len(texts) - hits - len(missing))
+        return keys, cached, missing
+
+    def _batches(self, missing: dict[str, str]) -> list[tuple[list[str], list[str]]]:
+        items = list(missing.items())
+        return [([key for key, _ in chunk], [text for _, text in chunk]) for chunk in (items[i : i + self.batch_size] for i in range(0, len(items), self.batch_size))]
+
+    def _finish(self, keys: list[str], cached: dict, new: dict, started: float) -> list[list[float]]:
+        if new and self._store is not None:
+            self._store.put_many(new)
+        self._count(embedded=len(new), embed_seconds=time.perf_counter() - started)
+        vectors = {**cached, **new}
+        return [vectors[key] for key in keys]
+
+    def _embed_batch(self, batch: tuple[list[str], list[str]], kind: str) -> dict[str, list[float]]:
+        keys, texts = batch
+        vectors = self._inner.get_text_embedding_batch(texts) if kind == "text" else [self._inner.get_query_embedding(text) for text in texts]
+        self._count(requests=1)
+        return dict(zip(keys, vectors))
+
+    async def _aembed_batch(self, batch: tuple[list[str], list[str]], kind: str) -> dict[str, list[float]]:
+        keys, texts = batch
+        # One semaphore per event loop, since asyncio primitives cannot be shared between loops
+        semaphore = self._semaphores.setdefault(asyncio.get_running_loop(), asyncio.Semaphore(self.max_in_flight))
+        async with semaphore:
+            vectors = await self._inner.aget_text_embedding_batch(texts) if kind == "text" else [await self._inner.aget_query_embedding(text) for text in texts]
+        self._count(requests=1)
+        return dict(zip(keys, vectors))
+
+    def _embed(self, texts: list[str], kind: str) -> list[list[float]]:
+        started = time.perf_counter()
+        keys, cached, missing = self._plan(texts, kind)
+        new = {}
+        for vectors in self._executor.map(lambda batch: self._embed_batch(batch, kind), self._batches(missing)):
+            new.update(vectors)
+        return self._finish(keys, cached, new, started)
+
+    async def _aembed(self, texts: list[str], kind: str) -> list[list[float]]:
+        started = time.perf_counter()
+        keys, cached, missing = await asyncio.to_thread(self._plan, texts, kind)
+        new = {}
+        for vectors in await asyncio.gather(*(self._aembed_batch(batch, kind) for batch in self._batches(missing))):
+            new.update(vectors)
+        return await asyncio.to_thread(self._finish, keys, cached, new, started)
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._embed(texts, "text")
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._embed([text], "text")[0]
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._embed([query], "query")[0]
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return await self._aembed(texts, "text")
+
+    async def _aget_text_embedding(self, text: str) -> list[float]:
+        return (await self._aembed([text], "text"))[0]
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        return (await self._aembed([query], "query"))[0]
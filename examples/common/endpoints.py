@@ -0,0 +1,19 @@
+"""
+Base URL and API key of the OpenAI-compatible hosts, without importing any client library.
+
+common/clients.py builds its clients on these; examples that bring their own SDK (such as
+azureai_githubmodels.py with azure-ai-inference) import this module instead, so they do not pay for
+loading openai and httpx.
+"""
+
+import os
+
+GITHUB_ENDPOINT = "https://models.inference.ai.azure.com"
+LOCAL_ENDPOINT = "http://127.0.0.1:8000"
+
+
+def get_endpoint() -> tuple[str, str]:
+    """Base URL and API key of the OpenAI-compatible hosts: GitHub Models or the local stand-in."""
+    if os.getenv("API_HOST", "github") == "local":
+        return os.getenv("LOCAL_OPENAI_ENDPOINT", LOCAL_ENDPOINT), "local"
+    return GITHUB_ENDPOINT, os.environ["GITHUB_TOKEN"]
@@ -0,0 +1,85 @@
+"""
+One retrieval tool over several llama-index indexes, for agents that would otherwise call one query engine per step.
+
+`FanOutRetriever` embeds the question once, queries every index at the same time (threads for retrieve(),
+asyncio.gather for aretrieve()), and merges the nodes: a chunk found in more than one index is kept once
+with its best score, and the top_k best chunks overall are returned. `fanout_tool()` wraps it in a tool that
+returns that combined context as text, so a question about both the handbook and PerksPlus takes one agent
+step and no extra LLM call to synthesize each index's answer.
+"""
+
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from llama_index.core import Settings
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.tools import FunctionTool
+
+from common.embedding_cache import normalize_text
+
+
+def merge_nodes(results: list[list[NodeWithScore]], top_k: int) -> list[NodeWithScore]:
+    """The top_k best nodes of all the results, best first, each text only once with its highest score."""
+    best: dict[str, NodeWithScore] = {}
+    for nodes in results:
+        for node in nodes:
+            key = hashlib.sha256(normalize_text(node.node.get_content()).encode()).hexdigest()
+            if key not in best or (node.score or 0.0) > (best[key].score or 0.0):
+                best[key] = node
+    return sorted(best.values(), key=lambda node: node.score or 0.0, reverse=True)[:top_k]
+
+
+def format_context(nodes: list[NodeWithScore]) -> str:
+    """The merged nodes as one block of text, each with the file and page it came from."""
+    if not nodes:
+        return "No matching passages found."
+    sections = []
+    for number, node in enumerate(nodes, 1):
+        metadata = node.node.metadata
+        source = f"{metadata.get('file_name', 'unknown')}, page {metadata.get('page_label', '?')}"
+        sections.append(f"[{number}] {source} (score {node.score or 0.0:.2f})\n{node.node.get_content().strip()}")
+    return "\n\n".join(sections)
+
+
+class FanOutRetriever(BaseRetriever):
+    def __init__(self, retrievers: dict[str, BaseRetriever], embed_model: BaseEmbedding | None = None, top_k: int = 5):
+        self._retrievers = retrievers
+        self._embed_model = embed_model or Settings.embed_model
+        self._top_k = top_k
+        self._executor = ThreadPoolExecutor(len(retrievers), thread_name_prefix="fanout")
+        super().__init__()
+
+    def _with_embedding(self, query_bundle: QueryBundle) -> QueryBundle:
+        # Embedded once here, so the indexes do not each embed the same question
+        if query_bundle.embedding is None:
+            query_bundle.embedding = self._embed_model.get_agg_embedding_from_queries(query_bundle.embedding_strs)
+        return query_bundle
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        query_bundle = self._with_embedding(query_bundle)
+        results = list(self._executor.map(lambda retriever: retriever.retrieve(query_bundle), self._retrievers.values()))
+        return merge_nodes(results, self._top_k)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        if query_bundle.embedding is None:
+            query_bundle.embedding = await self._embed_model.aget_agg_embedding_from_queries(query_bundle.embedding_strs)
+        results = await asyncio.gather(*(retriever.aretrieve(query_bundle) for retriever in self._retrievers.values()))
+        return merge_nodes(list(results), self._top_k)
+
+
+def fanout_tool(retrievers: dict[str, BaseRetriever], name: str, description: str, top_k: int = 5) -> FunctionTool:
+    """A tool that searches every retriever at once and returns the merged passages as its output."""
+    retriever = FanOutRetriever(retrievers, top_k=top_k)
+
+    def search(query: str) -> str:
+        """Search all the documents for passages relevant to the query."""
+        return format_context(retriever.retrieve(query))
+
+    async def asearch(query: str) -> str:
+        """Search all the documents for passages relevant to the query."""
+        return format_context(await retriever.aretrieve(query))
+
+    return FunctionTool.from_defaults(fn=search, async_fn=asearch, name=name, description=description)
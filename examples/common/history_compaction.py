@@ -0,0 +1,178 @@
+"""
+Token-budgeted history compaction for LangGraph agents on MessagesState.
+
+An agent node sends the whole `messages` list to the model on every call, so the prompt of a long thread
+grows with every turn. `HistoryCompactor` is a graph node to run before the agent: while the estimated
+tokens of the history stay under `max_tokens` (None for no limit) it changes nothing; past that, it
+removes the oldest messages until the history is back under `target_tokens` (half the budget by default,
+so a thread is compacted once in a while rather than on every turn). With a `model`, the removed messages
+are replaced by a system message summarizing them, which takes their place at the start of the history
+and is folded into the next summary; without one they are just dropped. Leading system prompts are kept.
+
+The history is only cut in front of a user or assistant message, never between an assistant message that
+calls tools and the tool messages that answer it, so the model is never sent a tool result without its
+call or the other way round. The latest message is always kept, with its tool results, even over the budget.
+
+Token estimates (about 4 characters a token, as the mock server counts) are cached by message id, so the
+check on each call only looks up the messages. That relies on a message not being changed in place once
+added, which add_messages never does; the compactor updates the entry of the message its summary replaces.
+`stats()` reports the checks, cache hits, compactions and tokens removed, and `tokens_saved`: what each
+following model call is spared, the tokens removed less the summaries written in their place.
+
+langgraph_agent.py compacts its threads, set with:
+
+    HISTORY_MAX_TOKENS     estimated tokens of history that triggers a compaction (default 16000, 0 turns it off)
+    HISTORY_TARGET_TOKENS  tokens left after a compaction (default half of HISTORY_MAX_TOKENS)
+    HISTORY_SUMMARY        on to summarize the removed messages with the model instead of dropping them (default off)
+"""
+
+import json
+import math
+import os
+from collections import Counter, OrderedDict
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+
+SUMMARY_NAME = "history_summary"
+SUMMARY_PROMPT = "Summarize the earlier part of a conversation between a user and an assistant that uses tools. Keep the facts, names, decisions, tool results and open requests the assistant will need later. Answer with the summary only."
+MESSAGE_OVERHEAD = 4
+
+
+def count_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / 4))
+
+
+def message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    calls = getattr(message, "tool_calls", None) or []
+    return content + "".join(call["name"] + json.dumps(call["args"]) for call in calls)
+
+
+def is_summary(message: BaseMessage) -> bool:
+    return message.type == "system" and message.name == SUMMARY_NAME
+
+
+class HistoryCompactor(RunnableLambda):
+    def __init__(self, max_tokens: int | None = 16000, target_tokens: int | None = None, model: BaseChatModel | None = None, cached_messages: int = 65536):
+        super().__init__(self._run, afunc=self._arun, name="compact")
+        self.max_tokens = max_tokens
+        self.target_tokens = target_tokens if target_tokens is not None else (max_tokens or 0) // 2
+        self.model = model
+        self.cached_messages = cached_messages
+        self.counts = Counter()
+        self._tokens: OrderedDict[str, int] = OrderedDict()
+
+    @classmethod
+    def from_env(cls, model: BaseChatModel | None = None) -> "HistoryCompactor":
+        target_tokens = os.getenv("HISTORY_TARGET_TOKENS")
+        summarize = os.getenv("HISTORY_SUMMARY", "off").lower() == "on"
+        return cls(int(os.getenv("HISTORY_MAX_TOKENS", 16000)) or None, int(target_tokens) if target_tokens else None, model if summarize else None)
+
+    def estimate(self, message: BaseMessage) -> int:
+        """Estimated prompt tokens of a message, cached by its id."""
+        if message.id is not None and (tokens := self._tokens.get(message.id)) is not None:
+            self.counts["cache_hits"] += 1
+            return tokens
+        self.counts["cache_misses"] += 1
+        tokens = count_tokens(message_text(message)) + MESSAGE_OVERHEAD
+        if message.id is not None:
+            self._remember(message.id, tokens)
+        return tokens
+
+    def _remember(self, message_id: str, tokens: int):
+        self._tokens[message_id] = tokens
+        if len(self._tokens) > self.cached_messages:
+            self._tokens.popitem(last=False)
+
+    def plan(self, messages: list[BaseMessage]) -> tuple[int, int, list[int]] | None:
+        """The (start, end) of the messages to compact and the estimate of each message, or None while under the budget."""
+        if self.max_tokens is None:
+            return None
+        self.counts["checks"] += 1
+        misses, cached = self.counts["cache_misses"], self._tokens.get
+        tokens = [cached(message.id) or self.estimate(message) for message in messages]
+        self.counts["cache_hits"] += len(messages) - (self.counts["cache_misses"] - misses)
+        if sum(tokens) <= self.max_tokens:
+            return None
+        start = 0
+        while start < len(messages) and messages[start].type == "system" and not is_summary(messages[start]):
+            start += 1
+        # Cut at the earliest boundary whose tail fits in what the target leaves after the system prompts, or
+        # else at the last one, so that the latest message and its tool results are kept whatever their size
+        budget = self.target_tokens - sum(tokens[:start])
+        tail, end = 0, None
+        for index in range(len(messages) - 1, start, -1):
+            tail += tokens[index]
+            if messages[index].type == "tool":
+                continue
+            if end is not None and tail > budget:
+                break
+            end = index
+        if end is None:
+            return None
+        return start, end, tokens
+
+    def _transcript(self, messages: list[BaseMessage]) -> str:
+        lines = []
+        for message in messages:
+            role = "summary of earlier messages" if is_summary(message) else message.type
+            lines.append(f"{role}: {message_text(message)}")
+        return "\n".join(lines)
+
+    def _summary_prompt(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        return [SystemMessage(SUMMARY_PROMPT), HumanMessage(self._transcript(messages))]
+
+    def _update(self, messages: list[BaseMessage], start: int, end: int, tokens: list[int], summary: str | None) -> dict[str, Any]:
+        removed = messages[start:end]
+        updates: list[BaseMessage] = [RemoveMessage(id=message.id) for message in removed]
+        written = 0
+        if summary is not None:
+            # Takes the place (and id) of the oldest removed message, so it stays at the start of the history
+            updates[0] = SystemMessage(f"Summary of the earlier conversation:\n{summary}", name=SUMMARY_NAME, id=removed[0].id)
+            written = count_tokens(message_text(updates[0])) + MESSAGE_OVERHEAD
+            self._remember(removed[0].id, written)
+        for message in removed[1:] if summary is not None else removed:
+            self._tokens.pop(message.id, None)
+        removed_tokens = sum(tokens[start:end])
+        self.counts["compactions"] += 1
+        self.counts["messages_removed"] += len(removed)
+        self.counts["tokens_removed"] += removed_tokens
+        self.counts["summary_tokens"] += written
+        self.counts["tokens_saved"] += removed_tokens - written
+        return {"messages": updates}
+
+    def _run(self, state: dict) -> dict[str, Any]:
+        messages = state["messages"]
+        if (plan := self.plan(messages)) is None:
+            return {}
+        start, end, tokens = plan
+        summary = self.model.invoke(self._summary_prompt(messages[start:end])).content if self.model is not None else None
+        return self._update(messages, start, end, tokens, summary)
+
+    async def _arun(self, state: dict) -> dict[str, Any]:
+        messages = state["messages"]
+        if (plan := self.plan(messages)) is None:
+            return {}
+        start, end, tokens = plan
+        summary = (await self.model.ainvoke(self._summary_prompt(messages[start:end]))).content if self.model is not None else None
+        return self._update(messages, start, end, tokens, summary)
+
+    def stats(self) -> dict:
+        return {
+            "max_tokens": self.max_tokens,
+            "target_tokens": self.target_tokens,
+            "cached_messages": len(self._tokens),
+            "checks": self.counts["checks"],
+            "cache_hits": self.counts["cache_hits"],
+            "cache_misses": self.counts["cache_misses"],
+            "compactions": self.counts["compactions"],
+            "messages_removed": self.counts["messages_removed"],
+            "tokens_removed": self.counts["tokens_removed"],
+            "summary_tokens": self.counts["summary_tokens"],
+            "tokens_saved": self.counts["tokens_saved"],
+        }
@@ -0,0 +1,147 @@
+"""
+Keyword (BM25) search next to the vector search of the llama-index examples, fused by reciprocal rank.
+
+Embeddings match meaning but often miss exact terms ("PerksPlus", "reimbursed", form names), which is
+what BM25 is good at. `BM25Index` is built from the chunks of an index at ingestion time (see
+common/llamaindex_ingestion.py) and saved as `bm25.npz` next to it, as flat NumPy arrays:
+
+* the vocabulary, sorted, so a term's id is its position,
+* the postings of every term, one after the other: `postings[offsets[t]:offsets[t + 1]]` are the chunks
+  that contain term t and `weights[...]` their BM25 weights for it, computed once when the index is built,
+
+so scoring a query is a `np.bincount` of the postings of its terms, weighted, with no Python loop over chunks.
+`HybridRetriever` runs the vector retriever and the BM25 retriever and fuses their rankings with reciprocal
+rank fusion, which needs no calibration between cosine similarities and BM25 scores.
+"""
+
+import asyncio
+from pathlib import Path
+
+import numpy as np
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.storage.docstore.types import BaseDocumentStore
+
+from common.ann_index import top_k
+from common.local_embeddings import TOKEN_PATTERN
+
+BM25_NAME = "bm25.npz"
+# The usual constant of reciprocal rank fusion: a document ranked r gets 1 / (RRF_K + r) from each ranking
+RRF_K = 60
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    def __init__(self, node_ids: np.ndarray, terms: np.ndarray, offsets: np.ndarray, postings: np.ndarray, weights: np.ndarray):
+        self.node_ids = node_ids
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+        self.weights = weights
+        self._term_ids = {term: i for i, term in enumerate(terms.tolist())}
+
+    @classmethod
+    def build(cls, texts: dict[str, str], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """Indexes each node id's text."""
+        node_ids = list(texts)
+        tokens = [tokenize(texts[node_id]) for node_id in node_ids]
+        terms = np.array(sorted({token for document in tokens for token in document}), dtype=str)
+        term_ids = {term: i for i, term in enumerate(terms.tolist())}
+        lengths = np.array([len(document) for document in tokens], dtype=np.float32)
+
+        # One (term, chunk, count) entry per distinct term of every chunk, grouped by term
+        entry_terms, entry_chunks, entry_counts = [], [], []
+        for position, document in enumerate(tokens):
+            unique, counts = np.unique(np.array([term_ids[token] for token in document], dtype=np.int32), return_counts=True)
+            entry_terms.append(unique)
+            entry_chunks.append(np.full(len(unique), position, dtype=np.int32))
+            entry_counts.append(counts.astype(np.float32))
+        entry_terms = np.concatenate(entry_terms) if tokens else np.empty(0, dtype=np.int32)
+        order = np.argsort(entry_terms, kind="stable")
+        entry_terms = entry_terms[order]
+        postings = np.concatenate(entry_chunks)[order] if tokens else np.empty(0, dtype=np.int32)
+        counts = np.concatenate(entry_counts)[order] if tokens else np.empty(0, dtype=np.float32)
+        document_frequency = np.bincount(entry_terms, minlength=len(terms))
+        offsets = np.concatenate([[0], np.cumsum(document_frequency)]).astype(np.int64)
+
+        idf = np.log1p((len(node_ids) - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        length_norm = 1 - b + b * lengths[postings] / max(float(lengths.mean()) if len(lengths) else 0.0, 1e-9)
+        weights = (idf[entry_terms] * counts * (k1 + 1) / (counts + k1 * length_norm)).astype(np.float32)
+        return cls(np.array(node_ids, dtype=str), terms, offsets, postings, weights)
+
+    def search(self, query: str, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Positions of the k best-scoring chunks for the query, best first, and their scores. Chunks sharing no term are left out."""
+        term_ids = sorted({self._term_ids[token] for token in tokenize(query) if token in self._term_ids})
+        if not term_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        spans = [slice(self.offsets[term_id], self.offsets[term_id + 1]) for term_id in term_ids]
+        scores = np.bincount(np.concatenate([self.postings[span] for span in spans]), weights=np.concatenate([self.weights[span] for span in spans]), minlength=len(self.node_ids))
+        top = top_k(scores, k)
+        top = top[scores[top] > 0]
+        return top, scores[top]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.node_ids, self.terms, self.offsets, self.postings, self.weights))
+
+    def save(self, path: Path):
+        with open(path.with_name(path.name + ".tmp"), "wb") as f:
+            np.savez(f, node_ids=self.node_ids, terms=self.terms, offsets=self.offsets, postings=self.postings, weights=self.weights)
+        path.with_name(path.name + ".tmp").replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with np.load(path) as saved:
+            return cls(saved["node_ids"], saved["terms"], saved["offsets"], saved["postings"], saved["weights"])
+
+    @classmethod
+    def from_docstore(cls, docstore: BaseDocumentStore) -> "BM25Index":
+        return cls.build({node_id: node.get_content() for node_id, node in docstore.docs.items()})
+
+
+class BM25Retriever(BaseRetriever):
+    def __init__(self, index: BM25Index, docstore: BaseDocumentStore, similarity_top_k: int = 3):
+        self._index = index
+        self._docstore = docstore
+        self._similarity_top_k = similarity_top_k
+        super().__init__()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        top, scores = self._index.search(query_bundle.query_str, self._similarity_top_k)
+        nodes = self._docstore.get_nodes([str(self._index.node_ids[i]) for i in top])
+        return [NodeWithScore(node=node, score=float(score)) for node, score in zip(nodes, scores)]
+
+
+def reciprocal_rank_fusion(rankings: list[list[NodeWithScore]], top_k: int, rrf_k: int = RRF_K) -> list[NodeWithScore]:
+    """The top_k nodes by the sum over the rankings of 1 / (rrf_k + rank), with that sum as their score."""
+    fused: dict[str, float] = {}
+    nodes: dict[str, NodeWithScore] = {}
+    for ranking in rankings:
+        for rank, node in enumerate(ranking, 1):
+            fused[node.node.node_id] = fused.get(node.node.node_id, 0.0) + 1.0 / (rrf_k + rank)
+            nodes.setdefault(node.node.node_id, node)
+    best = sorted(fused, key=fused.get, reverse=True)[:top_k]
+    return [NodeWithScore(node=nodes[node_id].node, score=fused[node_id]) for node_id in best]
+
+
+class HybridRetriever(BaseRetriever):
+    def __init__(self, vector_retriever: BaseRetriever, keyword_retriever: BaseRetriever, similarity_top_k: int = 3):
+        self._retrievers = [vector_retriever, keyword_retriever]
+        self._similarity_top_k = similarity_top_k
+        super().__init__()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        return reciprocal_rank_fusion([retriever.retrieve(query_bundle) for retriever in self._retrievers], self._similarity_top_k)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        rankings = await asyncio.gather(*(retriever.aretrieve(query_bundle) for retriever in self._retrievers))
+        return reciprocal_rank_fusion(list(rankings), self._similarity_top_k)
+
+
+def hybrid_retriever(index, persist_dir: str | Path, similarity_top_k: int = 3, candidates: int = 10) -> HybridRetriever:
+    """Vector and BM25 search over an index from load_or_build_index(), each ranking `candidates` chunks before the fusion."""
+    keywords = BM25Index.load(Path(persist_dir) / BM25_NAME)
+    return HybridRetriever(index.as_retriever(similarity_top_k=candidates), BM25Retriever(keywords, index.docstore, candidates), similarity_top_k)
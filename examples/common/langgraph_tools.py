@@ -0,0 +1,88 @@
+"""
+Concurrent tool node for the LangGraph examples.
+
+With `parallel_tool_calls` allowed, the model can ask for several tools in one message instead of one per
+round trip. `ConcurrentToolNode` takes the place of LangGraph's ToolNode and runs those tool calls at the
+same time with common/tool_calls.py's ToolRunner: tools with an async implementation on an event loop (the
+graph's own when it runs async), the others on a thread pool. ToolNode cannot run async-only tools in a
+graph invoked synchronously. The tool messages are added to the state in the order of the tool calls,
+whichever finishes first, so the history is the same from run to run. Each run keeps its tool calls to
+itself, so one node can serve graph runs on several threads at once (app.batch, or a threaded server).
+
+`turns` holds the timings of the last `recent_turns` turns, and `stats()` totals them over every turn.
+"""
+
+import json
+import threading
+from collections import Counter, deque
+from typing import Any
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import BaseTool
+
+from common.tool_calls import ToolCall, ToolRunner, ToolTurn
+
+
+def _function(tool: BaseTool):
+    if getattr(tool, "coroutine", None) is not None:
+
+        async def run_async(**arguments):
+            return await tool.ainvoke(arguments)
+
+        return run_async
+    return lambda **arguments: tool.invoke(arguments)
+
+
+class ConcurrentToolNode(RunnableLambda):
+    def __init__(self, tools: list[BaseTool], timeout: float | None = None, max_workers: int | None = None, recent_turns: int = 256):
+        super().__init__(self._run, afunc=self._arun, name="tools")
+        self.timeout = timeout
+        self.turns: deque[ToolTurn] = deque(maxlen=recent_turns)
+        self.counts = Counter()
+        self.seconds = Counter()
+        self._lock = threading.Lock()
+        self._runner = ToolRunner({tool.name: _function(tool) for tool in tools}, max_workers)
+
+    @staticmethod
+    def _tool_calls(state: dict) -> list[ToolCall]:
+        message: AIMessage = state["messages"][-1]
+        return [ToolCall(id=call["id"], name=call["name"], arguments=json.dumps(call["args"]), complete=True) for call in message.tool_calls]
+
+    @staticmethod
+    def _update(tool_calls: list[ToolCall], messages: list[dict]) -> dict[str, Any]:
+        return {"messages": [ToolMessage(content=message["content"], tool_call_id=call.id, name=call.name) for call, message in zip(tool_calls, messages)]}
+
+    def _record(self, turn: ToolTurn):
+        with self._lock:
+            self.turns.append(turn)
+            self.counts["turns"] += 1
+            self.counts["calls"] += turn.calls
+            self.counts["timed_out"] += len(turn.timed_out)
+            self.seconds["wall"] += turn.wall_time
+            self.seconds["sequential"] += turn.sequential_time
+
+    def _run(self, state: dict) -> dict[str, Any]:
+        tool_calls = self._tool_calls(state)
+        messages, turn = self._runner.run_turn(tool_calls, self.timeout)
+        self._record(turn)
+        return self._update(tool_calls, messages)
+
+    async def _arun(self, state: dict) -> dict[str, Any]:
+        tool_calls = self._tool_calls(state)
+        messages, turn = await self._runner.arun_turn(tool_calls, self.timeout)
+        self._record(turn)
+        return self._update(tool_calls, messages)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "turns": self.counts["turns"],
+                "calls": self.counts["calls"],
+                "timed_out": self.counts["timed_out"],
+                "wall_seconds": self.seconds["wall"],
+                "sequential_seconds": self.seconds["sequential"],
+            }
+
+    def close(self):
+        self._runner.close()
@@ -0,0 +1,284 @@
+"""
+Incremental, content-hashed ingestion for the llama-index examples.
+
+`load_or_build_index()` persists each index together with a manifest of the SHA-256 of every source
+file and the embedding model it was built with, and loads it back from the same directory:
+
+* warm start: every file hash matches, so the index is loaded as is, with no parsing and no embedding,
+* incremental start: only the changed files are parsed, and only their pages whose text changed are
+  re-embedded (llama-index compares each page's hash with the one stored in the docstore),
+* cold start: no usable manifest (or another embedding model), so every page is parsed and embedded.
+
+Pages get stable ids ("<file name>:page-<label>") and only stable metadata, so moving the repository or
+touching a file does not make unchanged pages look new.
+
+PDFs are parsed a few pages per task in a process pool (PARSE_WORKERS, default one per CPU), a bounded
+number of tasks ahead of the indexing, and the pages stream through chunking and embedding in batches,
+so a large drop of documents uses every core without ever holding all of its parsed pages at once. The
+pool is shared by every build in the process, so indexes built at the same time stay within PARSE_WORKERS,
+and all its workers are started with it: create it with `parse_pool()` before starting threads that build
+indexes, so that no worker is forked while another thread holds a lock.
+
+The vectors live in a memory-mapped NumPy store (see common/numpy_vector_store.py), searched exactly,
+through an IVF index (vector_index="ivf"), or on a quantized int8 or binary copy with an exact re-rank
+(vector_index="int8" or "binary", see common/ann_index.py). Indexes persisted with llama-index's
+JSON vector store are converted on their next load, without re-embedding. Every build also saves a BM25
+keyword index of the chunks for hybrid search (see common/hybrid_retrieval.py).
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from llama_index.core import Document, Settings, SimpleDirectoryReader, StorageContext, VectorStoreIndex, load_index_from_storage
+from llama_index.core.ingestion import run_transformations
+from llama_index.core.vector_stores import SimpleVectorStore
+from pypdf import PdfReader
+
+from common.hybrid_retrieval import BM25_NAME, BM25Index
+from common.numpy_vector_store import NumpyVectorStore, store_paths
+
+MANIFEST_NAME = "manifest.json"
+PAGES_PER_TASK = 8
+PAGES_PER_BATCH = 32
+# What SimpleDirectoryReader keeps out of the text that is embedded or sent to the LLM
+EXCLUDED_METADATA_KEYS = ["file_name", "file_type", "file_size", "creation_date", "last_modified_date", "last_accessed_date"]
+
+
+@dataclass
+class IngestionReport:
+    mode: str
+    seconds: float
+    pages: int
+    pages_embedded: int
+    pages_removed: int = 0
+    pages_parsed: int = 0
+    peak_rss_mb: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages_parsed / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        text = f"{self.mode} start in {self.seconds:.2f} s, {self.pages_embedded} of {self.pages} pages embedded, {self.pages_removed} removed"
+        if self.pages_parsed:
+            text += f", {self.pages_per_second:.1f} pages/s, peak RSS {self.peak_rss_mb:.0f} MB"
+        return text
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far (ru_maxrss is in KB on Linux and in bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def parse_workers() -> int:
+    return int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def parse_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    """The PDF parsing pool of the process, started with `workers` (default PARSE_WORKERS) processes on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(workers or parse_workers())
+            # Runs a task now, so that every worker is started (forked) here rather than by a later submit
+            _pool.submit(int).result()
+        return _pool
+
+
+def shutdown_parse_pool():
+    """Stops the parsing workers once no more indexes are being built."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def page_document(file_name: str, page_label: str, text: str) -> Document:
+    """The Document SimpleDirectoryReader would make for a PDF page, with a stable id."""
+    return Document(
+        id_=f"{file_name}:page-{page_label}",
+        text=text,
+        metadata={"page_label": page_label, "file_name": file_name},
+        excluded_embed_metadata_keys=list(EXCLUDED_METADATA_KEYS),
+        excluded_llm_metadata_keys=list(EXCLUDED_METADATA_KEYS),
+    )
+
+
+def parse_pdf_pages(path: str, start: int, stop: int) -> list[tuple[str, str]]:
+    """Label and text of pages start to stop - 1. Runs in the worker processes, so it only returns plain strings."""
+    reader = PdfReader(path)
+    return [(reader.page_labels[i], reader.pages[i].extract_text()) for i in range(start, stop)]
+
+
+def _read_other(path: Path) -> list[Document]:
+    pages = SimpleDirectoryReader(input_files=[path], file_metadata=lambda name: {"file_name": Path(name).name}).load_data()
+    for page in pages:
+        page.id_ = f"{page.metadata['file_name']}:page-{page.metadata.get('page_label', 1)}"
+    return pages
+
+
+def iter_pages(files: list[Path], workers: int | None = None, pages_per_task: int = PAGES_PER_TASK) -> Iterator[Document]:
+    """Yields one Document per page, in order, with ids and metadata that only depend on the content.
+
+    PDF pages are parsed in the shared process pool, at most two tasks per worker ahead of the consumer.
+    Other file types go through SimpleDirectoryReader in this process.
+    """
+    workers = workers or parse_workers()
+    tasks = []
+    for path in files:
+        if path.suffix.lower() == ".pdf":
+            page_count = len(PdfReader(path).pages)
+            tasks += [(path, start, min(page_count, start + pages_per_task)) for start in range(0, page_count, pages_per_task)]
+        else:
+            tasks.append((path, None, None))
+
+    def documents(path: Path, result: Future | list | None) -> list[Document]:
+        if result is None:
+            return _read_other(path)
+        pages = result.result() if isinstance(result, Future) else result
+        return [page_document(path.name, label, text) for label, text in pages]
+
+    if workers <= 1 or len(tasks) < 2:
+        for path, start, stop in tasks:
+            yield from documents(path, parse_pdf_pages(str(path), start, stop) if start is not None else None)
+        return
+
+    pool = parse_pool(workers)
+    pending = deque()
+    for path, start, stop in tasks:
+        pending.append((path, pool.submit(parse_pdf_pages, str(path), start, stop) if start is not None else None))
+        if len(pending) >= 2 * workers:
+            yield from documents(*pending.popleft())
+    while pending:
+        yield from documents(*pending.popleft())
+
+
+def load_pages(files: list[Path]) -> list[Document]:
+    """Parses files into one Document per page, with ids and metadata that only depend on the content."""
+    return list(iter_pages(files))
+
+
+def ingest_pages(index: VectorStoreIndex, pages: Iterable[Document], batch_size: int = PAGES_PER_BATCH) -> tuple[int, set[str]]:
+    """Inserts new and changed pages a batch at a time, like refresh_ref_docs() but with one embedding call per batch.
+
+    Returns how many pages were embedded and the ids of every page seen.
+    """
+    embedded, seen = 0, set()
+    pages = iter(pages)
+    while batch := list(itertools.islice(pages, batch_size)):
+        changed = []
+        for page in batch:
+            seen.add(page.id_)
+            existing_hash = index.docstore.get_document_hash(page.id_)
+            if existing_hash == page.hash:
+                continue
+            if existing_hash is not None:
+                index.delete_ref_doc(page.id_, delete_from_docstore=True)
+            changed.append(page)
+        if changed:
+            index.insert_nodes(run_transformations(changed, Settings.transformations))
+            for page in changed:
+                index.docstore.set_document_hash(page.id_, page.hash)
+            embedded += len(changed)
+    return embedded, seen
+
+
+def read_manifest(persist_dir: Path) -> dict | None:
+    try:
+        return json.loads((persist_dir / MANIFEST_NAME).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def index_version(*persist_dirs: Path) -> str:
+    """Fingerprint of the files and embedding model the indexes in persist_dirs were built from, which changes when one is rebuilt."""
+    digest = hashlib.sha256()
+    for persist_dir in persist_dirs:
+        digest.update(json.dumps(read_manifest(Path(persist_dir)), sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def json_store_path(persist_dir: Path) -> Path:
+    return store_paths(persist_dir)[0].with_suffix(".json")
+
+
+def load_vector_store(persist_dir: Path, dtype: str, index: str) -> tuple[NumpyVectorStore, bool]:
+    """Opens the NumPy vector store in persist_dir, converting a JSON vector store if that is what is there."""
+    if NumpyVectorStore.exists(persist_dir):
+        return NumpyVectorStore.from_persist_dir(persist_dir, index=index), False
+    return NumpyVectorStore.from_simple(SimpleVectorStore.from_persist_dir(str(persist_dir), namespace="default"), dtype, index), True
+
+
+def load_or_build_index(files: list[Path], persist_dir: Path, embedding_model: str, vector_dtype: str = "float32", vector_index: str = "exact") -> tuple[VectorStoreIndex, IngestionReport]:
+    """Loads the index persisted in persist_dir, re-embedding only what changed in `files` since it was built."""
+    start = time.perf_counter()
+    persist_dir = Path(persist_dir)
+    hashes = {path.name: file_sha256(path) for path in files}
+    manifest = read_manifest(persist_dir)
+
+    if manifest is None or manifest.get("embedding_model") != embedding_model:
+        index = VectorStoreIndex([], storage_context=StorageContext.from_defaults(vector_store=NumpyVectorStore(vector_dtype, index=vector_index)))
+        embedded, pages = ingest_pages(index, iter_pages(files))
+        report = IngestionReport("cold", 0.0, len(pages), embedded, pages_parsed=len(pages))
+    else:
+        vector_store, converted = load_vector_store(persist_dir, vector_dtype, vector_index)
+        index = load_index_from_storage(StorageContext.from_defaults(persist_dir=str(persist_dir), vector_store=vector_store))
+        changed = {name for name, digest in hashes.items() if manifest["files"].get(name) != digest}
+        removed = set(manifest["files"]) - set(hashes)
+        if not changed and not removed:
+            pages_total = sum(1 for info in index.ref_doc_info.values() if info.metadata.get("file_name") in hashes)
+            if converted or not vector_store.index_ready:
+                # Saved now, so the next start does not have to build the search index again; the vectors are
+                # only written when converted, not rewritten under the memory map of the file they were read from
+                vector_store.build_index()
+                if converted:
+                    vector_store.persist(str(json_store_path(persist_dir)))
+                    json_store_path(persist_dir).unlink(missing_ok=True)
+                else:
+                    vector_store.persist_index(persist_dir)
+            if not (persist_dir / BM25_NAME).exists():
+                BM25Index.from_docstore(index.docstore).save(persist_dir / BM25_NAME)
+            return index, IngestionReport("warm", time.perf_counter() - start, pages_total, 0)
+
+        embedded, current_ids = ingest_pages(index, iter_pages([path for path in files if path.name in changed]))
+        # Pages of changed or removed files that are not in the new parse (for example, a shorter PDF)
+        stale = [doc_id for doc_id, info in index.ref_doc_info.items() if info.metadata.get("file_name") in changed | removed and doc_id not in current_ids]
+        for doc_id in stale:
+            index.delete_ref_doc(doc_id, delete_from_docstore=True)
+        pages_total = sum(1 for info in index.ref_doc_info.values() if info.metadata.get("file_name") in hashes)
+        report = IngestionReport("incremental", 0.0, pages_total, embedded, len(stale), len(current_ids))
+
+    index.vector_store.build_index()
+    index.storage_context.persist(persist_dir=str(persist_dir))
+    BM25Index.from_docstore(index.docstore).save(persist_dir / BM25_NAME)
+    # The JSON vector store an index was converted from would only go stale
+    json_store_path(persist_dir).unlink(missing_ok=True)
+    (persist_dir / MANIFEST_NAME).write_text(json.dumps({"embedding_model": embedding_model, "files": hashes}, indent=2) + "\n")
+    report.seconds = time.perf_counter() - start
+    report.peak_rss_mb = peak_rss_mb()
+    return index, report
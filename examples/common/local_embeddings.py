@@ -0,0 +1,31 @@
+"""
+Deterministic, dependency-free text embeddings for offline runs.
+
+Words and word bigrams are hashed into a fixed number of dimensions with a random sign
+(the "hashing trick") and the vector is L2-normalized. Texts that share words get similar
+vectors, which is enough for repeatable retrieval benchmarks without a hosted embedding model.
+"""
+
+import hashlib
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+def hash_embedding(text: str, dimensions: int = 1536) -> list[float]:
+    words = TOKEN_PATTERN.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = [0.0] * dimensions
+    for feature in features:
+        h = _hash(feature)
+        vector[h % dimensions] += 1.0 if h >> 63 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        vector[0] = 1.0
+        return vector
+    return [value / norm for value in vector]
@@ -0,0 +1,386 @@
+"""
+Local OpenAI-compatible stand-in for offline load and latency testing.
+
+Serves the chat-completions and embeddings APIs (with and without a `/v1` prefix, and under the
+Azure OpenAI `/openai/deployments/<name>/` paths) so every example can run with API_HOST=local:
+
+    python -m examples serve-mock --port 8000 --token-latency 0.01
+    API_HOST=local python examples/openai_functioncalling.py
+
+Responses come from a JSON script of rules. The first rule whose `match` fits the request answers it:
+
+    {
+        "rules": [
+            {"match": {"contains": "weekend", "last_role": "user"}, "response": {"tool_calls": [{"name": "get_weather", "arguments": {"city": "Seattle"}}]}},
+            {"match": {"last_role": "tool"}, "response": {"content": "Go to the museum, it will rain."}},
+            {"match": {"tool": "transfer_to_spanish_agent"}, "response": {"handoff": "spanish_agent"}},
+            {"match": {"contains": "seat"}, "responses": [{"json": {"row": 1, "seat": "A"}}, {"content": "Sorry?"}]}
+        ],
+        "default": {"content": "This is a mock response."},
+        "errors": [{"every": 10, "status": 429, "retry_after": 1}]
+    }
+
+`responses` lists are answered in turn. `handoff` is a tool call to `transfer_to_<agent>`, and `json` returns
+its value as the message content. Without a matching rule, a user turn that offers tools calls each of them
+with placeholder arguments generated from their schema, and requests that require a JSON schema get a placeholder
+value, so tool loops and structured-output agents keep working.
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aiohttp import web
+
+from common.local_embeddings import hash_embedding
+
+TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+@dataclass
+class MockOptions:
+    script: dict = field(default_factory=dict)
+    ttft: float = 0.0
+    token_latency: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    retry_after: float | None = 1.0
+    rpm: int | None = None
+    tpm: int | None = None
+    seed: int = 0
+    embedding_dimensions: int = 1536
+
+
+def count_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / 4))
+
+
+def message_text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def placeholder_from_schema(schema: dict, defs: dict | None = None):
+    """Builds a value that validates against a (simple) JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", schema.get("definitions", {}))
+    if "$ref" in schema:
+        return placeholder_from_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            return placeholder_from_schema(schema[key][0], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+    if schema_type == "object":
+        return {name: placeholder_from_schema(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return [placeholder_from_schema(schema.get("items", {}), defs)] * schema.get("minItems", 1)
+    if schema_type == "integer":
+        return int(schema.get("minimum", 1))
+    if schema_type == "number":
+        return float(schema.get("minimum", 1.0))
+    if schema_type == "boolean":
+        return True
+    if schema_type == "null":
+        return None
+    return "string"
+
+
+class RateWindow:
+    """Fixed one-minute window for the optional requests/minute and tokens/minute limits."""
+
+    def __init__(self, rpm: int | None, tpm: int | None):
+        self.rpm, self.tpm = rpm, tpm
+        self.started = time.monotonic()
+        self.requests = 0
+        self.tokens = 0
+
+    def reset_in(self) -> float:
+        elapsed = time.monotonic() - self.started
+        if elapsed >= 60:
+            self.started, self.requests, self.tokens = time.monotonic(), 0, 0
+            return 60.0
+        return 60 - elapsed
+
+    def admit(self, tokens: int) -> bool:
+        self.reset_in()
+        if (self.rpm and self.requests + 1 > self.rpm) or (self.tpm and self.tokens + tokens > self.tpm):
+            return False
+        self.requests += 1
+        self.tokens += tokens
+        return True
+
+    def headers(self) -> dict:
+        reset = f"{self.reset_in():.3f}s"
+        headers = {}
+        if self.rpm:
+            headers |= {"x-ratelimit-limit-requests": str(self.rpm), "x-ratelimit-remaining-requests": str(max(0, self.rpm - self.requests)), "x-ratelimit-reset-requests": reset}
+        if self.tpm:
+            headers |= {"x-ratelimit-limit-tokens": str(self.tpm), "x-ratelimit-remaining-tokens": str(max(0, self.tpm - self.tokens)), "x-ratelimit-reset-tokens": reset}
+        return headers
+
+
+class MockServer:
+    def __init__(self, options: MockOptions | None = None):
+        self.options = options or MockOptions()
+        self.random = random.Random(self.options.seed)
+        self.window = RateWindow(self.options.rpm, self.options.tpm)
+        self.stats = Counter()
+        self.active = 0
+        self.base_url: str | None = None
+        self._cursors: dict[int, itertools.cycle] = {}
+        self.app = web.Application()
+        for prefix in ("", "/v1", "/openai/deployments/{deployment}"):
+            self.app.router.add_post(f"{prefix}/chat/completions", self.chat_completions)
+            self.app.router.add_post(f"{prefix}/embeddings", self.embeddings)
+        self.app.router.add_get("/_stats", self.get_stats)
+        self.app.router.add_post("/_reset", self.reset)
+
+    def reset_stats(self):
+        self.stats.clear()
+        self._cursors.clear()
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.stats))
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.reset_stats()
+        return web.json_response({})
+
+    def error_response(self, status: int, message: str, retry_after: float | None = None) -> web.Response:
+        self.stats["errors"] += 1
+        self.stats[f"errors_{status}"] += 1
+        headers = self.window.headers()
+        if retry_after is not None:
+            headers |= {"Retry-After": str(math.ceil(retry_after)), "retry-after-ms": str(int(retry_after * 1000))}
+        error_type = "rate_limit_exceeded" if status == 429 else "server_error"
+        return web.json_response({"error": {"message": message, "type": error_type, "code": str(status)}}, status=status, headers=headers)
+
+    def injected_error(self, endpoint: str, tokens: int) -> web.Response | None:
+        for rule in self.options.script.get("errors", []):
+            if rule.get("endpoint", endpoint) == endpoint and self.stats[endpoint] % rule["every"] == 0:
+                return self.error_response(rule.get("status", 429), "Injected error", rule.get("retry_after", self.options.retry_after))
+        if self.options.error_rate and self.random.random() < self.options.error_rate:
+            return self.error_response(self.options.error_status, "Injected error", self.options.retry_after)
+        if not self.window.admit(tokens):
+            return self.error_response(429, "Rate limit exceeded", self.window.reset_in())
+        return None
+
+    def pick_response(self, body: dict) -> dict:
+        messages = body.get("messages", [])
+        last = messages[-1] if messages else {}
+        last_user = next((message_text(m) for m in reversed(messages) if m.get("role") == "user"), "")
+        offered = {tool["function"]["name"] for tool in body.get("tools", []) if tool.get("type") == "function"}
+        for index, rule in enumerate(self.options.script.get("rules", [])):
+            match = rule.get("match", {})
+            if "contains" in match and match["contains"].lower() not in last_user.lower():
+                continue
+            if "last_role" in match and match["last_role"] != last.get("role"):
+                continue
+            if "tool" in match and match["tool"] not in offered:
+                continue
+            if "model" in match and match["model"] != body.get("model"):
+                continue
+            if "responses" in rule:
+                cursor = self._cursors.setdefault(index, itertools.cycle(rule["responses"]))
+                return next(cursor)
+            return rule["response"]
+        return self.default_response(body)
+
+    def default_response(self, body: dict) -> dict:
+        tools = [tool["function"] for tool in body.get("tools", []) if tool.get("type") == "function"]
+        tool_choice = body.get("tool_choice")
+        if tools and (tool_choice == "required" or isinstance(tool_choice, dict)):
+            name = tool_choice["function"]["name"] if isinstance(tool_choice, dict) else tools[0]["name"]
+            function = next(tool for tool in tools if tool["name"] == name)
+            return {"tool_calls": [{"name": name, "arguments": placeholder_from_schema(function.get("parameters", {}))}]}
+        # A fresh user turn with tools on offer calls each of them once (handoffs excepted), so tool loops run end to end
+        last = (body.get("messages") or [{}])[-1]
+        callable_tools = [tool for tool in tools if not tool["name"].startswith("transfer_to_")]
+        if callable_tools and tool_choice != "none" and last.get("role") == "user":
+            return {"tool_calls": [{"name": tool["name"], "arguments": placeholder_from_schema(tool.get("parameters", {}))} for tool in callable_tools]}
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            return {"json": placeholder_from_schema(response_format["json_schema"].get("schema", {}))}
+        if response_format.get("type") == "json_object":
+            return {"json": {}}
+        return self.options.script.get("default", {"content": "This is a mock response."})
+
+    def build_message(self, response: dict) -> dict:
+        tool_calls = [{"name": call["name"], "arguments": call.get("arguments", {})} for call in response.get("tool_calls", [])]
+        if "handoff" in response:
+            tool_calls.append({"name": f"transfer_to_{response['handoff']}", "arguments": {}})
+        content = json.dumps(response["json"]) if "json" in response else response.get("content")
+        message = {"role": "assistant", "content": content if not tool_calls else response.get("content")}
+        if tool_calls:
+            message["tool_calls"] = [{"id": f"call_{uuid.uuid4().hex[:24]}", "type": "function", "function": {"name": call["name"], "arguments": call["arguments"] if isinstance(call["arguments"], str) else json.dumps(call["arguments"])}} for call in tool_calls]
+        return message
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.stats["chat_completions"] += 1
+        prompt_tokens = sum(count_tokens(message_text(m)) for m in body.get("messages", []))
+        error = self.injected_error("chat_completions", prompt_tokens)
+        if error is not None:
+            return error
+
+        message = self.build_message(self.pick_response(body))
+        if body.get("parallel_tool_calls") is False and message.get("tool_calls"):
+            message["tool_calls"] = message["tool_calls"][:1]
+        pieces = self.pieces(message)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(pieces), "total_tokens": prompt_tokens + len(pieces)}
+        self.stats["prompt_tokens"] += prompt_tokens
+        self.stats["completion_tokens"] += len(pieces)
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model") or request.match_info.get("deployment", "mock")
+
+        self.active += 1
+        self.stats["max_concurrency"] = max(self.stats["max_concurrency"], self.active)
+        try:
+            if body.get("stream"):
+                return await self.stream_completion(request, completion_id, model, message, pieces, finish_reason, usage, body.get("stream_options") or {})
+            await asyncio.sleep(self.options.ttft + self.options.token_latency * len(pieces))
+            completion = {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+                "usage": usage,
+            }
+            return web.json_response(completion, headers=self.window.headers())
+        finally:
+            self.active -= 1
+
+    def pieces(self, message: dict) -> list[tuple]:
+        """Splits a message into the token-sized deltas a streaming response would send."""
+        pieces = [("content", token) for token in TOKEN_PATTERN.findall(message.get("content") or "")]
+        for index, call in enumerate(message.get("tool_calls", [])):
+            arguments = call["function"]["arguments"]
+            pieces.append(("tool_call", index, call, ""))
+            pieces.extend(("arguments", index, arguments[i : i + 8]) for i in range(0, len(arguments), 8))
+        return pieces
+
+    async def stream_completion(self, request, completion_id, model, message, pieces, finish_reason, usage, stream_options) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache", **self.window.headers()})
+        await response.prepare(request)
+
+        async def send(delta: dict | None, finish: str | None = None, **extra):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model, "choices": [], **extra}
+            if delta is not None:
+                chunk["choices"] = [{"index": 0, "delta": delta, "finish_reason": finish, "logprobs": None}]
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        await asyncio.sleep(self.options.ttft)
+        await send({"role": "assistant", "content": ""})
+        for piece in pieces:
+            await asyncio.sleep(self.options.token_latency)
+            if piece[0] == "content":
+                await send({"content": piece[1]})
+            elif piece[0] == "tool_call":
+                _, index, call, _ = piece
+                await send({"tool_calls": [{"index": index, "id": call["id"], "type": "function", "function": {"name": call["function"]["name"], "arguments": ""}}]})
+            else:
+                _, index, arguments = piece
+                await send({"tool_calls": [{"index": index, "function": {"arguments": arguments}}]})
+        await send({}, finish_reason)
+        if stream_options.get("include_usage"):
+            await send(None, usage=usage)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.stats["embeddings"] += 1
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        texts = [text if isinstance(text, str) else " ".join(map(str, text)) for text in inputs]
+        prompt_tokens = sum(count_tokens(text) for text in texts)
+        error = self.injected_error("embeddings", prompt_tokens)
+        if error is not None:
+            return error
+        self.stats["embedded_texts"] += len(texts)
+
+        dimensions = body.get("dimensions") or self.options.embedding_dimensions
+        await asyncio.sleep(self.options.ttft + self.options.token_latency * len(texts))
+        data = []
+        for index, text in enumerate(texts):
+            embedding = hash_embedding(text, dimensions)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(struct.pack(f"<{dimensions}f", *embedding)).decode()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        usage = {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens}
+        return web.json_response({"object": "list", "data": data, "model": body.get("model", "mock"), "usage": usage}, headers=self.window.headers())
+
+
+@contextmanager
+def run_in_thread(options: MockOptions | None = None, host: str = "127.0.0.1", port: int = 0):
+    """Runs a MockServer on a background event loop, for benchmarks that drive it from the same process."""
+    server = MockServer(options)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(server.app, access_log=None)
+
+    async def start():
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        server.base_url = f"http://{host}:{runner.addresses[0][1]}"
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(start(), loop).result()
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m examples serve-mock", description="Serve the local OpenAI-compatible stand-in used by API_HOST=local.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--script", type=Path, help="JSON file with response rules.")
+    parser.add_argument("--ttft", type=float, default=0.0, help="Seconds before the first token.")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds per generated token.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail with --error-status.")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected errors.")
+    parser.add_argument("--rpm", type=int, help="Requests per minute before returning 429.")
+    parser.add_argument("--tpm", type=int, help="Tokens per minute before returning 429.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    options = MockOptions(
+        script=json.loads(args.script.read_text()) if args.script else {},
+        ttft=args.ttft,
+        token_latency=args.token_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        seed=args.seed,
+    )
+    print(f"Mock OpenAI server listening on http://{args.host}:{args.port} (set API_HOST=local to use it)")
+    web.run_app(MockServer(options).app, host=args.host, port=args.port, print=None, access_log=None)
@@ -0,0 +1,237 @@
+"""
+Memory-mapped NumPy vector store for the llama-index examples.
+
+llama-index's default SimpleVectorStore persists every embedding as a JSON list and loads it back as
+Python floats, so loading is slow and each float costs about 32 bytes of memory. `NumpyVectorStore` keeps:
+
+* the embeddings, L2-normalized, in one contiguous float32 (or float16) `<namespace>__vector_store.npy`
+  file that is opened with `np.load(mmap_mode="r")`, so loading reads only the header and the OS pages
+  vectors in as queries touch them,
+* node ids, document ids and the metadata used by filters in a small `<namespace>__vector_store.ids.json`.
+
+By default a query scores every vector with one matrix-vector product (cosine similarity, since the rows
+are normalized) and picks the top k with `np.argpartition`. With index="ivf", it only scores the vectors
+in the clusters closest to the query, and with index="int8" or "binary" it scores a quantized copy of the
+vectors and re-ranks a shortlist exactly (see common/ann_index.py). Those indexes are built on the first
+query after a change and saved in `<namespace>__vector_store.<index>.npz`, on their own when the vectors
+have not changed since they were saved.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.simple import SimpleVectorStore, _build_metadata_filter_fn
+from llama_index.core.vector_stores.types import BasePydanticVectorStore, VectorStoreQuery, VectorStoreQueryMode, VectorStoreQueryResult
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
+
+from common.ann_index import make_index, score_all, top_k
+
+DEFAULT_NAMESPACE = "default"
+# Metadata that only repeats what the store or the docstore already has
+DROPPED_METADATA = {"_node_content", "_node_type", "document_id", "doc_id", "ref_doc_id"}
+
+
+def store_paths(persist_dir: str | Path, namespace: str = DEFAULT_NAMESPACE) -> tuple[Path, Path]:
+    base = Path(persist_dir) / f"{namespace}__vector_store"
+    return base.with_suffix(".npy"), base.with_suffix(".ids.json")
+
+
+def index_path(persist_dir: str | Path, index: str, namespace: str = DEFAULT_NAMESPACE) -> Path:
+    return Path(persist_dir) / f"{namespace}__vector_store.{index}.npz"
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _replace(path: Path, write):
+    """Writes through a temporary file, so a memory map of the old file stays valid and a crash leaves no partial file."""
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as f:
+        write(f)
+    os.replace(temporary, path)
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    stores_text: bool = False
+    dtype: str = Field(default="float32", description="float32, or float16 for half the size.")
+    index: str = Field(default="exact", description="exact, ivf for approximate search over large stores, or int8 or binary for quantized search with exact re-rank.")
+
+    _vectors: np.ndarray = PrivateAttr()
+    _ids: list[str] = PrivateAttr()
+    _ref_doc_ids: list[str] = PrivateAttr()
+    _metadata: list[dict] = PrivateAttr()
+    _positions: dict[str, int] = PrivateAttr()
+    _search: Any = PrivateAttr()
+    _search_ready: bool = PrivateAttr()
+    _saved_at: Path | None = PrivateAttr()
+
+    def __init__(self, dtype: str = "float32", vectors: np.ndarray | None = None, ids: list[str] | None = None, ref_doc_ids: list[str] | None = None, metadata: list[dict] | None = None, index: str = "exact", index_options: dict | None = None, **kwargs: Any):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported dtype {dtype!r}, use float32 or float16")
+        super().__init__(dtype=dtype, index=index, **kwargs)
+        self._search = make_index(index, **(index_options or {}))
+        self._search_ready = False
+        self._saved_at = None
+        self._vectors = vectors if vectors is not None else np.empty((0, 0), dtype=dtype)
+        self._ids = ids or []
+        self._ref_doc_ids = ref_doc_ids or []
+        self._metadata = metadata or [{} for _ in self._ids]
+        self._positions = {node_id: i for i, node_id in enumerate(self._ids)}
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> None:
+        return None
+
+    @property
+    def count(self) -> int:
+        # Not __len__: llama-index tests stores for truth, and an empty store must not look like no store
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self._vectors.nbytes
+
+    def get(self, text_id: str) -> list[float]:
+        return self._vectors[self._positions[text_id]].astype(np.float32).tolist()
+
+    def add(self, nodes: list[BaseNode], **add_kwargs: Any) -> list[str]:
+        if not nodes:
+            return []
+        ids = [node.node_id for node in nodes]
+        replaced = set(ids)
+        self._remove([i for i, node_id in enumerate(self._ids) if node_id in replaced])
+        vectors = _normalized([node.get_embedding() for node in nodes]).astype(self.dtype)
+        self._vectors = np.concatenate([self._vectors, vectors]) if len(self._ids) else vectors
+        for node in nodes:
+            metadata = node_to_metadata_dict(node, remove_text=True, flat_metadata=False)
+            self._positions[node.node_id] = len(self._ids)
+            self._ids.append(node.node_id)
+            self._ref_doc_ids.append(node.ref_doc_id or "None")
+            self._metadata.append({key: value for key, value in metadata.items() if key not in DROPPED_METADATA})
+        self._search_ready = False
+        self._saved_at = None
+        return ids
+
+    def _remove(self, positions: list[int]):
+        if not positions:
+            return
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[positions] = False
+        # Fancy indexing copies the kept rows into memory, detaching the store from the memory-mapped file
+        self._vectors = self._vectors[keep]
+        self._ids = [node_id for node_id, kept in zip(self._ids, keep) if kept]
+        self._ref_doc_ids = [ref_doc_id for ref_doc_id, kept in zip(self._ref_doc_ids, keep) if kept]
+        self._metadata = [metadata for metadata, kept in zip(self._metadata, keep) if kept]
+        self._positions = {node_id: i for i, node_id in enumerate(self._ids)}
+        self._search_ready = False
+        self._saved_at = None
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        self._remove([i for i, ref_doc_id_ in enumerate(self._ref_doc_ids) if ref_doc_id_ == ref_doc_id])
+
+    def delete_nodes(self, node_ids: list[str] | None = None, filters=None, **delete_kwargs: Any) -> None:
+        filter_fn = _build_metadata_filter_fn(lambda node_id: self._metadata[self._positions[node_id]], filters)
+        wanted = set(node_ids) if node_ids is not None else None
+        self._remove([i for i, node_id in enumerate(self._ids) if (wanted is None or node_id in wanted) and filter_fn(node_id)])
+
+    def clear(self) -> None:
+        self._remove(list(range(len(self._ids))))
+
+    def build_index(self):
+        if not self._search_ready:
+            self._search.build(self._vectors)
+            self._search_ready = True
+
+    @property
+    def search_index(self):
+        """The index behind unfiltered queries, for example to change IVFIndex.n_probe or Int8Index.oversample."""
+        return self._search
+
+    @property
+    def index_ready(self) -> bool:
+        return self._search_ready
+
+    @property
+    def index_nbytes(self) -> int:
+        return self._search.nbytes
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise ValueError(f"NumpyVectorStore only supports the default query mode, not {query.mode}")
+        if not self._ids or query.similarity_top_k <= 0:
+            return VectorStoreQueryResult(similarities=[], ids=[])
+        query_embedding = _normalized(query.query_embedding)
+        if query.node_ids is None and query.filters is None:
+            self.build_index()
+            top, scores = self._search.search(self._vectors, query_embedding, query.similarity_top_k)
+            return VectorStoreQueryResult(similarities=scores.tolist(), ids=[self._ids[i] for i in top])
+
+        # Filtered queries always scan every vector, since the clusters closest to the query may hold no allowed node
+        scores = score_all(self._vectors, query_embedding)
+        filter_fn = _build_metadata_filter_fn(lambda node_id: self._metadata[self._positions[node_id]], query.filters)
+        allowed = set(query.node_ids) if query.node_ids is not None else None
+        excluded = [i for i, node_id in enumerate(self._ids) if (allowed is not None and node_id not in allowed) or not filter_fn(node_id)]
+        scores[excluded] = -np.inf
+        top = top_k(scores, query.similarity_top_k)
+        top = top[np.isfinite(scores[top])]
+        return VectorStoreQueryResult(similarities=scores[top].tolist(), ids=[self._ids[i] for i in top])
+
+    def persist(self, persist_path: str, fs=None) -> None:
+        """Saves next to `persist_path`, the <namespace>__vector_store.json path that StorageContext.persist() passes."""
+        namespace = Path(persist_path).name.split("__")[0]
+        vectors_path, ids_path = store_paths(Path(persist_path).parent, namespace)
+        vectors_path.parent.mkdir(parents=True, exist_ok=True)
+        # Vectors unchanged since they were loaded from or saved to this file are not written again
+        if self._saved_at != vectors_path.resolve():
+            _replace(vectors_path, lambda f: np.save(f, np.ascontiguousarray(self._vectors, dtype=self.dtype)))
+            side = {"dtype": self.dtype, "ids": self._ids, "ref_doc_ids": self._ref_doc_ids, "metadata": self._metadata}
+            _replace(ids_path, lambda f: f.write(json.dumps(side, separators=(",", ":")).encode()))
+            self._saved_at = vectors_path.resolve()
+        saved_index = index_path(vectors_path.parent, self.index, namespace)
+        if self._search_ready:
+            self._search.save(saved_index)
+        else:
+            # Built for vectors that have changed since
+            saved_index.unlink(missing_ok=True)
+
+    def persist_index(self, persist_dir: str | Path, namespace: str = DEFAULT_NAMESPACE) -> None:
+        """Saves only the search index, for a store whose vectors are unchanged since they were saved in persist_dir."""
+        if self._search_ready:
+            self._search.save(index_path(persist_dir, self.index, namespace))
+
+    @classmethod
+    def exists(cls, persist_dir: str | Path, namespace: str = DEFAULT_NAMESPACE) -> bool:
+        return all(path.exists() for path in store_paths(persist_dir, namespace))
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str | Path, namespace: str = DEFAULT_NAMESPACE, index: str = "exact", index_options: dict | None = None) -> "NumpyVectorStore":
+        vectors_path, ids_path = store_paths(persist_dir, namespace)
+        side = json.loads(ids_path.read_bytes())
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if len(vectors) != len(side["ids"]):
+            raise ValueError(f"{vectors_path} has {len(vectors)} vectors but {ids_path} has {len(side['ids'])} ids")
+        store = cls(side["dtype"], vectors, side["ids"], side["ref_doc_ids"], side["metadata"], index, index_options)
+        store._search_ready = store._search.load(index_path(persist_dir, index, namespace), len(vectors))
+        store._saved_at = vectors_path.resolve()
+        return store
+
+    @classmethod
+    def from_simple(cls, store: SimpleVectorStore, dtype: str = "float32", index: str = "exact", index_options: dict | None = None) -> "NumpyVectorStore":
+        """Converts a SimpleVectorStore (the JSON store) without re-embedding anything."""
+        data = store.data
+        ids = list(data.embedding_dict)
+        vectors = _normalized(np.array([data.embedding_dict[node_id] for node_id in ids], dtype=np.float32)).astype(dtype) if ids else None
+        metadata = [{key: value for key, value in (data.metadata_dict or {}).get(node_id, {}).items() if key not in DROPPED_METADATA} for node_id in ids]
+        return cls(dtype, vectors, ids, [data.text_id_to_ref_doc_id[node_id] for node_id in ids], metadata, index, index_options)
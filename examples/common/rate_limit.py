@@ -0,0 +1,164 @@
+"""
+Token-bucket scheduling under requests-per-minute and tokens-per-minute limits.
+
+`RateLimitScheduler` keeps one bucket for requests and one for tokens. Each request waits until both
+buckets hold enough for it, so a bulk job runs at the full allowed rate without tripping the limits.
+The limits can be given up front or learned from the `x-ratelimit-*` headers that GitHub Models,
+Azure OpenAI and OpenAI send with every response: `observe()` resizes the buckets to the advertised
+limits and drains them to the remaining budget, so requests made by other processes are accounted for.
+"""
+
+import asyncio
+import re
+import time
+
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parses rate-limit reset values such as "1s", "6m0s", "250ms" or a plain number of seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float | None):
+        self.capacity = per_minute
+        self.level = per_minute or 0.0
+        self.refill_rate = (per_minute or 0.0) / 60
+        self.exhausted_until: float | None = None
+        self._updated = time.monotonic()
+
+    @property
+    def limited(self) -> bool:
+        return self.capacity is not None
+
+    def refill(self):
+        now = time.monotonic()
+        if self.exhausted_until is not None and now >= self.exhausted_until:
+            # The server said the budget would be back to its initial state by now
+            self.level, self.exhausted_until = self.capacity, None
+        elif self.limited and self.exhausted_until is None:
+            self.level = min(self.capacity, self.level + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken. Amounts above the capacity only wait for a full bucket."""
+        if not self.limited:
+            return 0.0
+        self.refill()
+        if self.exhausted_until is not None:
+            return self.exhausted_until - time.monotonic()
+        missing = min(amount, self.capacity) - self.level
+        if missing <= 0:
+            return 0.0
+        return missing / self.refill_rate if self.refill_rate else float("inf")
+
+    def take(self, amount: float):
+        if self.limited:
+            self.refill()
+            self.level -= amount
+
+    def sync(self, limit: float | None, remaining: float | None, reset_in: float | None):
+        """Matches the bucket to the server's view: its limit, what is left, and when it will be full again."""
+        self.refill()
+        if limit:
+            if not self.limited:
+                self.level = limit
+            self.capacity = limit
+            self.refill_rate = limit / 60
+        if remaining is not None and self.limited:
+            self.level = min(self.level, remaining)
+            if reset_in:
+                # Refill no faster than the server does, so the bucket is full when the server says it is
+                self.refill_rate = min(self.refill_rate, max(self.capacity - remaining, 1.0) / reset_in)
+                # Servers with fixed windows give nothing back before the reset, so an empty budget waits for it
+                if remaining < 1:
+                    self.exhausted_until = time.monotonic() + reset_in
+
+
+def _header(headers, name: str) -> float | None:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimitScheduler:
+    def __init__(self, requests_per_minute: float | None = None, tokens_per_minute: float | None = None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock = asyncio.Lock()
+        # Without configured limits, only one request goes out until a response has shown what the limits are,
+        # or until it has finished without one (an error, or a runner that does not go through the shared pools)
+        self._learned = asyncio.Event()
+        if self.requests.limited or self.tokens.limited:
+            self._learned.set()
+        self.waited = 0.0
+        self.admitted = 0
+
+    async def acquire(self, estimated_tokens: int):
+        """Waits until one more request of about `estimated_tokens` tokens fits in both budgets, then reserves it."""
+        while True:
+            # The requests after the first wait for it outside the lock, so nothing else is held up meanwhile
+            if self.admitted:
+                await self._learned.wait()
+            # Requests are admitted one at a time, in arrival order, so a large request is not starved by small ones
+            async with self._lock:
+                if self.admitted and not self._learned.is_set():
+                    continue
+                while (delay := max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))) > 0:
+                    self.waited += delay
+                    await asyncio.sleep(delay)
+                self.requests.take(1)
+                self.tokens.take(estimated_tokens)
+                self.admitted += 1
+                return
+
+    def finished(self):
+        """Called once an admitted request is done, whether it succeeded, failed or sent no response headers."""
+        self._learned.set()
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Corrects the token budget once a response reports how many tokens the request really used."""
+        self.tokens.take(actual_tokens - estimated_tokens)
+
+    def observe(self, headers):
+        """Updates the buckets from the x-ratelimit-* headers of a response."""
+        self._learned.set()
+        self.requests.sync(
+            _header(headers, "x-ratelimit-limit-requests"),
+            _header(headers, "x-ratelimit-remaining-requests"),
+            parse_duration(headers.get("x-ratelimit-reset-requests")),
+        )
+        self.tokens.sync(
+            _header(headers, "x-ratelimit-limit-tokens"),
+            _header(headers, "x-ratelimit-remaining-tokens"),
+            parse_duration(headers.get("x-ratelimit-reset-tokens")),
+        )
+
+    async def observe_response(self, response):
+        """httpx response hook, so every request made through an async client feeds the scheduler."""
+        self.observe(response.headers)
+
+    def sync_response_hook(self, loop: asyncio.AbstractEventLoop):
+        """httpx response hook for sync clients, which may run on other threads than the scheduler's loop."""
+        return lambda response: loop.call_soon_threadsafe(self.observe, response.headers)
+
+    def stats(self) -> dict:
+        return {
+            "admitted": self.admitted,
+            "waited_seconds": self.waited,
+            "requests_per_minute": self.requests.capacity,
+            "tokens_per_minute": self.tokens.capacity,
+        }
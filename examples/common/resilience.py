@@ -0,0 +1,269 @@
+"""
+Retries, backoff and a per-endpoint concurrency cap for every model client.
+
+`RetryTransport` and `AsyncRetryTransport` wrap the httpx transports under the shared connection pools
+(see common/clients.py), so the OpenAI clients and every framework adapter built on them handle
+throttling and transient failures the same way, whatever the framework does on its own:
+
+* 429, 408 and 5xx responses and connection errors are retried with full-jitter exponential backoff,
+* a Retry-After, retry-after-ms or exhausted x-ratelimit-* header sets the wait instead of the backoff,
+* at most `max_per_endpoint` requests are in flight per host (and per event loop for the async clients),
+  including streamed responses being read,
+* `RetryPolicy.stats()` counts the retries, the statuses that caused them and the time spent waiting.
+
+The OpenAI SDK's own retries are turned off for these clients so requests are not retried twice.
+Tune it with CLIENT_MAX_RETRIES (default 4), CLIENT_RETRY_BASE_DELAY (0.5 s), CLIENT_RETRY_MAX_DELAY (30 s),
+CLIENT_RETRY_MAX_WAIT (60 s, longer server-requested waits are not retried) and CLIENT_MAX_PER_ENDPOINT (8).
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from common.rate_limit import parse_duration
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+def retry_after(headers) -> float | None:
+    """Seconds the server asked to wait, from Retry-After, retry-after-ms or exhausted x-ratelimit-* headers."""
+    if value := headers.get("retry-after-ms"):
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    if value := headers.get("retry-after"):
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    resets = [parse_duration(headers.get(f"x-ratelimit-reset-{kind}")) for kind in ("requests", "tokens") if headers.get(f"x-ratelimit-remaining-{kind}") in ("0", "0.0")]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+class RetryPolicy:
+    def __init__(self, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0, max_wait: float = 60.0, max_per_endpoint: int = 8):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.max_per_endpoint = max_per_endpoint
+        self.counts = Counter()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+        self._sync_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._async_slots: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore] = {}
+        self._in_flight = Counter()
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=int(os.getenv("CLIENT_MAX_RETRIES", 4)),
+            base_delay=float(os.getenv("CLIENT_RETRY_BASE_DELAY", 0.5)),
+            max_delay=float(os.getenv("CLIENT_RETRY_MAX_DELAY", 30)),
+            max_wait=float(os.getenv("CLIENT_RETRY_MAX_WAIT", 60)),
+            max_per_endpoint=int(os.getenv("CLIENT_MAX_PER_ENDPOINT", 8)),
+        )
+
+    def delay(self, attempt: int, response: httpx.Response | None) -> float | None:
+        """Seconds to wait before retry number `attempt` (from 1), or None to give up."""
+        if attempt > self.max_retries:
+            return None
+        requested = retry_after(response.headers) if response is not None else None
+        if requested is not None:
+            # Up to 20% jitter keeps clients that were throttled together from coming back together
+            return None if requested > self.max_wait else requested * random.uniform(1.0, 1.2)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def record(self, event: str, seconds: float = 0.0):
+        with self._lock:
+            self.counts[event] += 1
+            self.waited += seconds
+
+    def sync_slot(self, endpoint: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            return self._sync_slots.setdefault(endpoint, threading.BoundedSemaphore(self.max_per_endpoint))
+
+    def async_slot(self, endpoint: str) -> asyncio.Semaphore:
+        """The endpoint's slots on the running loop: an asyncio.Semaphore cannot be shared between loops."""
+        key = (asyncio.get_running_loop(), endpoint)
+        with self._lock:
+            if key not in self._async_slots:
+                self._async_slots = {other: slot for other, slot in self._async_slots.items() if not other[0].is_closed()}
+                self._async_slots[key] = asyncio.Semaphore(self.max_per_endpoint)
+            return self._async_slots[key]
+
+    def enter(self, endpoint: str):
+        with self._lock:
+            self._in_flight[endpoint] += 1
+            self.counts["max_in_flight"] = max(self.counts["max_in_flight"], self._in_flight[endpoint])
+
+    def leave(self, endpoint: str):
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.counts["requests"],
+                "retries": sum(count for event, count in self.counts.items() if event.startswith("retry_")),
+                "retries_by_cause": {event.removeprefix("retry_"): count for event, count in self.counts.items() if event.startswith("retry_")},
+                "gave_up": self.counts["gave_up"],
+                "retry_wait_seconds": self.waited,
+                "max_in_flight": self.counts["max_in_flight"],
+            }
+
+
+def _endpoint(request: httpx.Request) -> str:
+    return f"{request.url.scheme}://{request.url.host}:{request.url.port or ''}"
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Keeps the endpoint slot until the response body has been read and closed."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+def _once(function):
+    done = threading.Event()
+
+    def call():
+        if not done.is_set():
+            done.set()
+            function()
+
+    return call
+
+
+class RetryTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport, policy: RetryPolicy):
+        self.transport = transport
+        self.policy = policy
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        endpoint = _endpoint(request)
+        slot = self.policy.sync_slot(endpoint)
+        self.policy.record("requests")
+        attempt = 0
+        while True:
+            attempt += 1
+            slot.acquire()
+            self.policy.enter(endpoint)
+            release = _once(lambda: (self.policy.leave(endpoint), slot.release()))
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                release()
+                delay = self.policy.delay(attempt, None)
+                if delay is None:
+                    self.policy.record("gave_up")
+                    raise
+                self.policy.record(f"retry_{type(e).__name__}", delay)
+                logger.info("%s on %s, retrying in %.2f s", type(e).__name__, request.url, delay)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                release()
+                raise
+            if response.status_code in RETRY_STATUSES:
+                delay = self.policy.delay(attempt, response)
+                if delay is not None:
+                    response.close()
+                    release()
+                    self.policy.record(f"retry_{response.status_code}", delay)
+                    logger.info("%s from %s, retrying in %.2f s", response.status_code, request.url, delay)
+                    time.sleep(delay)
+                    continue
+                self.policy.record("gave_up")
+            return httpx.Response(response.status_code, headers=response.headers, stream=_ReleasingStream(response.stream, release), extensions=response.extensions)
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: RetryPolicy):
+        self.transport = transport
+        self.policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        endpoint = _endpoint(request)
+        slot = self.policy.async_slot(endpoint)
+        self.policy.record("requests")
+        attempt = 0
+        while True:
+            attempt += 1
+            await slot.acquire()
+            self.policy.enter(endpoint)
+            release = _once(lambda: (self.policy.leave(endpoint), slot.release()))
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                release()
+                delay = self.policy.delay(attempt, None)
+                if delay is None:
+                    self.policy.record("gave_up")
+                    raise
+                self.policy.record(f"retry_{type(e).__name__}", delay)
+                logger.info("%s on %s, retrying in %.2f s", type(e).__name__, request.url, delay)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                release()
+                raise
+            if response.status_code in RETRY_STATUSES:
+                delay = self.policy.delay(attempt, response)
+                if delay is not None:
+                    await response.aclose()
+                    release()
+                    self.policy.record(f"retry_{response.status_code}", delay)
+                    logger.info("%s from %s, retrying in %.2f s", response.status_code, request.url, delay)
+                    await asyncio.sleep(delay)
+                    continue
+                self.policy.record("gave_up")
+            return httpx.Response(response.status_code, headers=response.headers, stream=_AsyncReleasingStream(response.stream, release), extensions=response.extensions)
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,206 @@
+"""
+Disk-backed exact-match cache for chat-completion responses.
+
+`CachingTransport` wraps the httpx transport under the shared connection pools (see common/clients.py),
+so every sync and async client, and every framework adapter built on them, gets the cache. A request is
+served from the cache when the same URL was sent exactly the same model, messages, tools and sampling
+parameters before. Streamed requests and error responses are never cached.
+
+Entries live in a SQLite database (WAL mode), so several example processes can share it safely.
+It is trimmed in least-recently-used order to stay under a size and an entry cap, and entries expire
+after a TTL. Turn it on with RESPONSE_CACHE=on and tune it with:
+
+    RESPONSE_CACHE_PATH         database file (default ~/.cache/python-ai-agent-frameworks-demos/responses.sqlite3)
+    RESPONSE_CACHE_TTL          seconds an entry stays valid (default 86400)
+    RESPONSE_CACHE_MAX_MB       maximum total size of the cached bodies (default 100)
+    RESPONSE_CACHE_MAX_ENTRIES  maximum number of entries (default 10000)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "python-ai-agent-frameworks-demos" / "responses.sqlite3"
+
+# Request fields that do not change the completion
+IGNORED_FIELDS = {"user", "metadata", "store", "stream_options"}
+# Response headers that describe the wire encoding rather than the cached body
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "date"}
+
+
+def cache_key(url: str, body: dict) -> str:
+    """Hash of the endpoint and every request field that can change the completion, in canonical JSON."""
+    fields = {name: value for name, value in body.items() if name not in IGNORED_FIELDS}
+    canonical = json.dumps([url, fields], sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH, ttl: float = 86400.0, max_bytes: int = 100 * 1024 * 1024, max_entries: int = 10_000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, headers TEXT NOT NULL, body BLOB NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            path=os.getenv("RESPONSE_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", 86400)),
+            max_bytes=int(float(os.getenv("RESPONSE_CACHE_MAX_MB", 100)) * 1024 * 1024),
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 10_000)),
+        )
+
+    def get(self, key: str) -> tuple[dict, bytes] | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT headers, body, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[2] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.counts["expired"] += 1
+                row = None
+            if row is None:
+                self.counts["misses"] += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.counts["hits"] += 1
+            return json.loads(row[0]), row[1]
+
+    def put(self, key: str, headers: dict, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so the size check and the trimming see a consistent table
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)", (key, json.dumps(headers), body, len(body), now, now))
+                self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+                self.counts["expired"] += self._db.execute("SELECT changes()").fetchone()[0]
+                self._evict()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self.counts["stores"] += 1
+
+    def _evict(self):
+        entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        for key, entry_size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            entries -= 1
+            size -= entry_size
+            self.counts["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.counts["hits"] + self.counts["misses"]
+        return {
+            "hits": self.counts["hits"],
+            "misses": self.counts["misses"],
+            "hit_ratio": self.counts["hits"] / lookups if lookups else 0.0,
+            "stores": self.counts["stores"],
+            "evictions": self.counts["evictions"],
+            "expired": self.counts["expired"],
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self):
+        self._db.close()
+
+
+def _cacheable_key(request: httpx.Request) -> str | None:
+    if request.method != "POST" or not request.url.path.endswith("/chat/completions"):
+        return None
+    try:
+        body = json.loads(request.content)
+    except ValueError:
+        return None
+    if body.get("stream"):
+        return None
+    return cache_key(str(request.url), body)
+
+
+def _cached_response(headers: dict, body: bytes) -> httpx.Response:
+    return httpx.Response(200, headers={**headers, "x-response-cache": "hit"}, content=body)
+
+
+def _storable_headers(response: httpx.Response) -> dict:
+    return {name: value for name, value in response.headers.items() if name.lower() not in DROPPED_HEADERS}
+
+
+class CachingTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport, cache: ResponseCache):
+        self.transport = transport
+        self.cache = cache
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        key = _cacheable_key(request)
+        if key is None:
+            return self.transport.handle_request(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _cached_response(*cached)
+        response = self.transport.handle_request(request)
+        if response.status_code != 200:
+            return response
+        body = response.read()
+        headers = _storable_headers(response)
+        self.cache.put(key, headers, body)
+        return httpx.Response(200, headers=headers, content=body)
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncCachingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, cache: ResponseCache):
+        self.transport = transport
+        self.cache = cache
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = _cacheable_key(request)
+        if key is None:
+            return await self.transport.handle_async_request(request)
+        # SQLite calls can wait on another process's write lock, so they stay off the event loop
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return _cached_response(*cached)
+        response = await self.transport.handle_async_request(request)
+        if response.status_code != 200:
+            return response
+        body = await response.aread()
+        headers = _storable_headers(response)
+        await asyncio.to_thread(self.cache.put, key, headers, body)
+        return httpx.Response(200, headers=headers, content=body)
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,238 @@
+"""
+Semantic cache for llama-index tools: a question close enough in meaning to one already answered gets the stored answer.
+
+`SemanticCacheTool` wraps a tool (a QueryEngineTool, or the fan-out tool of common/fanout_retrieval.py).
+The question is embedded, and if a stored question's embedding is within the cosine similarity threshold
+the stored answer is returned, with no retrieval and no synthesis. Otherwise the tool runs and its answer is stored.
+
+Entries live in a SQLite database (WAL mode), so they survive restarts, and each process keeps their
+normalized embeddings in one NumPy matrix, so a lookup is one matrix-vector product. Entries expire after a
+TTL, the oldest ones are dropped beyond max_entries, and every entry carries the version of the index it was
+answered from (see llamaindex_ingestion.index_version()): when the index is rebuilt from changed files the
+version changes and the entries of the old one are deleted.
+
+Turn it on with SEMANTIC_CACHE=on and tune it with:
+
+    SEMANTIC_CACHE_PATH         database file (default ~/.cache/python-ai-agent-frameworks-demos/semantic.sqlite3)
+    SEMANTIC_CACHE_THRESHOLD    minimum cosine similarity for a hit (default 0.92)
+    SEMANTIC_CACHE_TTL          seconds an entry stays valid (default 86400)
+    SEMANTIC_CACHE_MAX_ENTRIES  maximum number of entries per tool (default 1000)
+"""
+
+import asyncio
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from llama_index.core import Settings
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.tools import ToolMetadata, ToolOutput
+from llama_index.core.tools.types import AsyncBaseTool
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "python-ai-agent-frameworks-demos" / "semantic.sqlite3"
+# Latencies kept for the percentiles in stats()
+LATENCY_WINDOW = 1000
+
+
+def _normalized(embedding: list[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        namespace: str,
+        version: str = "",
+        path: str | Path = DEFAULT_CACHE_PATH,
+        threshold: float = 0.92,
+        ttl: float = 86400.0,
+        max_entries: int = 1000,
+    ):
+        self.namespace = namespace
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS answers (id INTEGER PRIMARY KEY, namespace TEXT NOT NULL, version TEXT NOT NULL, question TEXT NOT NULL, embedding BLOB NOT NULL, answer TEXT NOT NULL, created_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS answers_namespace ON answers (namespace, created_at)")
+        self.set_version(version)
+
+    @classmethod
+    def from_env(cls, namespace: str, version: str = "") -> "SemanticCache | None":
+        if os.getenv("SEMANTIC_CACHE", "off").lower() != "on":
+            return None
+        return cls(
+            namespace,
+            version,
+            path=os.getenv("SEMANTIC_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92)),
+            ttl=float(os.getenv("SEMANTIC_CACHE_TTL", 86400)),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 1000)),
+        )
+
+    def set_version(self, version: str):
+        """Switches to another index version, deleting the entries answered from any other one."""
+        with self._lock:
+            self.version = version
+            self._db.execute("DELETE FROM answers WHERE namespace = ? AND version != ?", (self.namespace, version))
+            self.counts["invalidated"] += self._db.execute("SELECT changes()").fetchone()[0]
+            self._db.execute("DELETE FROM answers WHERE namespace = ? AND created_at < ?", (self.namespace, time.time() - self.ttl))
+            rows = self._db.execute("SELECT id, embedding, answer, created_at FROM answers WHERE namespace = ? ORDER BY created_at", (self.namespace,)).fetchall()
+            self._ids = [row[0] for row in rows]
+            self._answers = [row[2] for row in rows]
+            self._created = np.array([row[3] for row in rows], dtype=np.float64)
+            self._matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows]) if rows else None
+
+    def invalidate(self):
+        """Drops every entry of this namespace, for an index that was rebuilt without a new version."""
+        with self._lock:
+            self._db.execute("DELETE FROM answers WHERE namespace = ?", (self.namespace,))
+            self.counts["invalidated"] += len(self._ids)
+            self._ids, self._answers, self._created, self._matrix = [], [], np.empty(0), None
+
+    def lookup(self, embedding: list[float]) -> str | None:
+        query = _normalized(embedding)
+        with self._lock:
+            if self._matrix is None:
+                self.counts["misses"] += 1
+                return None
+            scores = self._matrix @ query
+            # Expired entries cannot be hits; they are deleted on the next store
+            scores[self._created < time.time() - self.ttl] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.counts["misses"] += 1
+                return None
+            self.counts["hits"] += 1
+            return self._answers[best]
+
+    def store(self, question: str, embedding: list[float], answer: str):
+        vector = _normalized(embedding)
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row_id = self._db.execute(
+                    "INSERT INTO answers (namespace, version, question, embedding, answer, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, self.version, question, vector.tobytes(), answer, now),
+                ).lastrowid
+                keep = ~(self._created < now - self.ttl)
+                # The oldest of the entries that have not expired make room for the new one
+                keep[np.flatnonzero(keep)[: max(0, int(keep.sum()) + 1 - self.max_entries)]] = False
+                dropped = [row for row, kept in zip(self._ids, keep) if not kept]
+                self._db.executemany("DELETE FROM answers WHERE id = ?", [(row,) for row in dropped])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self.counts["evictions"] += len(dropped)
+            self.counts["stores"] += 1
+            self._ids = [row for row, kept in zip(self._ids, keep) if kept] + [row_id]
+            self._answers = [answer for answer, kept in zip(self._answers, keep) if kept] + [answer]
+            self._created = np.append(self._created[keep], now)
+            kept_rows = self._matrix[keep] if self._matrix is not None else np.empty((0, len(vector)), dtype=np.float32)
+            self._matrix = np.vstack([kept_rows, vector[None, :]])
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def close(self):
+        self._db.close()
+
+
+def _query_text(args: tuple, kwargs: dict) -> str:
+    """The question a tool was called with: its first positional argument, or "input" (QueryEngineTool) or "query"."""
+    if args:
+        return str(args[0])
+    for name in ("input", "query"):
+        if name in kwargs:
+            return str(kwargs[name])
+    return str(next(iter(kwargs.values()), ""))
+
+
+def _percentile(values: deque, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+class SemanticCacheTool(AsyncBaseTool):
+    def __init__(self, tool: AsyncBaseTool, cache: SemanticCache, embed_model: BaseEmbedding | None = None):
+        self.tool = tool
+        self.cache = cache
+        self._embed_model = embed_model or Settings.embed_model
+        self._latencies = {"hit": deque(maxlen=LATENCY_WINDOW), "miss": deque(maxlen=LATENCY_WINDOW)}
+
+    @property
+    def metadata(self) -> ToolMetadata:
+        return self.tool.metadata
+
+    def _output(self, question: str, answer: str) -> ToolOutput:
+        return ToolOutput(content=answer, tool_name=self.metadata.name, raw_input={"input": question}, raw_output=answer)
+
+    def call(self, *args: Any, **kwargs: Any) -> ToolOutput:
+        start = time.perf_counter()
+        question = _query_text(args, kwargs)
+        embedding = self._embed_model.get_query_embedding(question)
+        answer = self.cache.lookup(embedding)
+        if answer is not None:
+            self._latencies["hit"].append(time.perf_counter() - start)
+            return self._output(question, answer)
+        output = self.tool.call(*args, **kwargs)
+        if not output.is_error:
+            self.cache.store(question, embedding, output.content)
+        self._latencies["miss"].append(time.perf_counter() - start)
+        return output
+
+    async def acall(self, *args: Any, **kwargs: Any) -> ToolOutput:
+        start = time.perf_counter()
+        question = _query_text(args, kwargs)
+        embedding = await self._embed_model.aget_query_embedding(question)
+        # SQLite calls can wait on another process's write lock, so they stay off the event loop
+        answer = await asyncio.to_thread(self.cache.lookup, embedding)
+        if answer is not None:
+            self._latencies["hit"].append(time.perf_counter() - start)
+            return self._output(question, answer)
+        output = await self.tool.acall(*args, **kwargs)
+        if not output.is_error:
+            await asyncio.to_thread(self.cache.store, question, embedding, output.content)
+        self._latencies["miss"].append(time.perf_counter() - start)
+        return output
+
+    def stats(self) -> dict:
+        counts = self.cache.counts
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "hits": counts["hits"],
+            "misses": counts["misses"],
+            "hit_ratio": counts["hits"] / lookups if lookups else 0.0,
+            "stores": counts["stores"],
+            "evictions": counts["evictions"],
+            "invalidated": counts["invalidated"],
+            "entries": len(self.cache),
+            "hit_ms_p50": statistics.median(self._latencies["hit"]) * 1000 if self._latencies["hit"] else 0.0,
+            "hit_ms_p95": _percentile(self._latencies["hit"], 0.95) * 1000,
+            "miss_ms_p50": statistics.median(self._latencies["miss"]) * 1000 if self._latencies["miss"] else 0.0,
+            "miss_ms_p95": _percentile(self._latencies["miss"], 0.95) * 1000,
+        }
+
+
+def cached_tools(tools: list[AsyncBaseTool], version: str = "") -> list[AsyncBaseTool]:
+    """Wraps each tool in a SemanticCacheTool when SEMANTIC_CACHE=on, or returns them as they are."""
+    wrapped = []
+    for tool in tools:
+        cache = SemanticCache.from_env(tool.metadata.name, version)
+        wrapped.append(SemanticCacheTool(tool, cache) if cache is not None else tool)
+    return wrapped
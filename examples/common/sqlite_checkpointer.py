@@ -0,0 +1,443 @@
+"""
+Durable LangGraph checkpointer that stores the message history of a thread as deltas, in SQLite.
+
+LangGraph saves a checkpoint after every step, and MemorySaver serializes the whole `messages` list of
+MessagesState into each one, so a thread of n messages holds n copies of its first message and every
+step costs O(n) to write. `SqliteDeltaSaver` stores a list channel whose value starts with a list it
+already stored as just the appended items and a reference to that version; reading it walks the chain
+back to the last full snapshot in one recursive query. A new snapshot is written after at least
+`snapshot_every` deltas, once they have grown the list by `snapshot_growth` times its snapshot, so the
+snapshots of a thread add up to a small multiple of its history instead of growing quadratically.
+
+Values are serialized with LangGraph's msgpack serializer and compressed with zlib and a preset
+dictionary of serialized messages, kept in the database, so even a one-message delta compresses well.
+The last list stored for each thread is remembered and answers reads of that version, so an agent loop
+only reads and serializes its new messages. That relies on messages not being changed in place once
+added, which add_messages never does (it replaces a message with the same id instead).
+
+So that a server holding many threads does not grow without bound:
+
+* only the last `keep_checkpoints` checkpoints of a thread are kept. A thread is pruned once it has twice
+  that many, which also compacts the history under the oldest checkpoint left into a single snapshot,
+  dropping the deltas and older snapshots it was rebuilt from,
+* whole threads are evicted, least recently read or written first, to keep the database under `max_bytes`.
+
+`stats()` reports gauges of what is stored and held in memory, and counters of what was pruned and evicted.
+langgraph_agent.py keeps its threads in it, set with:
+
+    CHECKPOINT_PATH    database file (default ~/.cache/python-ai-agent-frameworks-demos/checkpoints.sqlite3)
+    CHECKPOINT_KEEP    checkpoints kept per thread (default 100, 0 keeps them all)
+    CHECKPOINT_MAX_MB  maximum total size of the stored checkpoints (default 500, 0 for no limit)
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+DEFAULT_CHECKPOINT_PATH = Path.home() / ".cache" / "python-ai-agent-frameworks-demos" / "checkpoints.sqlite3"
+
+# Kinds of stored channel values
+EMPTY, FULL, DELTA = 0, 1, 2
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value BLOB NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS checkpoints (thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, parent_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL, metadata_type TEXT NOT NULL, metadata BLOB NOT NULL, PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS blobs (thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL, version TEXT NOT NULL, kind INTEGER NOT NULL, base_version TEXT, type TEXT NOT NULL, data BLOB NOT NULL, PRIMARY KEY (thread_id, checkpoint_ns, channel, version)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS threads (thread_id TEXT PRIMARY KEY, checkpoints INTEGER NOT NULL, bytes INTEGER NOT NULL, accessed_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS threads_accessed_at ON threads (accessed_at)",
+    "CREATE TABLE IF NOT EXISTS writes (thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, type TEXT NOT NULL, value BLOB NOT NULL, task_path TEXT NOT NULL, PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)) WITHOUT ROWID",
+]
+
+# The stored versions a value is rebuilt from, from the requested one back to its full snapshot
+CHAIN_QUERY = """
+WITH RECURSIVE chain (depth, kind, base_version, type, data) AS (
+    SELECT 0, kind, base_version, type, data FROM blobs WHERE thread_id = ?1 AND checkpoint_ns = ?2 AND channel = ?3 AND version = ?4
+    UNION ALL
+    SELECT chain.depth + 1, blobs.kind, blobs.base_version, blobs.type, blobs.data FROM chain
+    JOIN blobs ON blobs.thread_id = ?1 AND blobs.checkpoint_ns = ?2 AND blobs.channel = ?3 AND blobs.version = chain.base_version
+    WHERE chain.kind = 2
+)
+SELECT kind, type, data FROM chain ORDER BY depth DESC
+"""
+
+
+class SqliteDeltaSaver(BaseCheckpointSaver[str]):
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CHECKPOINT_PATH,
+        *,
+        keep_checkpoints: int | None = None,
+        max_bytes: int | None = None,
+        snapshot_every: int = 64,
+        snapshot_growth: float = 0.5,
+        cached_lists: int = 256,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = Path(path)
+        self.keep_checkpoints = keep_checkpoints
+        self.max_bytes = max_bytes
+        self.snapshot_every = snapshot_every
+        self.snapshot_growth = snapshot_growth
+        self.cached_lists = cached_lists
+        # (thread_id, checkpoint_ns, channel) -> (version, list, deltas since its snapshot, length of the snapshot), least recently used first
+        self._lists: OrderedDict[tuple[str, str, str], tuple[str, list, int, int]] = OrderedDict()
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._db.execute(statement)
+        self._db.execute("INSERT OR IGNORE INTO settings VALUES ('zdict', ?)", (self._message_dictionary(),))
+        # The total of threads.bytes, kept up to date with it so checking the budget is one row away
+        self._db.execute("INSERT OR IGNORE INTO settings VALUES ('bytes', (SELECT COALESCE(SUM(bytes), 0) FROM threads))")
+        self._zdict = self._db.execute("SELECT value FROM settings WHERE name = 'zdict'").fetchone()[0]
+
+    @classmethod
+    def from_env(cls) -> "SqliteDeltaSaver":
+        return cls(
+            os.getenv("CHECKPOINT_PATH", str(DEFAULT_CHECKPOINT_PATH)),
+            keep_checkpoints=int(os.getenv("CHECKPOINT_KEEP", 100)) or None,
+            max_bytes=int(float(os.getenv("CHECKPOINT_MAX_MB", 500)) * 1024 * 1024) or None,
+        )
+
+    def close(self):
+        self._db.close()
+
+    def _message_dictionary(self) -> bytes:
+        """Serialized messages of every kind, for zlib to find their common field names and class paths in."""
+        call = {"name": "tool", "args": {}, "id": "call_"}
+        messages = [SystemMessage(""), HumanMessage(""), AIMessage("", tool_calls=[call]), ToolMessage("", tool_call_id="call_", name="tool"), AIMessage("")]
+        return self.serde.dumps_typed(messages)[1]
+
+    def _compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(6, zdict=self._zdict)
+        return compressor.compress(data) + compressor.flush()
+
+    def _decompress(self, data: bytes) -> bytes:
+        decompressor = zlib.decompressobj(zdict=self._zdict)
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def _remember(self, key: tuple[str, str, str], version: str, value: list, deltas: int, snapshot: int):
+        self._lists[key] = (version, list(value), deltas, snapshot)
+        self._lists.move_to_end(key)
+        while len(self._lists) > self.cached_lists:
+            self._lists.popitem(last=False)
+
+    def _dump_blob(self, thread_id: str, checkpoint_ns: str, channel: str, version: str, values: dict[str, Any]) -> tuple:
+        if channel not in values:
+            return (thread_id, checkpoint_ns, channel, version, EMPTY, None, "empty", b"")
+        value = values[channel]
+        key = (thread_id, checkpoint_ns, channel)
+        if isinstance(value, list):
+            base = self._lists.get(key)
+            if base is not None and value[: len(base[1])] == base[1]:
+                version_, items, deltas, snapshot = base
+                if deltas < self.snapshot_every or len(value) - snapshot < self.snapshot_growth * snapshot:
+                    type_, data = self.serde.dumps_typed(value[len(items) :])
+                    self._remember(key, version, value, deltas + 1, snapshot)
+                    return (thread_id, checkpoint_ns, channel, version, DELTA, version_, type_, self._compress(data))
+            self._remember(key, version, value, 0, len(value))
+        type_, data = self.serde.dumps_typed(value)
+        return (thread_id, checkpoint_ns, channel, version, FULL, None, type_, self._compress(data))
+
+    def _load_blob(self, thread_id: str, checkpoint_ns: str, channel: str, version: str, remember: bool = True) -> tuple[bool, Any]:
+        key = (thread_id, checkpoint_ns, channel)
+        cached = self._lists.get(key)
+        if cached is not None and cached[0] == version:
+            self._lists.move_to_end(key)
+            return True, list(cached[1])
+        chain = self._db.execute(CHAIN_QUERY, (thread_id, checkpoint_ns, channel, version)).fetchall()
+        if not chain or chain[0][0] == EMPTY:
+            return False, None
+        value = self.serde.loads_typed((chain[0][1], self._decompress(chain[0][2])))
+        if isinstance(value, list):
+            snapshot = len(value)
+            for _, type_, data in chain[1:]:
+                value += self.serde.loads_typed((type_, self._decompress(data)))
+            if remember:
+                self._remember(key, version, value, len(chain) - 1, snapshot)
+        return True, value
+
+    def _load_values(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            found, value = self._load_blob(thread_id, checkpoint_ns, channel, version)
+            if found:
+                values[channel] = value
+        return values
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        checkpoint = self.serde.loads_typed((type_, checkpoint))
+        writes = self._db.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        writes.sort(key=lambda write: writes_sort_key(write[5], write[0], write[1]))
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={**checkpoint, "channel_values": self._load_values(thread_id, checkpoint_ns, checkpoint["channel_versions"])},
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((value_type, value))) for task_id, _, channel, value_type, value, _ in writes],
+            parent_config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}} if parent_id else None,
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "SELECT checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._db.execute(columns + " AND checkpoint_id = ?", (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            else:
+                row = self._db.execute(columns + " ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, checkpoint_ns)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE threads SET accessed_at = ? WHERE thread_id = ?", (time.time(), thread_id))
+            return self._tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints WHERE 1 = 1"
+        params = []
+        if config:
+            query += " AND thread_id = ?"
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query += " AND checkpoint_ns = ?"
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query += " AND checkpoint_id < ?"
+            params.append(before_id)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC", params).fetchall()
+        for thread_id, checkpoint_ns, *row in rows:
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            # Built under the lock but yielded outside it, so the caller's loop can use the saver (time travel does)
+            with self._lock:
+                item = self._tuple(thread_id, checkpoint_ns, row)
+            yield item
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        saved = checkpoint.copy()
+        values = saved.pop("channel_values")
+        type_, data = self.serde.dumps_typed(saved)
+        metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            blobs = [self._dump_blob(thread_id, checkpoint_ns, channel, version, values) for channel, version in new_versions.items()]
+            size = len(data) + len(metadata_data) + sum(len(blob[-1]) for blob in blobs)
+            # BEGIN IMMEDIATE takes the write lock up front, so pruning and eviction see a consistent database
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", blobs)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"), type_, data, metadata_type, metadata_data),
+                )
+                checkpoints = self._db.execute(
+                    "INSERT INTO threads VALUES (?, 1, ?, ?) ON CONFLICT (thread_id) DO UPDATE SET checkpoints = checkpoints + 1, bytes = bytes + excluded.bytes, accessed_at = excluded.accessed_at RETURNING checkpoints",
+                    (thread_id, size, time.time()),
+                ).fetchone()[0]
+                if self.keep_checkpoints and checkpoints >= 2 * self.keep_checkpoints:
+                    self._prune(thread_id)
+                total = self._add_bytes(size)
+                if self.max_bytes and total > self.max_bytes:
+                    self._evict(thread_id, total)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                self._forget(thread_id)
+                raise
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = [(thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel, *self.serde.dumps_typed(value), task_path) for idx, (channel, value) in enumerate(writes)]
+        # Special writes (errors, interrupts) replace the previous one; the others are only written once
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Only the bytes actually added count towards the budget: a skipped write adds none, a replaced one the difference
+                size = 0
+                for row in rows:
+                    existing = self._db.execute("SELECT length(value) FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? AND task_id = ? AND idx = ?", row[:5]).fetchone()
+                    if existing is not None and not replace:
+                        continue
+                    self._db.execute("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+                    size += len(row[7]) - (existing[0] if existing is not None else 0)
+                self._db.execute("UPDATE threads SET bytes = bytes + ? WHERE thread_id = ?", (size, thread_id))
+                self._add_bytes(size)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _prune(self, thread_id: str):
+        """Drops all but the last keep_checkpoints checkpoints of each namespace of the thread, and the values only they needed."""
+        for (checkpoint_ns,) in self._db.execute("SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchall():
+            kept = self._db.execute(
+                "SELECT checkpoint_id, type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT ?",
+                (thread_id, checkpoint_ns, self.keep_checkpoints),
+            ).fetchall()
+            oldest = kept[-1][0]
+            self._db.execute("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?", (thread_id, checkpoint_ns, oldest))
+            self.counts["checkpoints_pruned"] += self._db.execute("SELECT changes()").fetchone()[0]
+            self._db.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?", (thread_id, checkpoint_ns, oldest))
+            referenced = {(channel, version) for _, type_, checkpoint in kept for channel, version in self.serde.loads_typed((type_, checkpoint))["channel_versions"].items()}
+            blobs = self._db.execute("SELECT channel, version, kind, base_version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?", (thread_id, checkpoint_ns)).fetchall()
+            # A kept value rebuilt from deltas that are not kept becomes a full snapshot, so they can go
+            for channel, version, kind, base_version in blobs:
+                if kind == DELTA and (channel, version) in referenced and (channel, base_version) not in referenced:
+                    # Not remembered: the list to extend next is the latest, not this one
+                    _, value = self._load_blob(thread_id, checkpoint_ns, channel, version, remember=False)
+                    type_, data = self.serde.dumps_typed(value)
+                    self._db.execute(
+                        "UPDATE blobs SET kind = ?, base_version = NULL, type = ?, data = ? WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                        (FULL, type_, self._compress(data), thread_id, checkpoint_ns, channel, version),
+                    )
+                    self.counts["snapshots_compacted"] += 1
+            dropped = [(thread_id, checkpoint_ns, channel, version) for channel, version, _, _ in blobs if (channel, version) not in referenced]
+            self._db.executemany("DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?", dropped)
+        before = self._db.execute("SELECT bytes FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+        after = self._db.execute(
+            "UPDATE threads SET checkpoints = (SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?1), bytes = (SELECT COALESCE(SUM(LENGTH(data)), 0) FROM blobs WHERE thread_id = ?1) + (SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints WHERE thread_id = ?1) + (SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE thread_id = ?1) WHERE thread_id = ?1 RETURNING bytes",
+            (thread_id,),
+        ).fetchone()[0]
+        self._add_bytes(after - before)
+        self.counts["prunes"] += 1
+
+    def _add_bytes(self, size: int) -> int:
+        return self._db.execute("UPDATE settings SET value = value + ? WHERE name = 'bytes' RETURNING value", (size,)).fetchone()[0]
+
+    def _evict(self, current_thread_id: str, total: int):
+        """Deletes the least recently used threads, but not the one being written, until the database is under max_bytes."""
+        while total > self.max_bytes:
+            row = self._db.execute("SELECT thread_id FROM threads WHERE thread_id != ? ORDER BY accessed_at LIMIT 1", (current_thread_id,)).fetchone()
+            if row is None:
+                break
+            thread_bytes = self._delete(row[0])
+            total -= thread_bytes
+            self.counts["threads_evicted"] += 1
+            self.counts["bytes_evicted"] += thread_bytes
+
+    def _delete(self, thread_id: str) -> int:
+        """Deletes everything stored for the thread, returning its size."""
+        row = self._db.execute("DELETE FROM threads WHERE thread_id = ? RETURNING bytes", (thread_id,)).fetchone()
+        for table in ("checkpoints", "blobs", "writes"):
+            self._db.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+        self._forget(thread_id)
+        size = row[0] if row else 0
+        self._add_bytes(-size)
+        return size
+
+    def _forget(self, thread_id: str):
+        for key in [key for key in self._lists if key[0] == thread_id]:
+            del self._lists[key]
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._delete(thread_id)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            threads, checkpoints = self._db.execute("SELECT COUNT(*), COALESCE(SUM(checkpoints), 0) FROM threads").fetchone()
+            size = self._db.execute("SELECT value FROM settings WHERE name = 'bytes'").fetchone()[0]
+            cached_messages = sum(len(items) for _, items, _, _ in self._lists.values())
+            return {
+                "threads": threads,
+                "checkpoints": checkpoints,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "file_bytes": sum(path.stat().st_size for path in (self.path, self.path.with_name(self.path.name + "-wal")) if path.exists()),
+                "cached_lists": len(self._lists),
+                "cached_messages": cached_messages,
+                "prunes": self.counts["prunes"],
+                "checkpoints_pruned": self.counts["checkpoints_pruned"],
+                "snapshots_compacted": self.counts["snapshots_compacted"],
+                "threads_evicted": self.counts["threads_evicted"],
+                "bytes_evicted": self.counts["bytes_evicted"],
+            }
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit))):
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
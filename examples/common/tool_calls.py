@@ -0,0 +1,229 @@
+"""
+Incremental assembly and concurrent execution of tool calls.
+
+A streamed chat completion sends each tool call in pieces: the id and function name first, then the
+arguments JSON a few characters at a time. `ToolCallAssembler` collects the pieces and hands back each
+tool call as soon as its arguments form a complete JSON object, so the caller can start running a tool
+while the model is still streaming the next one.
+
+`ToolRunner` runs the tool calls of one assistant turn at the same time, sync functions on a thread pool
+and async functions on a background event loop (or, with `arun_turn`, on the caller's event loop), and
+turns their results into `tool` messages, in the order of the tool calls.
+"""
+
+import asyncio
+import concurrent.futures
+import inspect
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ToolCall:
+    id: str
+    name: str
+    arguments: str = ""
+    complete: bool = False
+
+    def parsed_arguments(self) -> dict:
+        return json.loads(self.arguments) if self.arguments.strip() else {}
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "type": "function", "function": {"name": self.name, "arguments": self.arguments}}
+
+
+@dataclass
+class ToolCallAssembler:
+    content: str = ""
+    finish_reason: str | None = None
+    tool_calls: dict[int, ToolCall] = field(default_factory=dict)
+    _arguments: dict[int, list[str]] = field(default_factory=dict)
+
+    def feed(self, chunk) -> list[ToolCall]:
+        """Adds one ChatCompletionChunk and returns the tool calls it completed."""
+        completed = []
+        for choice in chunk.choices[:1]:
+            delta = choice.delta
+            if delta.content:
+                self.content += delta.content
+            for piece in delta.tool_calls or []:
+                if piece.index not in self.tool_calls:
+                    # Tool calls are streamed one after the other, so a new index closes the ones before it
+                    completed.extend(self._complete_all())
+                    self.tool_calls[piece.index] = ToolCall(id=piece.id or "", name="")
+                    self._arguments[piece.index] = []
+                tool_call = self.tool_calls[piece.index]
+                if piece.id:
+                    tool_call.id = piece.id
+                if piece.function and piece.function.name:
+                    tool_call.name += piece.function.name
+                if piece.function and piece.function.arguments:
+                    self._arguments[piece.index].append(piece.function.arguments)
+                    if self._arguments_complete(piece.index):
+                        completed.append(self._complete(piece.index))
+            if choice.finish_reason:
+                self.finish_reason = choice.finish_reason
+                completed.extend(self._complete_all())
+        return completed
+
+    def finish(self) -> list[ToolCall]:
+        """Returns the tool calls still open when the stream ended without a finish reason."""
+        return self._complete_all()
+
+    def message(self) -> dict:
+        """The assistant message to append to the conversation, as the non-streaming API would return it."""
+        message = {"role": "assistant", "content": self.content or None}
+        if self.tool_calls:
+            message["tool_calls"] = [self.tool_calls[index].to_dict() for index in sorted(self.tool_calls)]
+        return message
+
+    def _arguments_complete(self, index: int) -> bool:
+        # Only try to parse once the text could be a whole object, so long arguments are not parsed on every piece
+        arguments = "".join(self._arguments[index])
+        if not arguments.rstrip().endswith("}"):
+            return False
+        try:
+            json.loads(arguments)
+        except ValueError:
+            return False
+        return True
+
+    def _complete(self, index: int) -> ToolCall:
+        tool_call = self.tool_calls[index]
+        tool_call.arguments = "".join(self._arguments[index])
+        tool_call.complete = True
+        return tool_call
+
+    def _complete_all(self) -> list[ToolCall]:
+        return [self._complete(index) for index, tool_call in sorted(self.tool_calls.items()) if not tool_call.complete]
+
+
+@dataclass
+class ToolTurn:
+    """Timings of one turn of tool calls. sequential_time is what running them one after the other would take."""
+
+    calls: int
+    wall_time: float
+    sequential_time: float
+    timed_out: list[str] = field(default_factory=list)
+
+    @property
+    def time_saved(self) -> float:
+        return max(0.0, self.sequential_time - self.wall_time)
+
+
+class ToolRunner:
+    def __init__(self, functions: dict, max_workers: int | None = None):
+        self.functions = functions
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix="tool")
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: threading.Thread | None = None
+        self._loop_lock = threading.Lock()
+        self._pending: list[tuple[ToolCall, concurrent.futures.Future]] = []
+        self._turn_started: float | None = None
+        self.first_started: float | None = None
+
+    def start(self, tool_call: ToolCall):
+        """Starts a tool call right away. Its result is collected by the next finish_turn()."""
+        if self._turn_started is None:
+            self._turn_started = time.perf_counter()
+        if self.first_started is None:
+            self.first_started = self._turn_started
+        self._pending.append((tool_call, self._submit(tool_call)))
+
+    def _submit(self, tool_call: ToolCall) -> concurrent.futures.Future:
+        function = self.functions.get(tool_call.name)
+        if function is None:
+            future = concurrent.futures.Future()
+            future.set_exception(KeyError(f"Unknown tool {tool_call.name!r}"))
+            return future
+        if inspect.iscoroutinefunction(function):
+            return asyncio.run_coroutine_threadsafe(self._timed_async(function, tool_call), self._event_loop())
+        return self._executor.submit(self._timed, function, tool_call)
+
+    def finish_turn(self, timeout: float | None = None) -> tuple[list[dict], ToolTurn]:
+        """Waits for the started tool calls, at most `timeout` seconds from the first one, and returns their tool messages."""
+        pending, self._pending = self._pending, []
+        started, self._turn_started = self._turn_started or time.perf_counter(), None
+        remaining = None if timeout is None else max(0.0, started + timeout - time.perf_counter())
+        concurrent.futures.wait([future for _, future in pending], timeout=remaining)
+        return self._collect(pending, time.perf_counter() - started, timeout)
+
+    def run_turn(self, tool_calls: list[ToolCall], timeout: float | None = None) -> tuple[list[dict], ToolTurn]:
+        """Runs complete tool calls at the same time and returns their tool messages in order. Unlike start() and finish_turn(), it can run on several threads at once."""
+        started = time.perf_counter()
+        pending = [(tool_call, self._submit(tool_call)) for tool_call in tool_calls]
+        concurrent.futures.wait([future for _, future in pending], timeout=timeout)
+        return self._collect(pending, time.perf_counter() - started, timeout)
+
+    async def arun_turn(self, tool_calls: list[ToolCall], timeout: float | None = None) -> tuple[list[dict], ToolTurn]:
+        """Runs complete tool calls at the same time, async functions on the running event loop and sync ones on the thread pool, and returns their tool messages."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        pending = []
+        for tool_call in tool_calls:
+            function = self.functions.get(tool_call.name)
+            if function is None:
+                future = loop.create_future()
+                future.set_exception(KeyError(f"Unknown tool {tool_call.name!r}"))
+            elif inspect.iscoroutinefunction(function):
+                future = asyncio.ensure_future(self._timed_async(function, tool_call))
+            else:
+                future = loop.run_in_executor(self._executor, self._timed, function, tool_call)
+            pending.append((tool_call, future))
+        if pending:
+            await asyncio.wait([future for _, future in pending], timeout=timeout)
+        return self._collect(pending, time.perf_counter() - started, timeout)
+
+    def _collect(self, pending: list, wall_time: float, timeout: float | None) -> tuple[list[dict], ToolTurn]:
+        messages, sequential_time, timed_out = [], 0.0, []
+        for tool_call, future in pending:
+            if not future.done():
+                # A thread cannot be interrupted, so a timed-out sync tool keeps running but its result is dropped
+                future.cancel()
+                timed_out.append(tool_call.name)
+                sequential_time += timeout
+                content = {"error": f"{tool_call.name} timed out after {timeout:g} seconds"}
+            elif future.exception() is not None:
+                content = {"error": str(future.exception())}
+            else:
+                result, duration = future.result()
+                sequential_time += duration
+                content = result
+            messages.append({"role": "tool", "tool_call_id": tool_call.id, "content": content if isinstance(content, str) else json.dumps(content)})
+        return messages, ToolTurn(calls=len(pending), wall_time=wall_time, sequential_time=sequential_time, timed_out=timed_out)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="tool-loop", daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    @staticmethod
+    def _timed(function, tool_call: ToolCall):
+        start = time.perf_counter()
+        result = function(**tool_call.parsed_arguments())
+        return result, time.perf_counter() - start
+
+    @staticmethod
+    async def _timed_async(function, tool_call: ToolCall):
+        start = time.perf_counter()
+        result = await function(**tool_call.parsed_arguments())
+        return result, time.perf_counter() - start
@@ -2,12 +2,12 @@
 
 import os
 
-import azure.identity
-from dotenv import load_dotenv
+from common.clients import langchain_chat_model
+from common.history_compaction import HistoryCompactor
+from common.langgraph_tools import ConcurrentToolNode
+from common.sqlite_checkpointer import SqliteDeltaSaver
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import AzureChatOpenAI, ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode
 
@@ -27,24 +27,17 @@ def play_song_on_apple(song: str):
 
 
 tools = [play_song_on_apple, play_song_on_spotify]
-tool_node = ToolNode(tools)
+
+# With PARALLEL_TOOL_CALLS=on, the model may call several tools in one turn, and they run at the same time
+parallel_tool_calls = os.getenv("PARALLEL_TOOL_CALLS", "off").lower() == "on"
+tool_node = ConcurrentToolNode(tools) if parallel_tool_calls else ToolNode(tools)
 
 # Setup the client to use either Azure OpenAI or GitHub Models
-load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "github")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
-    model = AzureChatOpenAI(
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        azure_deployment=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
-        openai_api_version=os.environ["AZURE_OPENAI_VERSION"],
-        azure_ad_token_provider=token_provider,
-    )
-else:
-    model = ChatOpenAI(model=os.getenv("GITHUB_MODEL", "gpt-4o"), base_url="https://models.inference.ai.azure.com", api_key=os.environ["GITHUB_TOKEN"])
-
-model = model.bind_tools(tools, parallel_tool_calls=False)
+chat_model = langchain_chat_model()
+model = chat_model.bind_tools(tools, parallel_tool_calls=parallel_tool_calls)
+
+# Once the history goes over HISTORY_MAX_TOKENS, drop (or, with HISTORY_SUMMARY=on, summarize) the oldest messages
+compactor = HistoryCompactor.from_env(chat_model)
 
 # Define nodes and conditional edges
 
@@ -72,13 +65,15 @@ def call_model(state):
 # Define a new graph
 workflow = StateGraph(MessagesState)
 
-# Define the two nodes we will cycle between
+# Define the two nodes we will cycle between, and the compaction step run before every model call
+workflow.add_node("compact", compactor)
 workflow.add_node("agent", call_model)
 workflow.add_node("action", tool_node)
 
-# Set the entrypoint as `agent`
+# Set the entrypoint as `compact`, which hands the history over to `agent`
 # This means that this node is the first one called
-workflow.add_edge(START, "agent")
+workflow.add_edge(START, "compact")
+workflow.add_edge("compact", "agent")
 
 # We now add a conditional edge
 workflow.add_conditional_edges(
@@ -101,12 +96,12 @@ workflow.add_conditional_edges(
     },
 )
 
-# We now add a normal edge from `tools` to `agent`.
-# This means that after `tools` is called, `agent` node is called next.
-workflow.add_edge("action", "agent")
+# We now add a normal edge from `tools` to `compact`.
+# This means that after `tools` is called, the history is checked and `agent` node is called next.
+workflow.add_edge("action", "compact")
 
-# Set up memory
-memory = MemorySaver()
+# Set up memory that outlives the process: thread "1" picks up where the last run left off
+memory = SqliteDeltaSaver.from_env()
 
 # Finally, we compile it!
 # This compiles it into a LangChain Runnable,
@@ -120,3 +115,5 @@ config = {"configurable": {"thread_id": "1"}}
 input_message = HumanMessage(content="Can you play Taylor Swift's most popular song?")
 for event in app.stream({"messages": [input_message]}, config, stream_mode="values"):
     event["messages"][-1].pretty_print()
+if compactor.counts["compactions"]:
+    print(f"History compacted, {compactor.counts['tokens_saved']} fewer tokens sent with each model call")
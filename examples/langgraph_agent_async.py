@@ -0,0 +1,75 @@
+# Async variant of langgraph_agent.py: the agent node awaits the model and the graph is driven with astream,
+# so one event loop can serve many conversation threads at once (see benchmarks/langgraph_sessions.py).
+
+import asyncio
+import os
+
+from common.clients import langchain_chat_model
+from common.history_compaction import HistoryCompactor
+from common.langgraph_tools import ConcurrentToolNode
+from common.sqlite_checkpointer import SqliteDeltaSaver
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode
+
+
+@tool
+async def play_song_on_spotify(song: str):
+    """Play a song on Spotify"""
+    # Call the spotify API ...
+    return f"Successfully played {song} on Spotify!"
+
+
+@tool
+async def play_song_on_apple(song: str):
+    """Play a song on Apple Music"""
+    # Call the apple music API ...
+    return f"Successfully played {song} on Apple Music!"
+
+
+tools = [play_song_on_apple, play_song_on_spotify]
+
+# With PARALLEL_TOOL_CALLS=on, the model may call several tools in one turn, and they run at the same time
+parallel_tool_calls = os.getenv("PARALLEL_TOOL_CALLS", "off").lower() == "on"
+
+# Setup the client to use either Azure OpenAI or GitHub Models
+chat_model = langchain_chat_model()
+model = chat_model.bind_tools(tools, parallel_tool_calls=parallel_tool_calls)
+
+
+# Define the function that determines whether to continue or not
+def should_continue(state):
+    last_message = state["messages"][-1]
+    return "continue" if last_message.tool_calls else "end"
+
+
+# Define the function that calls the model, without blocking the event loop while it waits
+async def call_model(state):
+    response = await model.ainvoke(state["messages"])
+    return {"messages": [response]}
+
+
+def build_app(checkpointer, compactor: HistoryCompactor | None = None):
+    # The HISTORY_* compaction of langgraph_agent.py runs before every model call
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("compact", compactor or HistoryCompactor.from_env(chat_model))
+    workflow.add_node("agent", call_model)
+    workflow.add_node("action", ConcurrentToolNode(tools) if parallel_tool_calls else ToolNode(tools))
+    workflow.add_edge(START, "compact")
+    workflow.add_edge("compact", "agent")
+    workflow.add_conditional_edges("agent", should_continue, {"continue": "action", "end": END})
+    workflow.add_edge("action", "compact")
+    return workflow.compile(checkpointer=checkpointer)
+
+
+async def main():
+    app = build_app(SqliteDeltaSaver.from_env())
+    config = {"configurable": {"thread_id": "async-1"}}
+    input_message = HumanMessage(content="Can you play Taylor Swift's most popular song?")
+    async for event in app.astream({"messages": [input_message]}, config, stream_mode="values"):
+        event["messages"][-1].pretty_print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,90 +1,52 @@
 # https://docs.llamaindex.ai/en/stable/examples/agent/react_agent_with_query_engine/
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import azure.identity
-from dotenv import load_dotenv
-from llama_index.core import Settings, SimpleDirectoryReader, StorageContext, VectorStoreIndex, load_index_from_storage
+from common.clients import get_embedding_model_name, llamaindex_embed_model, llamaindex_llm
+from common.fanout_retrieval import fanout_tool
+from common.hybrid_retrieval import hybrid_retriever
+from common.llamaindex_ingestion import index_version, load_or_build_index, parse_pool, shutdown_parse_pool
+from common.semantic_cache import cached_tools
+from llama_index.core import Settings
 from llama_index.core.agent.workflow import AgentStream, ReActAgent
-from llama_index.core.tools import QueryEngineTool
 from llama_index.core.workflow import Context
-from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.llms.azure_openai import AzureOpenAI
-from llama_index.llms.openai_like import OpenAILike
 
 # Setup the client to use either Azure OpenAI or GitHub Models
-load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "github")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
-    Settings.llm = AzureOpenAI(
-        model=os.environ["AZURE_OPENAI_CHAT_MODEL"],
-        deployment_name=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        api_version=os.environ["AZURE_OPENAI_VERSION"],
-        use_azure_ad=True,
-        azure_ad_token_provider=token_provider,
-    )
-
-    Settings.embed_model = AzureOpenAIEmbedding(
-        model=os.environ["AZURE_OPENAI_EMBEDDING_MODEL"],
-        deployment_name=os.environ["AZURE_OPENAI_EMBEDDING_DEPLOYMENT"],
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        api_version=os.environ["AZURE_OPENAI_VERSION"],
-        use_azure_ad=True,
-        azure_ad_token_provider=token_provider,
-    )
-else:
-    Settings.llm = OpenAILike(
-        model=os.getenv("GITHUB_MODEL", "gpt-4o"),
-        api_base="https://models.inference.ai.azure.com",
-        api_key=os.environ["GITHUB_TOKEN"],
-        is_chat_model=True,
-    )
-
-    Settings.embed_model = OpenAIEmbedding(model="text-embedding-3-small", api_base="https://models.inference.ai.azure.com", api_key=os.environ["GITHUB_TOKEN"])
-
-# Try to load the index from storage
-try:
-    storage_context = StorageContext.from_defaults(persist_dir="./storage/docs1")
-    index1 = load_index_from_storage(storage_context)
-
-    storage_context = StorageContext.from_defaults(persist_dir="./storage/docs2")
-    index2 = load_index_from_storage(storage_context)
-
-    index_loaded = True
-except FileNotFoundError:
-    index_loaded = False
-
-if not index_loaded:
-    root_dir = Path(__file__).parent.parent
-
-    docs1 = SimpleDirectoryReader(input_files=[root_dir / "example_data/employee_handbook.pdf"]).load_data()
-    docs2 = SimpleDirectoryReader(input_files=[root_dir / "example_data/PerksPlus.pdf"]).load_data()
-    index1 = VectorStoreIndex.from_documents(docs1)
-    index2 = VectorStoreIndex.from_documents(docs2)
-
-    index1.storage_context.persist(persist_dir=root_dir / "example_data/.llama_index_storage/docs1")
-    index2.storage_context.persist(persist_dir=root_dir / "example_data/.llama_index_storage/docs2")
-
-engine1 = index1.as_query_engine(similarity_top_k=3)
-engine2 = index2.as_query_engine(similarity_top_k=3)
-
-query_engine_tools = [
-    QueryEngineTool.from_defaults(
-        query_engine=engine1,
-        name="engine1",
-        description=("Provides information about Contoso employee handbook - covering basic job roles, policies, workplace safety, HR, etc."),
-    ),
-    QueryEngineTool.from_defaults(
-        query_engine=engine2,
-        name="engine2",
-        description=("Provides information about Contoso PerksPlus program, including what can be reimbursed. "),
-    ),
-]
+Settings.llm = llamaindex_llm()
+Settings.embed_model = llamaindex_embed_model()
+
+# Load both indexes from storage at the same time, re-embedding only the pages that changed since they were built
+# VECTOR_INDEX=ivf searches them with an approximate nearest-neighbour index instead of comparing every chunk,
+# and VECTOR_INDEX=int8 or binary with a quantized copy of the vectors, re-ranking the best candidates exactly
+root_dir = Path(__file__).parent.parent
+storage_dir = root_dir / "example_data/.llama_index_storage"
+vector_index = os.getenv("VECTOR_INDEX", "exact")
+# Both builds share one pool of PDF parsing processes, started here before the build threads
+parse_pool()
+with ThreadPoolExecutor(2) as executor:
+    build1 = executor.submit(load_or_build_index, [root_dir / "example_data/employee_handbook.pdf"], storage_dir / "docs1", get_embedding_model_name(), vector_index=vector_index)
+    build2 = executor.submit(load_or_build_index, [root_dir / "example_data/PerksPlus.pdf"], storage_dir / "docs2", get_embedding_model_name(), vector_index=vector_index)
+    (index1, report1), (index2, report2) = build1.result(), build2.result()
+shutdown_parse_pool()
+print(f"docs1: {report1}\ndocs2: {report2}")
+
+# One tool searches both indexes at the same time and returns their best passages together,
+# so a question about the handbook and PerksPlus needs one agent step instead of one per index.
+# Each index is searched by embedding and by keyword (BM25), so exact terms like "PerksPlus" are not missed.
+# SEMANTIC_CACHE=on answers a question close enough to one asked before from the stored answer,
+# until either index is rebuilt from changed files
+query_engine_tools = cached_tools(
+    [
+        fanout_tool(
+            {"handbook": hybrid_retriever(index1, storage_dir / "docs1"), "perksplus": hybrid_retriever(index2, storage_dir / "docs2")},
+            name="search_contoso_docs",
+            description=("Searches the Contoso employee handbook (job roles, policies, workplace safety, HR, etc.) and the Contoso PerksPlus program (including what can be reimbursed) at the same time, and returns the most relevant passages from both."),
+        ),
+    ],
+    version=index_version(storage_dir / "docs1", storage_dir / "docs2"),
+)
 
 
 async def main():
@@ -1,34 +1,19 @@
 import asyncio
-import os
 
-import azure.identity
-import openai
-from agents import Agent, OpenAIChatCompletionsModel, Runner, set_tracing_disabled
-from dotenv import load_dotenv
+from agents import Agent, Runner, set_tracing_disabled
+from common.clients import openai_agents_model
 
 # Disable tracing since we're not connected to a supported tracing provider
 set_tracing_disabled(disabled=True)
 
 # Setup the OpenAI client to use either Azure OpenAI or GitHub Models
-load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "github")
-if API_HOST == "github":
-    client = openai.AsyncOpenAI(base_url="https://models.inference.ai.azure.com", api_key=os.environ["GITHUB_TOKEN"])
-    MODEL_NAME = os.getenv("GITHUB_MODEL", "gpt-4o")
-elif API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
-    client = openai.AsyncAzureOpenAI(
-        api_version=os.environ["AZURE_OPENAI_VERSION"],
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        azure_ad_token_provider=token_provider,
-    )
-    MODEL_NAME = os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
+model = openai_agents_model()
 
 
 agent = Agent(
     name="Spanish tutor",
     instructions="You are a Spanish tutor. Help the user learn Spanish. ONLY respond in Spanish.",
-    model=OpenAIChatCompletionsModel(model=MODEL_NAME, openai_client=client),
+    model=model,
 )
 
 
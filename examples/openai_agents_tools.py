@@ -1,13 +1,10 @@
 import asyncio
 import logging
-import os
 import random
 from datetime import datetime
 
-import azure.identity
-import openai
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool, set_tracing_disabled
-from dotenv import load_dotenv
+from agents import Agent, Runner, function_tool, set_tracing_disabled
+from common.clients import openai_agents_model
 from rich.logging import RichHandler
 
 # Setup logging with rich
@@ -18,19 +15,7 @@ logger = logging.getLogger("weekend_planner")
 set_tracing_disabled(disabled=True)
 
 # Setup the OpenAI client to use either Azure OpenAI or GitHub Models
-load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "github")
-if API_HOST == "github":
-    client = openai.AsyncOpenAI(base_url="https://models.inference.ai.azure.com", api_key=os.environ["GITHUB_TOKEN"])
-    MODEL_NAME = os.getenv("GITHUB_MODEL", "gpt-4o")
-elif API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
-    client = openai.AsyncAzureOpenAI(
-        api_version=os.environ["AZURE_OPENAI_VERSION"],
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        azure_ad_token_provider=token_provider,
-    )
-    MODEL_NAME = os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
+model = openai_agents_model()
 
 
 @function_tool
@@ -70,7 +55,7 @@ agent = Agent(
     name="Weekend Planner",
     instructions="You help users plan their weekends and choose the best activities for the given weather. If an activity would be unpleasant in the weather, don't suggest it. Include the date of the weekend in your response.",
     tools=[get_weather, get_activities, get_current_date],
-    model=OpenAIChatCompletionsModel(model=MODEL_NAME, openai_client=client),
+    model=model,
 )
 
 
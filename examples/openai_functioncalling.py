@@ -1,24 +1,28 @@
-import os
+import argparse
+import asyncio
+import time
 
-import azure.identity
-import openai
-from dotenv import load_dotenv
+from common.clients import API_HOST, get_model_name, get_openai_client
+from common.tool_calls import ToolCall, ToolCallAssembler, ToolRunner
 
 # Setup the OpenAI client to use either Azure OpenAI or GitHub Models
-load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "github")
-
-if API_HOST == "github":
-    client = openai.OpenAI(base_url="https://models.inference.ai.azure.com", api_key=os.environ["GITHUB_TOKEN"])
-    MODEL_NAME = os.getenv("GITHUB_MODEL", "gpt-4o")
-elif API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
-    client = openai.AzureOpenAI(
-        api_version=os.environ["AZURE_OPENAI_VERSION"],
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        azure_ad_token_provider=token_provider,
-    )
-    MODEL_NAME = os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
+client = get_openai_client()
+MODEL_NAME = get_model_name()
+
+
+def lookup_weather(city_name: str | None = None, zip_code: str | None = None) -> dict:
+    """Stand-in for a weather API, with its network latency."""
+    time.sleep(0.5)
+    return {"city_name": city_name, "zip_code": zip_code, "forecast": "rainy", "precipitation_mm": 12}
+
+
+async def lookup_movies(city_name: str | None = None, zip_code: str | None = None) -> dict:
+    """Stand-in for an async movie listings API, with its network latency."""
+    await asyncio.sleep(0.5)
+    return {"city_name": city_name, "zip_code": zip_code, "movies": ["Inside Out 2", "Dune: Part Two", "Wicked"]}
+
+
+available_functions = {"lookup_weather": lookup_weather, "lookup_movies": lookup_movies}
 
 tools = [
     {
@@ -65,17 +69,78 @@ tools = [
     },
 ]
 
-response = client.chat.completions.create(
-    model=MODEL_NAME,
-    messages=[
-        {"role": "system", "content": "You are a tourism chatbot."},
-        {"role": "user", "content": "is it rainy enough in sydney to watch movies and which ones are on?"},
-    ],
-    tools=tools,
-    tool_choice="auto",
-)
-
-print(f"Response from {MODEL_NAME} on {API_HOST}: \n")
-for message in response.choices[0].message.tool_calls:
-    print(message.function.name)
-    print(message.function.arguments)
+messages = [
+    {"role": "system", "content": "You are a tourism chatbot."},
+    {"role": "user", "content": "is it rainy enough in sydney to watch movies and which ones are on?"},
+]
+
+
+def complete_blocking(conversation: list[dict], runner: ToolRunner) -> dict:
+    """Waits for the whole response, then starts its tool calls."""
+    response = client.chat.completions.create(model=MODEL_NAME, messages=conversation, tools=tools, tool_choice="auto")
+    message = response.choices[0].message
+    tool_calls = [ToolCall(id=call.id, name=call.function.name, arguments=call.function.arguments, complete=True) for call in message.tool_calls or []]
+    for tool_call in tool_calls:
+        runner.start(tool_call)
+    assistant_message = {"role": "assistant", "content": message.content}
+    if tool_calls:
+        assistant_message["tool_calls"] = [tool_call.to_dict() for tool_call in tool_calls]
+    return assistant_message
+
+
+def complete_streaming(conversation: list[dict], runner: ToolRunner) -> dict:
+    """Streams the response and starts each tool call as soon as its arguments are complete."""
+    assembler = ToolCallAssembler()
+    for chunk in client.chat.completions.create(model=MODEL_NAME, messages=conversation, tools=tools, tool_choice="auto", stream=True):
+        for tool_call in assembler.feed(chunk):
+            runner.start(tool_call)
+    for tool_call in assembler.finish():
+        runner.start(tool_call)
+    return assembler.message()
+
+
+def run_agent(stream: bool, turn_timeout: float, max_turns: int = 10) -> float | None:
+    """Calls the model and its tools until it answers. Returns the seconds until the first tool call started."""
+    complete = complete_streaming if stream else complete_blocking
+    conversation = list(messages)
+    start = time.perf_counter()
+    turns = []
+    with ToolRunner(available_functions) as runner:
+        for _ in range(max_turns):
+            assistant_message = complete(conversation, runner)
+            conversation.append(assistant_message)
+            if not assistant_message.get("tool_calls"):
+                break
+            tool_messages, turn = runner.finish_turn(timeout=turn_timeout)
+            conversation.extend(tool_messages)
+            turns.append(turn)
+            for tool_call, tool_message in zip(assistant_message["tool_calls"], tool_messages):
+                print(f"{tool_call['function']['name']}({tool_call['function']['arguments']}) -> {tool_message['content']}")
+            if turn.timed_out:
+                print(f"Timed out after {turn_timeout:g} s: {', '.join(turn.timed_out)}")
+
+        time_to_first_tool_call = None if runner.first_started is None else runner.first_started - start
+
+    print(f"\n{conversation[-1]['content']}\n")
+    sequential = sum(turn.sequential_time for turn in turns)
+    wall = sum(turn.wall_time for turn in turns)
+    print(f"{sum(turn.calls for turn in turns)} tool calls over {len(turns)} turns: {wall * 1000:.0f} ms concurrently, {sequential * 1000:.0f} ms sequentially, {(sequential - wall) * 1000:.0f} ms saved")
+    return time_to_first_tool_call
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answers with the help of tools chosen by the model, streaming the responses by default.")
+    parser.add_argument("--no-stream", action="store_true", help="Wait for each whole response before running its tools.")
+    parser.add_argument("--compare", action="store_true", help="Run the non-streaming and streaming modes and compare their time to first tool call.")
+    parser.add_argument("--turn-timeout", type=float, default=10.0, help="Seconds the tools of one turn may take before they are reported as timed out.")
+    args = parser.parse_args()
+
+    print(f"Response from {MODEL_NAME} on {API_HOST}: \n")
+    timings = {}
+    if args.no_stream or args.compare:
+        timings["non-streaming"] = run_agent(stream=False, turn_timeout=args.turn_timeout)
+    if not args.no_stream:
+        timings["streaming"] = run_agent(stream=True, turn_timeout=args.turn_timeout)
+    if args.compare:
+        for mode, seconds in timings.items():
+            print(f"Time to first tool call, {mode}: " + (f"{seconds * 1000:.0f} ms" if seconds is not None else "no tool call"))
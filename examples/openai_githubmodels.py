@@ -1,11 +1,7 @@
-import os
+from common.clients import get_model_name, get_openai_client
 
-from openai import OpenAI
-
-client = OpenAI(
-    base_url="https://models.inference.ai.azure.com",
-    api_key=os.environ["GITHUB_TOKEN"],
-)
+# GitHub Models by default, or whichever API_HOST is set, through the shared connection pool
+client = get_openai_client()
 response = client.chat.completions.create(
     messages=[
         {
@@ -17,6 +13,6 @@ response = client.chat.completions.create(
             "content": "What is the capital of France?",
         },
     ],
-    model=os.getenv("GITHUB_MODEL", "gpt-4.1"),
+    model=get_model_name(),
 )
 print(response.choices[0].message.content)
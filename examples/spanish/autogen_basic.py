@@ -9,7 +9,7 @@ from autogen_ext.models.openai import AzureOpenAIChatCompletionClient, OpenAICha
 from dotenv import load_dotenv
 
 # Setup the client to use either Azure OpenAI or GitHub Models
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 if API_HOST == "github":
     client = OpenAIChatCompletionClient(model=os.getenv("GITHUB_MODEL", "gpt-4o"), api_key=os.environ["GITHUB_TOKEN"], base_url="https://models.inference.ai.azure.com")
@@ -10,7 +10,7 @@ from autogen_ext.models.openai import AzureOpenAIChatCompletionClient, OpenAICha
 from dotenv import load_dotenv
 
 # Setup the client to use either Azure OpenAI or GitHub Models
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 
 
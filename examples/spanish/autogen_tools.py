@@ -18,7 +18,7 @@ logger = logging.getLogger("weekend_planner")
 
 
 # Setup the client to use either Azure OpenAI or GitHub Models
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 
 
@@ -30,7 +30,7 @@ tools = [play_song_on_apple, play_song_on_spotify]
 tool_node = ToolNode(tools)
 
 # Configurar el cliente para usar Azure OpenAI o modelos de GitHub
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 
 if API_HOST == "azure":
@@ -15,7 +15,7 @@ from llama_index.llms.azure_openai import AzureOpenAI
 from llama_index.llms.openai_like import OpenAILike
 
 # Configuramos el cliente para usar Azure OpenAI o Modelos de GitHub
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 
 if API_HOST == "azure":
@@ -11,7 +11,7 @@ from dotenv import load_dotenv
 set_tracing_disabled(disabled=True)
 
 # Configuramos el cliente OpenAI para usar Azure OpenAI o Modelos de GitHub
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 
 if API_HOST == "github":
@@ -18,7 +18,7 @@ logger = logging.getLogger("weekend_planner")
 set_tracing_disabled(disabled=True)
 
 # Configuramos el cliente OpenAI para usar Azure OpenAI o Modelos de GitHub
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 if API_HOST == "github":
     client = openai.AsyncOpenAI(base_url="https://models.inference.ai.azure.com", api_key=os.environ["GITHUB_TOKEN"])
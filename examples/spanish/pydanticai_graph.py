@@ -21,7 +21,7 @@ from pydantic_graph import (
 )
 
 # Configuración del cliente OpenAI para usar Azure OpenAI o Modelos de GitHub
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 
 if API_HOST == "github":
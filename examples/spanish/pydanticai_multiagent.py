@@ -13,7 +13,7 @@ from pydantic_ai.providers.openai import OpenAIProvider
 from rich.prompt import Prompt
 
 # Configurar el cliente de OpenAI para usar Azure OpenAI o Modelos de GitHub
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 
 if API_HOST == "github":
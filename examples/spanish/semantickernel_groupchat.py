@@ -28,7 +28,7 @@ from semantic_kernel.functions import KernelFunctionFromPrompt
 REVIEWER_NAME = "Revisor"
 WRITER_NAME = "Escritor"
 
-load_dotenv(override=True)
+load_dotenv(override=False)
 API_HOST = os.getenv("API_HOST", "github")
 
 
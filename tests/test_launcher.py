@@ -0,0 +1,23 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def launch(tmp_path: Path, *args: str) -> str:
+    env = {name: value for name, value in os.environ.items() if name != "API_HOST"}
+    result = subprocess.run([sys.executable, "-m", "examples", *args], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_host_overrides_dot_env(tmp_path):
+    # A copy of the examples with the .env that infra/write_dot_env.sh writes next to them
+    shutil.copytree(ROOT_DIR / "examples", tmp_path / "examples", ignore=shutil.ignore_patterns("__pycache__"))
+    (tmp_path / ".env").write_text("API_HOST=azure\n")
+    (tmp_path / "examples" / "print_host.py").write_text("from common.clients import API_HOST\n\nprint(API_HOST)\n")
+
+    assert launch(tmp_path, "run", "print_host") == "azure"
+    assert launch(tmp_path, "run", "print_host", "--host", "local") == "local"
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "examples"))
+
+from common import semantic_cache  # noqa: E402
+from common.semantic_cache import SemanticCache  # noqa: E402
+
+
+def test_cap_counts_only_unexpired_entries(tmp_path, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: clock[0])
+    path = tmp_path / "semantic.sqlite3"
+    cache = SemanticCache("tool", path=path, ttl=10, max_entries=5)
+    for index in range(5):
+        clock[0] = 0.0 if index < 2 else 5.0
+        cache.store(f"question {index}", [1.0, float(index)], f"answer {index}")
+    cache.close()
+
+    # Reopened with a lower cap, so the cache is over its limit, and then the two oldest entries expire
+    clock[0] = 8.0
+    cache = SemanticCache("tool", path=path, ttl=10, max_entries=3)
+    clock[0] = 12.0
+    cache.store("question 5", [1.0, 5.0], "answer 5")
+
+    assert cache._answers == ["answer 3", "answer 4", "answer 5"]
+    assert cache._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0] == 3
+    cache.close()